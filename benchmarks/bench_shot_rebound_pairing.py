@@ -0,0 +1,140 @@
+"""
+Benchmark for the shot-rebound pairing step of ActionProcessor.extract_shots_and_rebounds: the original cartesian
+merge (every rebound x every shot in the same game/period, filtered and deduplicated) against the sorted as-of match
+in ActionProcessor.pair_shots_and_rebounds. Reports the intermediate row count, peak memory (tracemalloc) and time
+of each, and checks both produce the same pairs.
+
+Runs on synthetic events so no source data is needed, from the repo root:
+    python benchmarks/bench_shot_rebound_pairing.py --games 1230
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from code.io.ActionProcessor import ActionProcessor
+
+PERIODS = 4
+SHOTS_PER_PERIOD = 45
+REBOUNDS_PER_PERIOD = 22
+PERIOD_MS = 12 * 60 * 1000
+
+
+def make_events(n_games, seed=0):
+    """
+    Shots and rebounds at random times per game/period, shaped like the columns extract_shots_and_rebounds uses.
+    Times are distinct within a period: the cartesian pairing breaks exact ties with an unstable sort, so its output
+    for them is arbitrary and can't be compared.
+    """
+    rng = np.random.default_rng(seed)
+    per_period = SHOTS_PER_PERIOD + REBOUNDS_PER_PERIOD
+    n_periods = n_games * PERIODS
+    n = n_periods * per_period
+
+    # Strictly increasing times within each period, shuffled over the period's shots and rebounds
+    gaps = rng.integers(1, PERIOD_MS // per_period, (n_periods, per_period))
+    event_type = rng.permuted(np.tile(np.repeat(["SHOT", "REB"], [SHOTS_PER_PERIOD, REBOUNDS_PER_PERIOD]), (n_periods, 1)), axis=1)
+    game_num = np.repeat(np.arange(n_games), PERIODS * per_period)
+    period = np.tile(np.repeat(np.arange(1, PERIODS + 1), per_period), n_games)
+
+    event_df = pd.DataFrame(
+        {
+            "gameId": pd.Series(game_num).map(lambda num: f"00223{num:05d}"),
+            "eventType": event_type.ravel(),
+            "playerId": rng.integers(0, 500, n).astype(str),
+            "teamId": rng.integers(0, 30, n).astype(str),
+            "period": period,
+            "wcTime": (game_num * PERIODS + period) * PERIOD_MS + np.cumsum(gaps, axis=1).ravel(),
+            "made": rng.random(n) < 0.45,
+            "dReb": rng.random(n) < 0.75,
+        }
+    )
+
+    event_df = event_df.sort_values(["gameId", "wcTime"], ignore_index=True)
+    shots_df = event_df[event_df["eventType"] == "SHOT"].drop(columns=["dReb"])
+    rebounds_df = event_df[event_df["eventType"] == "REB"][["gameId", "teamId", "playerId", "period", "wcTime", "dReb"]]
+
+    return shots_df, rebounds_df
+
+
+def pair_cartesian(shots_df, rebounds_df, stats):
+    """The original pairing from extract_shots_and_rebounds."""
+    merged_df = pd.merge(rebounds_df, shots_df, on=["gameId", "period"], suffixes=("_reb", "_shot"))
+    stats["intermediate_rows"] = len(merged_df)
+    valid_pairs = merged_df[merged_df["wcTime_shot"] < merged_df["wcTime_reb"]]
+    valid_pairs = valid_pairs.sort_values(
+        by=["gameId", "period", "wcTime_reb", "wcTime_shot"],
+        ascending=[True, True, True, False],
+    )
+    valid_pairs = valid_pairs.drop_duplicates(subset=["gameId", "period", "wcTime_shot"])
+    valid_pairs = valid_pairs.drop_duplicates(subset=["gameId", "period", "wcTime_reb"])
+
+    return valid_pairs.reset_index(drop=True)
+
+
+def pair_asof(shots_df, rebounds_df, stats):
+    with record_merges(stats):
+        return ActionProcessor.pair_shots_and_rebounds(shots_df, rebounds_df)
+
+
+@contextmanager
+def record_merges(stats):
+    """Records the row count of the largest frame produced by pd.merge_asof while active, i.e. the as-of match's intermediate."""
+    merge_asof = pd.merge_asof
+
+    def recording_merge_asof(*args, **kwargs):
+        merged = merge_asof(*args, **kwargs)
+        stats["intermediate_rows"] = max(stats.get("intermediate_rows", 0), len(merged))
+        return merged
+
+    pd.merge_asof = recording_merge_asof
+    try:
+        yield
+    finally:
+        pd.merge_asof = merge_asof
+
+
+def measure(pair, shots_df, rebounds_df):
+    stats = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    pairs = pair(shots_df, rebounds_df, stats)
+    stats["seconds"] = time.perf_counter() - start
+    stats["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    stats["pairs"] = len(pairs)
+
+    return pairs, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1230, help="Number of synthetic games (a full regular season is 1230)")
+    args = parser.parse_args()
+
+    shots_df, rebounds_df = make_events(args.games)
+    print(f"{args.games} games, {len(shots_df)} shots, {len(rebounds_df)} rebounds")
+
+    results = {}
+    for name, pair in (("cartesian", pair_cartesian), ("as-of", pair_asof)):
+        results[name] = measure(pair, shots_df, rebounds_df)
+        stats = results[name][1]
+        print(
+            f"{name:>10}: {stats['intermediate_rows']:>12,} intermediate rows, {stats['peak_mb']:>9.1f} MB peak, "
+            f"{stats['seconds']:>7.3f}s, {stats['pairs']:,} pairs"
+        )
+
+    # Same rows and columns
+    key = ["gameId", "period", "wcTime_reb", "wcTime_shot"]
+    cartesian, asof = (results[name][0].sort_values(key, ignore_index=True) for name in ("cartesian", "as-of"))
+    pd.testing.assert_frame_equal(asof, cartesian)
+    print("outputs match")
+
+
+if __name__ == "__main__":
+    main()
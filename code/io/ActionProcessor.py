@@ -1,4 +1,18 @@
+import numpy as np
 import pandas as pd
+from collections import namedtuple
+from code.io.EventProcessor import EventProcessor, FRAME_TOLERANCE
+from code.io.GameStore import GameStore
+from code.io.TrackingProcessor import TrackingProcessor
+from code.io.PossessionProcessor import PossessionProcessor
+
+GameFrames = namedtuple("GameFrames", ["game_id", "event_df", "tracking_df", "possession_df"])
+
+# The only tracking columns/rows extract_shots_and_rebounds reads on raw tracking, see ActionProcessor.ball_tracking
+BALL_TRACKING = {"columns": ["gameId", "teamId", "wcTime", "x", "y"], "entity": "ball"}
+
+# Store source the streaming shot/rebound extraction writes to (data/store/shots_and_rebounds/<gameId>/)
+SHOTS_AND_REBOUNDS_SOURCE = "shots_and_rebounds"
 
 
 class ActionProcessor:
@@ -6,6 +20,139 @@ class ActionProcessor:
     Class for identifying/extracting game actions using a combnination of event, possesssion and tracking data
     """
 
+    def iter_games(game_ids: list = "all", chunksize=1_000_000, compact=False, columns=None, entity=None):
+        """
+        Yields GameFrames (game_id, event_df, tracking_df, possession_df) aligned one game at a time.
+        Tracking is streamed game by game, events/possessions are small enough to be loaded once (through the cache) and split per game.
+        columns/entity are pushed down into the tracking reader (see TrackingProcessor.load_games), e.g. **ball_tracking()
+        when only the ball is needed.
+        """
+        event_df = EventProcessor.load_games(game_ids)
+        possession_df = PossessionProcessor.load_games(game_ids)
+        events_by_game = dict(tuple(event_df.groupby("gameId", sort=False)))
+        possessions_by_game = dict(tuple(possession_df.groupby("gameId", sort=False)))
+
+        for game_id, tracking_df in TrackingProcessor.iter_games(game_ids, chunksize, compact, columns, entity=entity):
+            yield GameFrames(
+                game_id,
+                events_by_game.get(game_id, event_df.iloc[0:0]).reset_index(drop=True),
+                tracking_df,
+                possessions_by_game.get(game_id, possession_df.iloc[0:0]).reset_index(drop=True),
+            )
+
+    def ball_tracking():
+        """
+        Pushdown options for the ball-only slice of tracking extract_shots_and_rebounds reads, e.g. iter_games(**ball_tracking()).
+        BALL_TRACKING plus nx/ny when the tracking source has them (see TrackingProcessor.normalize_attack), so streamed
+        results carry the same columns as the in-memory path.
+        """
+        columns = TrackingProcessor.columns()
+        return {**BALL_TRACKING, "columns": BALL_TRACKING["columns"] + [col for col in ("nx", "ny") if col in columns]}
+
+    def extract_shots_and_rebounds_by_game(games):
+        """Runs extract_shots_and_rebounds over an iterator of GameFrames (see iter_games), holding one game's tracking at a time."""
+        return pd.concat(
+            [ActionProcessor.extract_shots_and_rebounds(game.event_df, game.tracking_df) for game in games],
+            ignore_index=True,
+        )
+
+    def write_shots_and_rebounds(games, source=SHOTS_AND_REBOUNDS_SOURCE):
+        """
+        Streaming version of extract_shots_and_rebounds: runs it one game at a time over an iterator of GameFrames (or
+        (game_id, event_df, tracking_df) tuples) and appends each game's rows to a per-game partition in the store, so
+        only one game is ever held in memory. Resumable, games already in the output are skipped -- pass
+        iter_games(ActionProcessor.pending_games(), **ActionProcessor.ball_tracking()) to skip reading them as well.
+
+        Args:
+            games (iterator): Per-game events and (ball) tracking, e.g. ActionProcessor.iter_games(**ActionProcessor.ball_tracking()).
+            source (str): Store source to write to.
+
+        Returns:
+            list: gameIds written by this run.
+        """
+        done = set(GameStore.game_ids(source)) if GameStore.has_source(source) else set()
+        written = []
+        for game in games:
+            game_id, event_df, tracking_df = game[:3]
+            if game_id in done:
+                continue
+            GameStore.write_game(source, game_id, ActionProcessor.extract_shots_and_rebounds(event_df, tracking_df))
+            written.append(game_id)
+
+        return written
+
+    def pending_games(game_ids: list = "all", source=SHOTS_AND_REBOUNDS_SOURCE):
+        """gameIds (all games in the events by default) that write_shots_and_rebounds hasn't written yet."""
+        if isinstance(game_ids, str):
+            game_ids = list(EventProcessor.load_games(columns=["gameId"])["gameId"].unique())
+        done = set(GameStore.game_ids(source)) if GameStore.has_source(source) else set()
+
+        return [game_id for game_id in game_ids if game_id not in done]
+
+    def load_shots_and_rebounds(game_ids: list = "all", source=SHOTS_AND_REBOUNDS_SOURCE):
+        """Reads back the output of write_shots_and_rebounds."""
+        return GameStore.read(source, game_ids)
+
+    def locate_events(event_df, tracking_df, columns=("gameId", "wcTime", "x", "y"), direction="nearest", tolerance=FRAME_TOLERANCE):
+        """
+        Tracking columns of each event's synced frame (see EventProcessor.sync_frames), one row per distinct
+        (gameId, wcTime) of the events with wcTime being the event's own timestamp, ready for exact joins on the events.
+        Events without a frame within tolerance are left out.
+        """
+        event_df = event_df[["gameId", "wcTime"]].drop_duplicates(ignore_index=True)
+        sync = EventProcessor.sync_frames(event_df, tracking_df, direction, tolerance)
+        found = sync["ballRow"].to_numpy() >= 0
+
+        locs = tracking_df.iloc[sync["ballRow"].to_numpy()[found]][list(columns)].reset_index(drop=True)
+        locs["gameId"] = event_df["gameId"].to_numpy()[found]
+        locs["wcTime"] = event_df["wcTime"].to_numpy()[found]
+
+        return locs
+
+    def pair_shots_and_rebounds(shots_df, rebounds_df):
+        """
+        Pairs rebounds with the shots they follow: each rebound takes the last shot strictly before it in the same
+        game/period, and a shot followed by several rebounds only keeps the first. This is what filtering the full
+        shot x rebound merge on wcTime_shot < wcTime_reb and deduplicating gives, but done as a sorted as-of match so the
+        intermediate is one row per rebound instead of quadratic per period.
+
+        Args:
+            shots_df (DataFrame): Shot events.
+            rebounds_df (DataFrame): Rebound events.
+
+        Returns:
+            DataFrame: One row per pair, the rebound columns followed by the shot columns (shared columns suffixed
+                _reb/_shot, as in a merge on gameId/period), ordered by gameId, period and rebound time.
+        """
+        keys = ["gameId", "period", "wcTime"]
+        rebound_keys = rebounds_df[keys].reset_index(drop=True).assign(reb_row=lambda df: np.arange(len(df)))
+        shot_keys = shots_df[keys].reset_index(drop=True).assign(shot_row=lambda df: np.arange(len(df)))
+
+        # Last shot strictly before each rebound, by game/period
+        matched = pd.merge_asof(
+            rebound_keys.dropna(subset=["wcTime"]).sort_values("wcTime", kind="stable"),
+            shot_keys.dropna(subset=["wcTime"]).sort_values("wcTime", kind="stable"),
+            on="wcTime",
+            by=["gameId", "period"],
+            allow_exact_matches=False,
+        ).dropna(subset=["shot_row"])
+
+        # A shot is paired with the first rebound after it only
+        matched = matched.sort_values(["gameId", "period", "wcTime", "reb_row"], kind="stable")
+        matched = matched.drop_duplicates(subset=["shot_row"])
+
+        shared = (set(rebounds_df.columns) & set(shots_df.columns)) - {"gameId", "period"}
+        reb_side = rebounds_df.iloc[matched["reb_row"].to_numpy(dtype=int)].reset_index(drop=True)
+        shot_side = shots_df.iloc[matched["shot_row"].to_numpy(dtype=int)].drop(columns=["gameId", "period"]).reset_index(drop=True)
+
+        return pd.concat(
+            [
+                reb_side.rename(columns={col: f"{col}_reb" for col in shared}),
+                shot_side.rename(columns={col: f"{col}_shot" for col in shared}),
+            ],
+            axis=1,
+        )
+
     def extract_shots_and_rebounds(event_df, tracking_df):
         """
         Extracts missed shots and their corresponding rebounds, mapping the shot location to the rebound location using tracking data.
@@ -20,7 +167,10 @@ class ActionProcessor:
             DataFrame: Contains matched shot and rebound locations, times, rebounding teamId, etc.
         """
         # Extract ball locations where teamId is '-1'
-        tracking_df = tracking_df[tracking_df["teamId"] == "-1"].copy()
+        tracking_df = tracking_df[tracking_df["teamId"] == "-1"].reset_index(drop=True)
+
+        # Carry the attack-normalized coordinates along when the tracking has them (see TrackingProcessor.normalize_attack)
+        coord_cols = ["gameId", "wcTime", "x", "y"] + [col for col in ("nx", "ny") if col in tracking_df.columns]
 
         # Filter for shots and rebounds
         shots_df = (
@@ -30,43 +180,38 @@ class ActionProcessor:
             ["gameId", "teamId", "playerId", "period", "wcTime", "dReb"]  # Added playerId
         ].copy()
 
-        # Merging shots and rebounds on 'gameId' and 'period', then filtering and deduplicating
-        merged_df = pd.merge(
-            rebounds_df, shots_df, on=["gameId", "period"], suffixes=("_reb", "_shot")
-        )
-        valid_pairs = merged_df[merged_df["wcTime_shot"] < merged_df["wcTime_reb"]]
-        valid_pairs = valid_pairs.sort_values(
-            by=["gameId", "period", "wcTime_reb", "wcTime_shot"],
-            ascending=[True, True, True, False],
-        )
-        valid_pairs = valid_pairs.drop_duplicates(
-            subset=["gameId", "period", "wcTime_shot"]
-        )
-        valid_pairs = valid_pairs.drop_duplicates(
-            subset=["gameId", "period", "wcTime_reb"]
+        # Ball location at each shot/rebound from its nearest frame (see EventProcessor.sync_frames), keyed by the event's
+        # own gameId/wcTime so events between frames aren't dropped by the exact time joins below
+        event_locs = ActionProcessor.locate_events(
+            pd.concat([shots_df[["gameId", "wcTime"]], rebounds_df[["gameId", "wcTime"]]], ignore_index=True),
+            tracking_df,
+            coord_cols,
         )
 
+        # Pair each rebound with the shot it follows
+        valid_pairs = ActionProcessor.pair_shots_and_rebounds(shots_df, rebounds_df)
+
         # Merge with tracking data for positions
         valid_pairs = pd.merge(
             valid_pairs,
-            tracking_df[["gameId", "wcTime", "x", "y"]],
+            event_locs,
             left_on=["gameId", "wcTime_shot"],
             right_on=["gameId", "wcTime"],
             how="left",
             suffixes=("", "_shot"),
         )
-        valid_pairs = valid_pairs.rename(columns={"x": "shot_x", "y": "shot_y"})
+        valid_pairs = valid_pairs.rename(columns={"x": "shot_x", "y": "shot_y", "nx": "shot_nx", "ny": "shot_ny"})
         valid_pairs = valid_pairs.drop(columns=["wcTime"])
 
         valid_pairs = pd.merge(
             valid_pairs,
-            tracking_df[["gameId", "wcTime", "x", "y"]],
+            event_locs,
             left_on=["gameId", "wcTime_reb"],
             right_on=["gameId", "wcTime"],
             how="left",
             suffixes=("_shot", "_reb"),
         )
-        valid_pairs = valid_pairs.rename(columns={"x": "rebound_x", "y": "rebound_y"})
+        valid_pairs = valid_pairs.rename(columns={"x": "rebound_x", "y": "rebound_y", "nx": "rebound_nx", "ny": "rebound_ny"})
         valid_pairs = valid_pairs.drop(columns=["wcTime"])
 
         # Prepare the final DataFrame
@@ -86,14 +231,14 @@ class ActionProcessor:
         # Combine made and missed shot data
         made_shots = pd.merge(
             shots_df.loc[shots_df["made"] == True],
-            tracking_df[["gameId", "wcTime", "x", "y"]],
+            event_locs,
             left_on=["gameId", "wcTime"],
             right_on=["gameId", "wcTime"],
             how="left",
             suffixes=("", "_shot"),
         )
         made_shots = made_shots.rename(
-            columns={"x": "shot_x", "y": "shot_y", "wcTime": "shot_time"}
+            columns={"x": "shot_x", "y": "shot_y", "nx": "shot_nx", "ny": "shot_ny", "wcTime": "shot_time"}
         )
 
         return pd.concat(
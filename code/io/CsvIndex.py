@@ -0,0 +1,154 @@
+import io
+import os
+import json
+import numpy as np
+import pandas as pd
+
+INDEX_SUFFIX = ".idx.json"
+BLOCK_SIZE = 64 * 1024**2  # 64MB
+
+
+class CsvIndex:
+    """
+    Sidecar byte-offset index over a raw csv source, stored next to it as <csv>.idx.json:
+        {"size": ..., "mtime": ..., "games": {gameId: [byte start, byte end, row count], ...}}
+
+    Built once (see the processors' index_csv methods), then the loaders seek straight to a game's block of rows and only
+    parse that, instead of tokenizing the whole file. The index records the csv's size and mtime and is ignored once
+    either changes, so a stale index is never used. Needs gameId to be the first column, each game's rows to be
+    contiguous and every row to be on its own line (no quoted newlines), as in the source data; build raises a
+    ValueError for a csv that doesn't fit.
+    """
+
+    def path(src_path):
+        return src_path + INDEX_SUFFIX
+
+    def build(src_path, block_size=BLOCK_SIZE):
+        """
+        Scans the csv once, in blocks, and writes its index. Game boundaries are found by comparing the gameId field of
+        consecutive lines with numpy, so the scan never goes through the python csv tokenizer. Nothing is written if the
+        csv can't be indexed (see the class docstring).
+
+        Args:
+            src_path (str): Path to the csv file.
+            block_size (int): Number of bytes read per block.
+
+        Returns:
+            dict: The index written for the csv.
+        """
+        games = {}
+        current = None  # [gameId, byte start, byte end, row count] of the game being scanned
+
+        with open(src_path, "rb") as f:
+            header = f.readline()
+            CsvIndex._check_header(src_path, header)
+            offset = len(header)
+            carry = b""
+            while True:
+                block = f.read(block_size)
+                data = carry + block
+                if not block and data and not data.endswith(b"\n"):
+                    data += b"\n"  # Last line without a trailing newline
+                end = data.rfind(b"\n") + 1
+                lines, carry = data[:end], data[end:]
+
+                for game_id, start, stop, rows in CsvIndex._scan(lines, offset, src_path):
+                    if current is not None and game_id == current[0]:
+                        current[2], current[3] = stop, current[3] + rows
+                        continue
+                    if current is not None:
+                        games[current[0]] = current[1:]
+                    if game_id in games:
+                        raise ValueError(f"Rows for game {game_id} are not contiguous in {src_path}, ingest the source instead")
+                    current = [game_id, start, stop, rows]
+
+                offset += end
+                if not block:
+                    break
+
+        if current is not None:
+            games[current[0]] = current[1:]
+
+        stat = os.stat(src_path)
+        index = {"size": stat.st_size, "mtime": stat.st_mtime, "games": games}
+        with open(CsvIndex.path(src_path), "w") as f:
+            json.dump(index, f)
+
+        return index
+
+    def load(src_path):
+        """Returns the index for the csv, or None if it hasn't been built or the csv has changed since."""
+        try:
+            with open(CsvIndex.path(src_path)) as f:
+                index = json.load(f)
+            stat = os.stat(src_path)
+        except FileNotFoundError:
+            return None
+
+        if index["size"] != stat.st_size or index["mtime"] != stat.st_mtime:
+            return None
+
+        return index
+
+    def read_game(src_path, index, game_id, dtypes, usecols=None):
+        """Parses a single game's rows by seeking to its block of the csv (no rows if the game isn't in the index)."""
+        start, end, _ = index["games"].get(game_id, (0, 0, 0))
+        with open(src_path, "rb") as f:
+            header = f.readline()
+            f.seek(start)
+            block = f.read(end - start)
+
+        return pd.read_csv(io.BytesIO(header + block), dtype=dtypes, usecols=usecols)
+
+    def file_order(index, game_ids):
+        """The requested games that are in the index, in the order they appear in the csv."""
+        games = index["games"]
+        return sorted((game_id for game_id in dict.fromkeys(game_ids) if game_id in games), key=lambda game_id: games[game_id][0])
+
+    def _check_header(src_path, header):
+        first = header.split(b",", 1)[0].decode("utf-8-sig").strip().strip('"')
+        if first != "gameId":
+            raise ValueError(f"{src_path} can't be indexed, its first column is {first!r} rather than gameId")
+        if header.count(b'"') % 2:
+            raise ValueError(f"{src_path} can't be indexed, its header has a quoted newline")
+
+    def _scan(lines, offset, src_path):
+        """
+        Yields (gameId, byte start, byte end, row count) for each run of consecutive lines sharing a gameId in a buffer of
+        whole lines that starts at byte offset in the file.
+        """
+        arr = np.frombuffer(lines, dtype=np.uint8)
+        newlines = np.flatnonzero(arr == ord("\n"))
+        if not len(newlines):
+            return
+
+        starts = np.r_[0, newlines[:-1] + 1]
+
+        # A quoted field spanning lines leaves an odd number of quotes on each of them, and would be split into two rows
+        quotes = np.flatnonzero(arr == ord('"'))
+        if len(quotes):
+            counts = np.searchsorted(quotes, newlines) - np.searchsorted(quotes, starts)
+            if (counts % 2).any():
+                line = int(np.flatnonzero(counts % 2)[0])
+                raise ValueError(f"{src_path} can't be indexed, it has a quoted newline at byte {offset + int(starts[line])}")
+        commas = np.flatnonzero(arr == ord(","))
+        field_ends = np.minimum(np.r_[commas, len(arr)][np.searchsorted(commas, starts)], newlines)
+        lengths = field_ends - starts
+
+        # Blank lines (pandas skips them) carry no gameId
+        has_field = (newlines - starts) > (arr[np.maximum(newlines - 1, 0)] == ord("\r"))
+        starts, newlines, lengths = starts[has_field], newlines[has_field], lengths[has_field]
+        if not len(starts):
+            return
+
+        # Fixed width view of each line's gameId field, zero padded, to compare consecutive lines
+        width = max(int(lengths.max()), 1)
+        cols = np.arange(width)
+        fields = np.where(cols < lengths[:, None], arr[np.minimum(starts[:, None] + cols, len(arr) - 1)], 0)
+        changes = np.flatnonzero(np.any(fields[1:] != fields[:-1], axis=1)) + 1
+
+        run_starts = np.r_[0, changes]
+        run_ends = np.r_[changes, len(starts)]
+        for lo, hi in zip(run_starts, run_ends):
+            game_id = lines[starts[lo]:starts[lo] + lengths[lo]].decode().strip().strip('"')
+            yield game_id, offset + int(starts[lo]), offset + int(newlines[hi - 1]) + 1, int(hi - lo)
@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
+from code.io.CsvIndex import CsvIndex
+from code.io.GameStore import GameStore
 
+SOURCE = "events"
+SRC_PATH = "data/src/events.csv"
 DTYPES = {
     "gameId": str,
     "teamId": str,
@@ -10,6 +15,9 @@ DTYPES = {
     "dReb": pd.BooleanDtype(),
 }
 
+# One frame at 25Hz (wcTime is in ms), the default tolerance when syncing events to frames
+FRAME_TOLERANCE = 40
+
 
 class EventProcessor:
     """
@@ -41,18 +49,87 @@ class EventProcessor:
         defenderName
     """
 
-    def load_game(game_id):
-        event_df = pd.read_csv("data/src/events.csv", dtype=DTYPES)
-        return event_df.loc[event_df["gameId"] == game_id].reset_index(drop=True)
-
-    def load_games(game_ids: list = "all"):
-        event_df = pd.read_csv("data/src/events.csv", dtype=DTYPES)
-        if game_ids != "all":
-            event_df = event_df.loc[event_df["gameId"].isin(game_ids)].reset_index(
-                drop=True
-            )
-
-        return event_df
+    def ingest(chunksize=1_000_000):
+        """One-time conversion of events.csv into the per-game partitioned store (see GameStore)."""
+        return GameStore.ingest(SOURCE, SRC_PATH, DTYPES, chunksize)
+
+    def index_csv():
+        """One-time byte-offset index of events.csv, so single-game loads seek straight to the game's rows (see CsvIndex)."""
+        return CsvIndex.build(SRC_PATH)
+
+    def load_game(game_id, columns=None, periods=None):
+        return GameStore.load(SOURCE, SRC_PATH, DTYPES, [game_id], columns=columns, filters=GameStore.filters(periods))
+
+    def load_games(game_ids: list = "all", columns=None, periods=None):
+        """Loads the given games, parsing only the requested columns/periods (see GameStore.load)."""
+        return GameStore.load(SOURCE, SRC_PATH, DTYPES, game_ids, columns=columns, filters=GameStore.filters(periods))
+
+    def load_games_parallel(game_ids: list = "all", max_workers=None, preprocess=None, columns=None, periods=None):
+        """Same result as load_games, read and preprocessed per game on a process pool (see GameStore.load_parallel)."""
+        return GameStore.load_parallel(
+            SOURCE, SRC_PATH, DTYPES, game_ids, columns=columns, filters=GameStore.filters(periods), preprocess=preprocess, max_workers=max_workers
+        )
+
+    def iter_games(game_ids: list = "all", chunksize=1_000_000, columns=None, periods=None):
+        """Yields (game_id, event_df) one game at a time (see GameStore.iter_games)."""
+        return GameStore.iter_games(SOURCE, SRC_PATH, DTYPES, game_ids, chunksize, columns, GameStore.filters(periods))
+
+    def sync_frames(event_df, tracking_df, direction="nearest", tolerance=FRAME_TOLERANCE, time_col="wcTime"):
+        """
+        Event-to-frame synchronization index: maps every event to its nearest (or previous/next) tracking frame in the
+        same game with one sorted merge_asof, so events that fall between frames still get a frame instead of missing
+        an exact wcTime match. Frames are the ball rows of the tracking data (one per frame).
+
+        Args:
+            event_df (DataFrame): Events to sync.
+            tracking_df (DataFrame): Tracking data for the events' games.
+            direction (str): 'nearest', 'backward' (previous frame) or 'forward' (next frame).
+            tolerance (int, optional): Max distance in ms between an event and its frame, None for no limit.
+            time_col (str): Event timestamp column to sync on (e.g. 'wcTimeEnd').
+
+        Returns:
+            DataFrame: Aligned with event_df's index, frameTime (wcTime of the frame, <NA> if there's none within tolerance)
+                and ballRow (position of the frame's ball row in tracking_df, -1 if none), e.g. tracking_df.iloc[ballRow].
+        """
+        is_ball = (tracking_df["teamId"] == "-1").to_numpy()
+        frames = pd.DataFrame(
+            {
+                "gameId": tracking_df["gameId"].to_numpy(dtype=object)[is_ball],
+                "frameTime": tracking_df["wcTime"].to_numpy(dtype=np.int64)[is_ball],
+                "ballRow": np.flatnonzero(is_ball),
+            }
+        )
+
+        event_time = event_df[time_col].to_numpy(dtype=float)
+        has_time = ~np.isnan(event_time)
+        query = pd.DataFrame(
+            {
+                "gameId": event_df["gameId"].to_numpy(dtype=object)[has_time],
+                "eventTime": event_time[has_time].astype(np.int64),
+                "row": np.flatnonzero(has_time),
+            }
+        )
+
+        matched = pd.merge_asof(
+            query.sort_values("eventTime", kind="stable"),
+            frames.sort_values("frameTime", kind="stable"),
+            left_on="eventTime",
+            right_on="frameTime",
+            by="gameId",
+            direction=direction,
+            tolerance=None if tolerance is None else int(tolerance),
+        )
+
+        frame_time = np.zeros(len(event_df), dtype=np.int64)
+        ball_row = np.full(len(event_df), -1)
+        found = matched["ballRow"].notna().to_numpy()
+        rows = matched["row"].to_numpy()[found]
+        frame_time[rows] = matched["frameTime"].to_numpy()[found].astype(np.int64)
+        ball_row[rows] = matched["ballRow"].to_numpy()[found].astype(np.int64)
+
+        return pd.DataFrame(
+            {"frameTime": pd.arrays.IntegerArray(frame_time, ball_row < 0), "ballRow": ball_row}, index=event_df.index
+        )
 
     def extract_shots(event_df):
         # Initialize an empty list to hold the indices of offensive rebounds
@@ -66,35 +143,65 @@ class EventProcessor:
             & (event_df["playerId"].notnull())
         ]
 
-    def extract_transition_opportunities(event_df):
-        # Find rows where 'dReb' is not null
-        drebs = event_df[
-            (event_df["dReb"].notna()) & (event_df["playerId"].notna())
-        ].index.tolist()
-
-        # List to hold transition opportunities
-        transition_opportunities = []
-
-        # Find events following each dReb that match the same teamId until a condition breaks the sequence
-        for start_index in drebs:
-            team_id = event_df.at[start_index, "teamId"]
+    def label_transitions(event_df):
+        """
+        Labels every event with the transition opportunity it belongs to, in one pass: events are split into runs of
+        consecutive events by the same team (a new run starts on a team, game or period change) and each rebound opens
+        a transition that lasts to the end of its run.
 
-            # Get the slice of the dataframe from the dReb event to the end of the dataframe
-            subsequent_events = event_df.loc[start_index:]
+        Returns:
+            Series: Aligned with event_df's index, the ordinal of the latest rebound in the event's run (the row of that
+                opportunity in extract_transition_opportunities), -1 for events not in a transition.
+        """
+        is_rebound = ((event_df["dReb"].notna()) & (event_df["playerId"].notna())).to_numpy()
+        run_id, run_starts = EventProcessor._team_runs(event_df)
 
-            # Find where the team ID changes or an event type signals a new play
-            break_condition = subsequent_events["teamId"] != team_id
+        # Rebounds seen so far, and before the start of each event's run
+        rebound_count = np.cumsum(is_rebound)
+        run_base = (rebound_count - is_rebound)[run_starts][run_id]
 
-            # Get the index of the first event where this condition is true
-            if break_condition.any():
-                end_index = subsequent_events[break_condition].index[0]
-            else:
-                end_index = event_df.index[-1]
+        return pd.Series(np.where(rebound_count > run_base, rebound_count - 1, -1), index=event_df.index, name="transitionId")
 
-            # Append the slice from the dReb to the event before the condition breaks
-            transition_opportunities.append(event_df.loc[start_index : end_index - 1])
-
-        return transition_opportunities
+    def extract_transition_opportunities(event_df):
+        """
+        Index table of the transition opportunities: each rebound (with a player) up to the last consecutive event by
+        the same team, in the same game and period. A rebound without a teamId is an opportunity of its own. Linear in
+        the number of events, see label_transitions.
+
+        Returns:
+            DataFrame: One row per opportunity with gameId, period, teamId, start/end (inclusive index labels of its
+                first and last event, i.e. event_df.loc[start:end]) and wcStart/wcEnd (their wcTime, so the table can
+                be used as windows, e.g. for FeatureUtil.find_ball_moments).
+        """
+        is_rebound = ((event_df["dReb"].notna()) & (event_df["playerId"].notna())).to_numpy()
+        run_id, run_starts = EventProcessor._team_runs(event_df)
+        run_ends = np.r_[run_starts[1:] - 1, len(event_df) - 1]
+
+        start = np.flatnonzero(is_rebound)
+        end = run_ends[run_id[start]]
+
+        return pd.DataFrame(
+            {
+                "gameId": event_df["gameId"].to_numpy()[start],
+                "period": event_df["period"].to_numpy()[start],
+                "teamId": event_df["teamId"].to_numpy()[start],
+                "start": event_df.index[start],
+                "end": event_df.index[end],
+                "wcStart": event_df["wcTime"].to_numpy()[start],
+                "wcEnd": event_df["wcTime"].to_numpy()[end],
+            }
+        )
+
+    def _team_runs(event_df):
+        # Run id of each event and the position each run starts at, runs break on team/game/period changes (and never span events without a team)
+        new_run = np.zeros(len(event_df), dtype=bool)
+        for col in ("teamId", "gameId", "period"):
+            values = event_df[col]
+            new_run |= (values != values.shift()).to_numpy() | values.isna().to_numpy()
+        if len(new_run):
+            new_run[0] = True
+
+        return np.cumsum(new_run) - 1, np.flatnonzero(new_run)
 
     def get_start_end_time_of_event(event):
         start_moment = event.iloc[0]
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 4 * 1024**3  # 4GB
+
+
+class FrameCache:
+    """
+    Memory-bounded LRU cache for loaded frames, keyed by (source, game_ids, columns, variant).
+    All of the processor loaders (and VisUtil's static assets) go through the shared FRAME_CACHE instance below,
+    so repeated loads in a notebook session stop paying parse costs.
+
+    Cached values are handed out as shallow views and are read-only: take a .copy() if you need to write to one.
+    Plain numeric/bool numpy buffers are frozen (marked read-only), so writing into those raises. Object and extension
+    columns can't be frozen (pandas < 3 can't read object columns backed by read-only buffers, string comparisons
+    raise), so they're shared with the cached frame as they are: under copy-on-write (always on from pandas 3, opt in
+    with pd.options.mode.copy_on_write = True on 2.x) writing to a view copies first, otherwise in-place writes to
+    those columns (e.g. view.loc[i, "teamId"] = ...) would reach the cached frame. Assigning whole columns is always safe.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes), ordered from least to most recently used
+
+    @staticmethod
+    def key(source, game_ids="all", columns=None, variant=None):
+        return (
+            source,
+            game_ids if isinstance(game_ids, str) else tuple(game_ids),
+            columns if columns is None else tuple(columns),
+            variant,
+        )
+
+    def get_or_load(self, key, loader):
+        """Returns a read-only view of the cached value for key, calling loader() to populate the entry on a miss."""
+        if not self.enabled:
+            return loader()
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return FrameCache._view(self._entries[key][0])
+
+        self.misses += 1
+        value = loader()
+        if not self.put(key, value):
+            return value
+
+        return FrameCache._view(value)
+
+    def put(self, key, value):
+        """Freezes and caches value, returns False (leaving value as is) if it's too large to cache."""
+        # Measured before freezing, memory_usage(deep=True) has to read the object columns
+        nbytes = FrameCache._sizeof(value)
+        if nbytes > self.max_bytes:
+            # Never let a single oversized entry flush the whole cache
+            return False
+
+        FrameCache._freeze(value)
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        self._evict()
+
+        return True
+
+    def invalidate(self, source=None):
+        """Drops all entries for the given source (or everything if no source is given)."""
+        for key in [key for key in self._entries if source is None or key[0] == source]:
+            self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        self.invalidate()
+        self.hits = self.misses = self.evictions = 0
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        return 0
+
+    @staticmethod
+    def _freezable(dtype):
+        # Plain numeric/bool numpy data, object and extension (string, categorical, nullable, datetime) columns are never frozen
+        return isinstance(dtype, np.dtype) and dtype.kind in "biufc"
+
+    @staticmethod
+    def _freeze(value):
+        if isinstance(value, pd.DataFrame):
+            for arr in value._mgr.arrays:
+                if isinstance(arr, np.ndarray) and FrameCache._freezable(arr.dtype):
+                    arr.flags.writeable = False
+        elif isinstance(value, np.ndarray) and FrameCache._freezable(value.dtype):
+            value.flags.writeable = False
+        return value
+
+    @staticmethod
+    def _view(value):
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        if isinstance(value, np.ndarray):
+            return value.view()
+        return value
+
+
+FRAME_CACHE = FrameCache()
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+PLAYERS_PER_TEAM = 5
+N_SLOTS = 2 * PLAYERS_PER_TEAM + 1  # 10 players plus the ball
+BALL_SLOT = N_SLOTS - 1
+BALL_TEAM_ID = "-1"
+
+
+class FrameCube:
+    """
+    Dense per-game frame tensor built once from long-format tracking data:
+        positions    float32 (n_frames, 11, 3)  xyz per entity slot, NaN where a slot is empty
+        wc_time      int64   (n_frames,)        sorted wall clock of each frame
+        period, game_clock, shot_clock          per-frame vectors
+        player_ids   object  (n_frames, 10)     per-frame slot map, None where a slot is empty
+
+    Slots 0-4 hold team_ids[0]'s players, 5-9 team_ids[1]'s and slot 10 the ball, so hot-path numerics
+    (closest defender, voronoi/rebounds, kinematics) become plain numpy slicing instead of groupbys/masks.
+    A player keeps the same slot from frame to frame (see _player_slots), so positions[:, slot] is one player's track.
+    """
+
+    def __init__(self, game_id, positions, wc_time, period, game_clock, shot_clock, player_ids, team_ids, meta=None):
+        self.game_id = game_id
+        self.positions = positions
+        self.wc_time = wc_time
+        self.period = period
+        self.game_clock = game_clock
+        self.shot_clock = shot_clock
+        self.player_ids = player_ids
+        self.team_ids = team_ids
+        # Descriptive columns (names, abbreviations, date) only needed to rebuild the DataFrame layout
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.wc_time)
+
+    @property
+    def xy(self):
+        return self.positions[..., :2]
+
+    @property
+    def ball(self):
+        return self.positions[:, BALL_SLOT]
+
+    def team_slots(self, team_id):
+        """Slice of the player slots belonging to team_id."""
+        team_num = list(self.team_ids).index(team_id)
+        return slice(team_num * PLAYERS_PER_TEAM, (team_num + 1) * PLAYERS_PER_TEAM)
+
+    def frame_index(self, timestamps):
+        """Frame index for each timestamp (exact wcTime match), -1 where there is no such frame."""
+        timestamps = np.asarray(timestamps)
+        if not len(self):
+            return np.full(timestamps.shape, -1)
+
+        idx = np.clip(np.searchsorted(self.wc_time, timestamps), 0, len(self) - 1)
+        return np.where(self.wc_time[idx] == timestamps, idx, -1)
+
+    def frames_between(self, start_time, end_time):
+        """Slice of frames with start_time <= wcTime <= end_time."""
+        return slice(
+            int(np.searchsorted(self.wc_time, start_time, side="left")),
+            int(np.searchsorted(self.wc_time, end_time, side="right")),
+        )
+
+    @classmethod
+    def from_tracking(cls, tracking_df):
+        """Builds the cube for a single game of long-format tracking data (see TrackingProcessor)."""
+        game_ids = tracking_df["gameId"].dropna().unique()
+        if len(game_ids) > 1:
+            raise ValueError("FrameCube holds a single game, use FrameCube.from_games for multiple games")
+
+        tracking_df = tracking_df.sort_values("wcTime", kind="stable")
+        wc_time, frame_num = np.unique(tracking_df["wcTime"].to_numpy(dtype=np.int64), return_inverse=True)
+        n_frames = len(wc_time)
+
+        # Per-frame metadata from the first row of each frame
+        first_rows = np.r_[0, np.flatnonzero(np.diff(frame_num)) + 1] if n_frames else np.array([], dtype=int)
+        team_col = tracking_df["teamId"].astype(object).to_numpy()
+        is_ball = team_col == BALL_TEAM_ID
+
+        # Slot each entity: ball -> slot 10 (first ball row of each frame), players -> team block + a slot they keep across frames
+        team_ids = list(pd.unique(team_col[~is_ball & pd.notna(team_col)]))[:2]
+        team_num = np.full(len(team_col), -1)
+        for num, team_id in enumerate(team_ids):
+            team_num[team_col == team_id] = num
+        player_slot = FrameCube._player_slots(frame_num, team_num, tracking_df["playerId"].astype(object).to_numpy(), n_frames, len(team_ids))
+        first_ball = np.zeros(len(team_col), dtype=bool)
+        first_ball[np.flatnonzero(is_ball)[np.unique(frame_num[is_ball], return_index=True)[1]]] = True
+
+        slot = np.where(is_ball, BALL_SLOT, team_num * PLAYERS_PER_TEAM + player_slot)
+        keep = np.where(is_ball, first_ball, (team_num >= 0) & (player_slot >= 0))
+
+        positions = np.full((n_frames, N_SLOTS, 3), np.nan, dtype=np.float32)
+        positions[frame_num[keep], slot[keep]] = tracking_df[["x", "y", "z"]].to_numpy(dtype=np.float32)[keep]
+
+        player_ids = np.full((n_frames, N_SLOTS - 1), None, dtype=object)
+        players = keep & ~is_ball
+        player_ids[frame_num[players], slot[players]] = tracking_df["playerId"].astype(object).to_numpy()[players]
+
+        meta = {}
+        if "playerName" in tracking_df.columns:
+            meta["playerName"] = dict(zip(tracking_df["playerId"].astype(object), tracking_df["playerName"].astype(object)))
+        if "teamAbbr" in tracking_df.columns:
+            meta["teamAbbr"] = dict(zip(tracking_df["teamId"].astype(object), tracking_df["teamAbbr"].astype(object)))
+        if "gameDate" in tracking_df.columns and len(tracking_df):
+            meta["gameDate"] = tracking_df["gameDate"].iloc[0]
+
+        return cls(
+            game_ids[0] if len(game_ids) else None,
+            positions,
+            wc_time,
+            tracking_df["period"].to_numpy()[first_rows],
+            tracking_df["gcTime"].to_numpy(dtype=np.float32)[first_rows],
+            tracking_df["scTime"].to_numpy(dtype=np.float32)[first_rows],
+            player_ids,
+            np.array(team_ids, dtype=object),
+            meta,
+        )
+
+    @staticmethod
+    def _player_slots(frame_num, team_num, player_ids, n_frames, n_teams):
+        """
+        Slot (0-4) within its team's block of every player row, -1 for rows left out (no playerId, or past 5 players).
+        Slots are only reassigned where a team's lineup changes: players still on the court keep theirs, and incoming
+        players (in playerId order) take their previous slot if it's free, else the lowest free one. So a slot follows
+        one player across frames, and per-slot differences over time (velocity, acceleration) stay meaningful.
+        """
+        slot = np.full(len(frame_num), -1)
+        codes = pd.factorize(player_ids, sort=True)[0]
+
+        for num in range(n_teams):
+            rows = np.flatnonzero((team_num == num) & (codes >= 0))
+            if not len(rows):
+                continue
+            rows = rows[np.lexsort((codes[rows], frame_num[rows]))]
+            frames = frame_num[rows]
+
+            # Each frame's lineup as up to 5 playerId codes in playerId order (-1 padded)
+            starts = np.r_[0, np.flatnonzero(np.diff(frames)) + 1]
+            rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+            fits = rank < PLAYERS_PER_TEAM
+            rows, frames, rank = rows[fits], frames[fits], rank[fits]
+            lineups = np.full((n_frames, PLAYERS_PER_TEAM), -1)
+            lineups[frames, rank] = codes[rows]
+
+            # Slot of each lineup position, worked out once per lineup change and carried forward
+            changes = np.flatnonzero(np.r_[True, np.any(lineups[1:] != lineups[:-1], axis=1)])
+            change_slots = np.full((len(changes), PLAYERS_PER_TEAM), -1)
+            current, last = {}, {}
+            for change_num, frame in enumerate(changes):
+                lineup = [code for code in lineups[frame] if code >= 0]
+                current = {code: current[code] for code in lineup if code in current}
+                for code in lineup:
+                    if code not in current:
+                        free = [free_slot for free_slot in range(PLAYERS_PER_TEAM) if free_slot not in current.values()]
+                        current[code] = last[code] if last.get(code) in free else free[0]
+                        last[code] = current[code]
+                change_slots[change_num, : len(lineup)] = [current[code] for code in lineup]
+
+            run = np.cumsum(np.isin(np.arange(n_frames), changes)) - 1
+            slot[rows] = change_slots[run[frames], rank]
+
+        return slot
+
+    @classmethod
+    def from_games(cls, tracking_df):
+        """Builds a cube per game, keyed by gameId."""
+        return {
+            game_id: cls.from_tracking(game_df)
+            for game_id, game_df in tracking_df.groupby("gameId", sort=False, observed=True)
+        }
+
+    def to_dataframe(self):
+        """Converts back to the long-format tracking layout (one row per filled slot, players by slot then the ball per frame)."""
+        frame_num, slot = np.nonzero(~np.isnan(self.positions[..., 0]))
+        is_ball = slot == BALL_SLOT
+
+        player_ids = np.full(len(slot), None, dtype=object)
+        player_ids[~is_ball] = self.player_ids[frame_num[~is_ball], slot[~is_ball]]
+        team_ids = np.full(len(slot), BALL_TEAM_ID, dtype=object)
+        team_ids[~is_ball] = self.team_ids[slot[~is_ball] // PLAYERS_PER_TEAM]
+
+        tracking_df = pd.DataFrame(
+            {
+                "gameId": self.game_id,
+                "playerId": player_ids,
+                "playerName": pd.Series(player_ids).map(self.meta.get("playerName", {})).to_numpy(),
+                "teamId": team_ids,
+                "teamAbbr": pd.Series(team_ids).map(self.meta.get("teamAbbr", {})).to_numpy(),
+                "period": self.period[frame_num],
+                "wcTime": self.wc_time[frame_num],
+                "gcTime": self.game_clock[frame_num],
+                "scTime": self.shot_clock[frame_num],
+                "x": self.positions[frame_num, slot, 0],
+                "y": self.positions[frame_num, slot, 1],
+                "z": self.positions[frame_num, slot, 2],
+                "gameDate": self.meta.get("gameDate"),
+            }
+        )
+
+        return tracking_df
@@ -0,0 +1,430 @@
+import os
+import json
+import glob
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from code.io.CsvIndex import CsvIndex
+from code.io.FrameCache import FRAME_CACHE
+
+STORE_DIR = "data/store"
+MANIFEST_FILE = "_manifest.json"
+VOCABULARY_FILE = "_vocabulary.json"
+VOCABULARY_SUFFIX = ".vocab.json"
+CSV_CHUNKSIZE = 1_000_000
+BALL_TEAM_ID = "-1"
+
+
+class GameStore:
+    """
+    Per-game partitioned columnar (parquet) copy of the csv sources. Layout:
+        data/store/<source>/<gameId>/part-<chunk>.parquet
+        data/store/<source>/_manifest.json  (columns, game order and row counts captured at ingest)
+
+    Ingest is a one-time step (see the processors' ingest methods). Once a source is ingested, the loaders only read
+    the partitions for the requested games, otherwise they seek to the games' rows through the csv's byte-offset index
+    (see CsvIndex) if one has been built, and fall back to parsing the full csv.
+    NOTE: parquet io requires pyarrow (or fastparquet) to be installed.
+    """
+
+    _vocabularies = {}  # Per process cache of the loaded vocabularies, keyed by file and source size/mtime
+
+    def source_dir(source):
+        return os.path.join(STORE_DIR, source)
+
+    def has_source(source):
+        return os.path.exists(os.path.join(GameStore.source_dir(source), MANIFEST_FILE))
+
+    def manifest(source):
+        with open(os.path.join(GameStore.source_dir(source), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def game_ids(source):
+        return GameStore.manifest(source)["games"]
+
+    def ingest(source, src_path, dtypes, chunksize=1_000_000, transform=None):
+        """
+        Splits a csv source into per-game parquet partitions, parsing it in chunks so the full file never has to fit in memory.
+        The store is written to a temp dir and swapped in at the end, so a failed ingest never leaves a partial source behind.
+
+        Args:
+            source (str): Name of the source in the store (e.g. 'tracking').
+            src_path (str): Path to the csv file to ingest.
+            dtypes (dict): Column dtypes used to parse the csv (the processor's DTYPES).
+            chunksize (int): Number of csv rows parsed per chunk.
+            transform (callable, optional): Applied to each game's rows before they're written (e.g. TrackingProcessor.normalize_attack).
+
+        Returns:
+            dict: The manifest written for the source.
+        """
+        out_dir = GameStore.source_dir(source)
+        tmp_dir = out_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns, games, rows = None, [], {}
+        for chunk_num, chunk in enumerate(pd.read_csv(src_path, dtype=dtypes, chunksize=chunksize)):
+            columns = columns or list(chunk.columns)
+            for game_id, game_df in chunk.groupby("gameId", sort=False):
+                if game_id not in rows:
+                    games.append(game_id)
+                    rows[game_id] = 0
+                    os.makedirs(os.path.join(tmp_dir, game_id))
+                if transform:
+                    game_df = transform(game_df)
+                # Counted after the transform, so the manifest matches what's stored even if it adds/drops rows
+                rows[game_id] += len(game_df)
+                columns = list(game_df.columns)
+                game_df.to_parquet(os.path.join(tmp_dir, game_id, f"part-{chunk_num:05d}.parquet"), index=False)
+
+        manifest = {"source": src_path, "columns": columns, "games": games, "rows": rows}
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.rename(tmp_dir, out_dir)
+        FRAME_CACHE.invalidate(source)
+
+        return manifest
+
+    def write_game(source, game_id, df):
+        """
+        Appends (or replaces) a single game's partition in a store source written incrementally, e.g. derived outputs
+        like ActionProcessor's. The partition is written to a temp dir and swapped in before the game is added to the
+        manifest, so an interrupted run never leaves a partial game that looks finished.
+        """
+        src_dir = GameStore.source_dir(source)
+        game_dir = os.path.join(src_dir, game_id)
+        tmp_dir = game_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        df.to_parquet(os.path.join(tmp_dir, "part-00000.parquet"), index=False)
+        shutil.rmtree(game_dir, ignore_errors=True)
+        os.rename(tmp_dir, game_dir)
+
+        if GameStore.has_source(source):
+            manifest = GameStore.manifest(source)
+        else:
+            manifest = {"source": None, "columns": list(df.columns), "games": [], "rows": {}}
+        if game_id not in manifest["rows"]:
+            manifest["games"].append(game_id)
+        manifest["rows"][game_id] = len(df)
+
+        # Replace the manifest atomically too
+        tmp_manifest = os.path.join(src_dir, MANIFEST_FILE + ".tmp")
+        with open(tmp_manifest, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, os.path.join(src_dir, MANIFEST_FILE))
+        FRAME_CACHE.invalidate(source)
+
+        return manifest
+
+    def filters(periods=None, time_range=None, entity=None):
+        """
+        Builds the pushdown predicates for the loaders (pyarrow filter tuples, also applied to csv chunks as they're parsed).
+
+        Args:
+            periods (list, optional): Periods to keep.
+            time_range (tuple, optional): Inclusive (start, end) wcTime range to keep.
+            entity (str, optional): 'ball', 'players' or a teamId to keep.
+        """
+        filters = []
+        if periods is not None:
+            filters.append(("period", "in", list(periods)))
+        if time_range is not None:
+            filters.append(("wcTime", ">=", time_range[0]))
+            filters.append(("wcTime", "<=", time_range[1]))
+        if entity == "ball":
+            filters.append(("teamId", "==", BALL_TEAM_ID))
+        elif entity == "players":
+            filters.append(("teamId", "!=", BALL_TEAM_ID))
+        elif entity is not None:
+            filters.append(("teamId", "==", entity))
+
+        return filters
+
+    def apply_filters(df, filters):
+        """Applies pushdown predicates to an already parsed frame (same semantics as the parquet reader, nulls never match)."""
+        if not filters:
+            return df
+
+        mask = np.ones(len(df), dtype=bool)
+        for col, op, value in filters:
+            values = df[col]
+            if op == "in":
+                mask &= values.isin(value).to_numpy()
+            elif op == "==":
+                mask &= (values == value).to_numpy()
+            elif op == "!=":
+                mask &= (values.notna() & (values != value)).to_numpy()
+            elif op == ">=":
+                mask &= (values >= value).to_numpy()
+            elif op == "<=":
+                mask &= (values <= value).to_numpy()
+            else:
+                raise ValueError(f"Unsupported filter op: {op}")
+
+        return df.loc[mask]
+
+    def _usecols(columns, filters):
+        """Columns that have to be parsed from the csv: the projection plus gameId and any filtered columns."""
+        if columns is None:
+            return None
+        return list(dict.fromkeys(["gameId"] + list(columns) + [col for col, _, _ in filters]))
+
+    def read_game(source, game_id, columns=None, filters=None):
+        parts = sorted(glob.glob(os.path.join(GameStore.source_dir(source), game_id, "part-*.parquet")))
+        df = pd.concat(
+            [pd.read_parquet(part, columns=columns, filters=filters or None) for part in parts],
+            ignore_index=True,
+        )
+
+        # Missing strings come back as None from parquet and NaN from the csv, match the csv loader
+        object_cols = df.columns[df.dtypes == object]
+        if len(object_cols):
+            df[object_cols] = df[object_cols].where(df[object_cols].notna(), np.nan)
+
+        return df
+
+    def read(source, game_ids="all", columns=None, filters=None):
+        """
+        Reads the partitions for the given games into a single DataFrame. Games come back in manifest (i.e. source file)
+        order whatever order they're requested in, as they do from the csv.
+        """
+        manifest = GameStore.manifest(source)
+        requested = None if isinstance(game_ids, str) else set(game_ids)
+
+        frames = [
+            GameStore.read_game(source, game_id, columns, filters)
+            for game_id in manifest["games"]
+            if requested is None or game_id in requested
+        ]
+        if not frames:
+            return pd.DataFrame(columns=columns or manifest["columns"])
+
+        return pd.concat(frames, ignore_index=True)
+
+    def columns(source, src_path):
+        """Columns the loaders return for the source: the store's (which may include columns added at ingest), else the csv header."""
+        if GameStore.has_source(source):
+            return GameStore.manifest(source)["columns"]
+        return list(pd.read_csv(src_path, nrows=0).columns)
+
+    def vocabulary(source, src_path, dtypes, columns, chunksize=1_000_000):
+        """
+        Sorted distinct values of the given columns over the whole source, so dictionaries built from it (e.g. the compact
+        categories, see TrackingProcessor.to_compact) come out the same for every game, load and process.
+        Built with one pass over just those columns and persisted: in the store (<source>/_vocabulary.json) once the
+        source is ingested, otherwise next to the csv as <csv>.vocab.json. It records the size and mtime of the csv (or
+        the store's manifest) and is rebuilt once either changes. Columns the source doesn't have are left out.
+
+        Returns:
+            dict: column -> sorted list of values.
+        """
+        store = GameStore.has_source(source)
+        if store:
+            path = os.path.join(GameStore.source_dir(source), VOCABULARY_FILE)
+            stat = os.stat(os.path.join(GameStore.source_dir(source), MANIFEST_FILE))
+        else:
+            path = src_path + VOCABULARY_SUFFIX
+            stat = os.stat(src_path)
+        stamp = [stat.st_size, stat.st_mtime]
+
+        key = (path, *stamp)
+        if key not in GameStore._vocabularies:
+            GameStore._vocabularies[key] = {"stamp": stamp, "columns": {}, "absent": []}
+            if os.path.exists(path):
+                with open(path) as f:
+                    saved = json.load(f)
+                if saved["stamp"] == stamp:
+                    GameStore._vocabularies[key] = saved
+        vocabulary = GameStore._vocabularies[key]
+
+        missing = [col for col in columns if col not in vocabulary["columns"] and col not in vocabulary["absent"]]
+        if missing:
+            available = GameStore.columns(source, src_path)
+            present = [col for col in missing if col in available]
+            if not present:
+                chunks = []
+            elif store:
+                parts = glob.glob(os.path.join(GameStore.source_dir(source), "*", "part-*.parquet"))
+                chunks = (pd.read_parquet(part, columns=present) for part in parts)
+            else:
+                chunks = pd.read_csv(src_path, dtype=dtypes, usecols=present, chunksize=chunksize)
+
+            values = {col: set() for col in present}
+            for chunk in chunks:
+                for col in present:
+                    values[col].update(chunk[col].dropna().unique().tolist())
+            vocabulary["columns"].update({col: sorted(values[col]) for col in present})
+            vocabulary["absent"].extend(col for col in missing if col not in present)
+
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(vocabulary, f)
+            os.replace(tmp_path, path)
+
+        return {col: vocabulary["columns"][col] for col in columns if col in vocabulary["columns"]}
+
+    def read_csv_game(src_path, dtypes, index, game_id, columns=None, filters=None):
+        """Parses a single game from the csv through its byte-offset index (see CsvIndex), with the same pushdown as read_game."""
+        df = GameStore.apply_filters(CsvIndex.read_game(src_path, index, game_id, dtypes, GameStore._usecols(columns, filters or [])), filters)
+        return df[list(columns)] if columns is not None else df.reset_index(drop=True)
+
+    def load(source, src_path, dtypes, game_ids="all", transform=None, columns=None, filters=None):
+        """
+        Shared load path for the processors: reads from the partitioned store when the source has been ingested,
+        otherwise parses the csv and filters down to the requested games.
+        Only the requested columns are parsed, and the filters (see GameStore.filters) are pushed down into the reader,
+        so unneeded data is never allocated.
+        Results go through the shared FRAME_CACHE, so the returned frame is a read-only view.
+        An optional transform (e.g. TrackingProcessor.to_compact) is applied before caching, and cached separately per
+        transform object (so two different lambdas or closures never share an entry).
+        """
+        filters = filters or []
+
+        def load_uncached():
+            df = GameStore._load_uncached(source, src_path, dtypes, game_ids, columns, filters)
+            return transform(df) if transform else df
+
+        variant = (transform, tuple((col, op, str(value)) for col, op, value in filters))
+        return FRAME_CACHE.get_or_load(FRAME_CACHE.key(source, game_ids, columns, variant), load_uncached)
+
+    def load_parallel(source, src_path, dtypes, game_ids="all", transform=None, columns=None, filters=None, preprocess=None, max_workers=None):
+        """
+        Parallel version of load: per-game reading, dtype conversion and the optional preprocess steps run on a process pool,
+        and the per-game results are concatenated in manifest (i.e. source file) order, so the rows come back in the
+        same order as the serial path. Without an ingested store the workers seek to their games through the csv index
+        (see CsvIndex), and without one either the csv is streamed once in this process and only the preprocessing is
+        spread over the pool.
+
+        Args:
+            source, src_path, dtypes, game_ids, transform, columns, filters: As in load. The transform runs once on the
+                concatenated result in this process, so it doesn't have to be picklable.
+            preprocess (callable or list, optional): Picklable function(s) of a single game's DataFrame (e.g. sorting or
+                mirroring), applied in order in the workers.
+            max_workers (int, optional): Pool size, defaults to the number of cores. 1 runs serially without a pool.
+        """
+        filters = filters or []
+        preprocess = list(preprocess) if isinstance(preprocess, (list, tuple)) else [preprocess] if preprocess else []
+
+        def load_uncached():
+            index = CsvIndex.load(src_path)
+            if GameStore.has_source(source):
+                manifest = GameStore.manifest(source)
+                requested = None if isinstance(game_ids, str) else set(game_ids)
+                tasks = [
+                    (source, game_id, columns, filters, preprocess)
+                    for game_id in manifest["games"]
+                    if requested is None or game_id in requested
+                ]
+                worker = GameStore._read_game_task
+            elif index is not None:
+                tasks = [
+                    (src_path, dtypes, index, game_id, columns, filters, preprocess)
+                    for game_id in CsvIndex.file_order(index, index["games"] if isinstance(game_ids, str) else game_ids)
+                ]
+                worker = GameStore._read_csv_game_task
+            else:
+                tasks = (
+                    (game_df, preprocess)
+                    for _, game_df in GameStore.iter_games(source, src_path, dtypes, game_ids, columns=columns, filters=filters)
+                )
+                worker = GameStore._preprocess_task
+
+            if max_workers == 1:
+                frames = [worker(task) for task in tasks]
+            else:
+                # map yields results in submission order whichever worker finishes first
+                with ProcessPoolExecutor(max_workers) as executor:
+                    frames = list(executor.map(worker, tasks))
+
+            if not frames:
+                df = GameStore._load_uncached(source, src_path, dtypes, game_ids, columns, filters)
+            else:
+                df = pd.concat(frames, ignore_index=True)
+
+            return transform(df) if transform else df
+
+        # Without preprocessing the result is identical to load's, so both share the cache entry. Keyed by the step
+        # objects themselves, so distinct lambdas/closures (which can share a __qualname__) never collide
+        variant = (transform, tuple((col, op, str(value)) for col, op, value in filters)) + tuple(preprocess)
+        return FRAME_CACHE.get_or_load(FRAME_CACHE.key(source, game_ids, columns, variant), load_uncached)
+
+    def _read_game_task(task):
+        source, game_id, columns, filters, preprocess = task
+        return GameStore._preprocess_task((GameStore.read_game(source, game_id, columns, filters), preprocess))
+
+    def _read_csv_game_task(task):
+        src_path, dtypes, index, game_id, columns, filters, preprocess = task
+        return GameStore._preprocess_task((GameStore.read_csv_game(src_path, dtypes, index, game_id, columns, filters), preprocess))
+
+    def _preprocess_task(task):
+        df, preprocess = task
+        for step in preprocess:
+            df = step(df)
+        return df
+
+    def _load_uncached(source, src_path, dtypes, game_ids, columns=None, filters=None):
+        filters = list(filters or [])
+        if GameStore.has_source(source):
+            return GameStore.read(source, game_ids, columns, filters)
+
+        index = CsvIndex.load(src_path) if not isinstance(game_ids, str) else None
+        if index is not None:
+            # Seek to each game's block rather than tokenizing the whole file
+            game_ids = CsvIndex.file_order(index, game_ids) or [None]
+            return pd.concat(
+                [GameStore.read_csv_game(src_path, dtypes, index, game_id, columns, filters) for game_id in game_ids],
+                ignore_index=True,
+            )
+
+        if not isinstance(game_ids, str):
+            filters.append(("gameId", "in", list(game_ids)))
+
+        # Parse in chunks so rows that are filtered out never accumulate
+        frames = [
+            GameStore.apply_filters(chunk, filters)
+            for chunk in pd.read_csv(src_path, dtype=dtypes, usecols=GameStore._usecols(columns, filters), chunksize=CSV_CHUNKSIZE)
+        ]
+        df = pd.concat(frames, ignore_index=True)
+
+        return df[list(columns)] if columns is not None else df
+
+    def iter_games(source, src_path, dtypes, game_ids="all", chunksize=1_000_000, columns=None, filters=None):
+        """
+        Yields (game_id, DataFrame) one game at a time, so peak memory scales with a single game rather than the season.
+        Reads one partition per game from the store (or seeks to the requested games through the csv index), otherwise
+        streams the csv in chunks (which expects each game's rows to be contiguous in the file, as they are in the source
+        data). Bypasses FRAME_CACHE.
+        Columns/filters are pushed down as in load.
+        """
+        if GameStore.has_source(source):
+            for game_id in GameStore.game_ids(source):
+                if isinstance(game_ids, str) or game_id in game_ids:
+                    yield game_id, GameStore.read_game(source, game_id, columns, filters)
+            return
+
+        index = CsvIndex.load(src_path) if not isinstance(game_ids, str) else None
+        if index is not None:
+            for game_id in CsvIndex.file_order(index, game_ids):
+                yield game_id, GameStore.read_csv_game(src_path, dtypes, index, game_id, columns, filters)
+            return
+
+        pending_id, pending, seen = None, [], set()
+        for chunk in pd.read_csv(src_path, dtype=dtypes, usecols=GameStore._usecols(columns, filters or []), chunksize=chunksize):
+            for game_id, game_df in chunk.groupby("gameId", sort=False):
+                if game_id != pending_id:
+                    if pending:
+                        yield pending_id, pd.concat(pending, ignore_index=True)
+                    if game_id in seen:
+                        raise ValueError(f"Rows for game {game_id} are not contiguous in {src_path}, ingest the source first")
+                    pending_id, pending = game_id, []
+                    seen.add(game_id)
+                if isinstance(game_ids, str) or game_id in game_ids:
+                    game_df = GameStore.apply_filters(game_df, filters)
+                    pending.append(game_df[list(columns)] if columns is not None else game_df)
+
+        if pending:
+            yield pending_id, pd.concat(pending, ignore_index=True)
@@ -0,0 +1,137 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+MEMMAP_DIR = "data/memmap"
+LAYOUT_FILE = "_layout.json"
+
+
+class MemmapStore:
+    """
+    Season-level raw binary column files that are opened with np.memmap, so loads are near-instant zero-copy slices and
+    several processes/kernels on one box share the OS page cache instead of each holding a parsed copy. Layout:
+        data/memmap/<source>/<col>.bin     one flat array per column for the whole season (string columns as int32 codes)
+        data/memmap/<source>/_layout.json  dtypes, string column dictionaries and the per-game [start, end) row offsets
+    """
+
+    _open = {}  # Per process cache of opened layouts/memmaps, keyed by source dir
+
+    def source_dir(source):
+        return os.path.join(MEMMAP_DIR, source)
+
+    def has_source(source):
+        return os.path.exists(os.path.join(MemmapStore.source_dir(source), LAYOUT_FILE))
+
+    def export(source, games, numeric_dtypes, dictionaries=None):
+        """
+        Writes an iterator of (game_id, DataFrame) pairs (e.g. TrackingProcessor.iter_games) to the memmap layout,
+        one game at a time. Columns in numeric_dtypes are stored with that dtype, every other column as int32 codes
+        into a dictionary shared across the season.
+
+        Args:
+            source (str): Name of the memmap source (e.g. 'tracking').
+            games (iterator): (game_id, DataFrame) pairs.
+            numeric_dtypes (dict): Column -> dtype of the numeric columns.
+            dictionaries (dict, optional): Column -> values the string columns' dictionaries start from (e.g. the
+                source vocabulary, see GameStore.vocabulary), so the codes line up with other encodings of the data.
+        """
+        out_dir = MemmapStore.source_dir(source)
+        tmp_dir = out_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        dictionaries = {col: dict(zip(values, range(len(values)))) for col, values in (dictionaries or {}).items()}
+        columns, offsets, n_rows = None, {}, 0
+        files = {}
+        try:
+            for game_id, game_df in games:
+                if columns is None:
+                    columns = list(game_df.columns)
+                    files = {col: open(os.path.join(tmp_dir, f"{col}.bin"), "wb") for col in columns}
+
+                for col in columns:
+                    if col in numeric_dtypes:
+                        values = game_df[col].to_numpy(dtype=numeric_dtypes[col])
+                    else:
+                        values = MemmapStore._encode(dictionaries.setdefault(col, {}), game_df[col])
+                    files[col].write(np.ascontiguousarray(values).tobytes())
+
+                offsets[game_id] = (n_rows, n_rows + len(game_df))
+                n_rows += len(game_df)
+        finally:
+            for f in files.values():
+                f.close()
+
+        layout = {
+            "columns": columns or [],
+            "dtypes": {col: numeric_dtypes.get(col, "int32") for col in columns or []},
+            "dictionaries": {col: list(codes.keys()) for col, codes in dictionaries.items() if col in (columns or [])},
+            "rows": n_rows,
+            "offsets": offsets,
+        }
+        with open(os.path.join(tmp_dir, LAYOUT_FILE), "w") as f:
+            json.dump(layout, f)
+
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.rename(tmp_dir, out_dir)
+        MemmapStore._open.pop(out_dir, None)
+
+        return layout
+
+    def open_source(source):
+        """Opens (once per process) the layout and read-only memmaps for every column of the source."""
+        src_dir = MemmapStore.source_dir(source)
+        if src_dir not in MemmapStore._open:
+            with open(os.path.join(src_dir, LAYOUT_FILE)) as f:
+                layout = json.load(f)
+            arrays = {
+                col: np.memmap(os.path.join(src_dir, f"{col}.bin"), dtype=layout["dtypes"][col], mode="r", shape=(layout["rows"],))
+                if layout["rows"] else np.empty(0, dtype=layout["dtypes"][col])
+                for col in layout["columns"]
+            }
+            categories = {col: pd.Index(values) for col, values in layout["dictionaries"].items()}
+            MemmapStore._open[src_dir] = (layout, arrays, categories)
+
+        return MemmapStore._open[src_dir]
+
+    def read(source, game_ids="all"):
+        """
+        Returns the rows for the given games. For a single game (or 'all') the numeric columns are zero-copy slices of the
+        memmaps, string columns come back as categoricals over the season dictionary (same as the compact schema).
+        """
+        layout, arrays, categories = MemmapStore.open_source(source)
+        if isinstance(game_ids, str):
+            bounds = [(0, layout["rows"])]
+        else:
+            # Export order (same as the csv/store loads), whatever order the ids are given in
+            requested = set(game_ids)
+            bounds = [tuple(offsets) for game_id, offsets in layout["offsets"].items() if game_id in requested]
+
+        frames = [MemmapStore._frame(arrays, categories, start, end) for start, end in bounds]
+        if len(frames) == 1:
+            return frames[0]
+        if not frames:
+            return MemmapStore._frame(arrays, categories, 0, 0)
+
+        return pd.concat(frames, ignore_index=True)
+
+    def _frame(arrays, categories, start, end):
+        columns = {}
+        for col, values in arrays.items():
+            if col in categories:
+                columns[col] = pd.Categorical.from_codes(values[start:end], categories=categories[col])
+            else:
+                # Plain ndarray view of the memmap, still zero-copy
+                columns[col] = values[start:end].view(np.ndarray)
+
+        return pd.DataFrame(columns, copy=False)
+
+    def _encode(dictionary, values):
+        # NaN/None -> -1, the categorical code for missing values
+        values = values.astype(object)
+        for value in values.dropna().unique():
+            dictionary.setdefault(value, len(dictionary))
+
+        return pd.Index(list(dictionary), dtype=object).get_indexer(values).astype(np.int32)
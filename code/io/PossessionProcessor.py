@@ -1,4 +1,12 @@
+import numpy as np
 import pandas as pd
+from code.io.CsvIndex import CsvIndex
+from code.io.GameStore import GameStore
+
+SOURCE = "possessions"
+SRC_PATH = "data/src/possessions.csv"
+DTYPES = {"gameId": str, "teamId": str, "possId": str}
+
 
 class PossessionProcessor:
     """
@@ -17,19 +25,79 @@ class PossessionProcessor:
         gcEnd,
         basketX
     """
-    def load_game(game_id):
-        possessions_df = pd.read_csv('data/src/possessions.csv', dtype={'gameId': str, 'teamId': str, 'possId': str})
-        return possessions_df.loc[possessions_df['gameId'] == game_id].reset_index(drop=True)
+    def ingest(chunksize=1_000_000):
+        """One-time conversion of possessions.csv into the per-game partitioned store (see GameStore)."""
+        return GameStore.ingest(SOURCE, SRC_PATH, DTYPES, chunksize)
+
+    def index_csv():
+        """One-time byte-offset index of possessions.csv, so single-game loads seek straight to the game's rows (see CsvIndex)."""
+        return CsvIndex.build(SRC_PATH)
+
+    def load_game(game_id, columns=None, periods=None):
+        return GameStore.load(SOURCE, SRC_PATH, DTYPES, [game_id], columns=columns, filters=GameStore.filters(periods))
     
-    def load_games(game_ids: list = "all"):
-        possessions_df = pd.read_csv('data/src/possessions.csv', dtype={'gameId': str, 'teamId': str, 'possId': str})
-        if game_ids != "all":
-            possessions_df = possessions_df.loc[possessions_df['gameId'].isin(game_ids)].reset_index(drop=True)
-        
-        return possessions_df
+    def load_games(game_ids: list = "all", columns=None, periods=None):
+        """Loads the given games, parsing only the requested columns/periods (see GameStore.load)."""
+        return GameStore.load(SOURCE, SRC_PATH, DTYPES, game_ids, columns=columns, filters=GameStore.filters(periods))
+
+    def load_games_parallel(game_ids: list = "all", max_workers=None, preprocess=None, columns=None, periods=None):
+        """Same result as load_games, read and preprocessed per game on a process pool (see GameStore.load_parallel)."""
+        return GameStore.load_parallel(
+            SOURCE, SRC_PATH, DTYPES, game_ids, columns=columns, filters=GameStore.filters(periods), preprocess=preprocess, max_workers=max_workers
+        )
+
+    def iter_games(game_ids: list = "all", chunksize=1_000_000, columns=None, periods=None):
+        """Yields (game_id, possessions_df) one game at a time (see GameStore.iter_games)."""
+        return GameStore.iter_games(SOURCE, SRC_PATH, DTYPES, game_ids, chunksize, columns, GameStore.filters(periods))
     
     def extract_possessions_by_outcome(possessions_df, outcome):
         return possessions_df.loc[possessions_df['outcome'] == outcome].reset_index(drop=True)
 
     def extract_possession_by_timestamp(possessions_df, timestamp):
-        return possessions_df.loc[(possessions_df['wcStart'] <= timestamp) & (possessions_df['wcEnd'] >= timestamp)].iloc[0]
\ No newline at end of file
+        return possessions_df.loc[(possessions_df['wcStart'] <= timestamp) & (possessions_df['wcEnd'] >= timestamp)].iloc[0]
+
+    def build_interval_index(possessions_df):
+        """Possession intervals sorted by wcEnd (then gameId/wcStart) for the as-of lookups in lookup_possessions."""
+        return possessions_df.sort_values(["wcEnd", "gameId", "wcStart"], kind="stable").reset_index(drop=True)
+
+    def lookup_possessions(possessions_df, timestamps, game_ids=None, columns=("possId", "basketX")):
+        """
+        Batch version of extract_possession_by_timestamp: finds the possession with wcStart <= timestamp <= wcEnd for a whole
+        column of timestamps in one merge_asof pass (per game when game_ids is given), rather than scanning the table per timestamp.
+        Like the scalar lookup, a timestamp on the boundary of two possessions goes to the earlier one.
+
+        Args:
+            possessions_df (DataFrame): Possessions, or an index prebuilt with build_interval_index.
+            timestamps (array-like): wcTime values to look up.
+            game_ids (array-like, optional): gameId of each timestamp, restricts matches to the same game.
+            columns (tuple): Possession columns to return.
+
+        Returns:
+            DataFrame: The requested columns, positionally aligned with timestamps (NaN where no possession covers the timestamp).
+        """
+        columns = list(columns)
+        intervals = possessions_df
+        if not intervals["wcEnd"].is_monotonic_increasing:
+            intervals = PossessionProcessor.build_interval_index(possessions_df)
+
+        query = pd.DataFrame({"wcTime": np.asarray(timestamps), "row": np.arange(len(timestamps))})
+        by = None
+        if game_ids is not None:
+            query["gameId"] = np.asarray(game_ids, dtype=object)
+            intervals = intervals.astype({"gameId": query["gameId"].dtype})
+            by = "gameId"
+
+        # First possession ending at/after each timestamp, then check it had started
+        matched = pd.merge_asof(
+            query.sort_values("wcTime", kind="stable"),
+            intervals[list(dict.fromkeys(["gameId", "wcStart", "wcEnd"] + columns))],
+            left_on="wcTime",
+            right_on="wcEnd",
+            by=by,
+            direction="forward",
+        ).sort_values("row", ignore_index=True)
+
+        possessions = matched[columns].copy()
+        possessions.loc[~(matched["wcStart"] <= matched["wcTime"]), columns] = np.nan
+
+        return possessions
\ No newline at end of file
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from code.io.PossessionProcessor import PossessionProcessor
+
+
+class TrackingIndex:
+    """
+    Time-indexed tracking container: rows are kept sorted by (gameId, wcTime) with per-game row bounds, so range and point
+    queries on wcTime are answered with searchsorted as zero-copy slices instead of boolean masks over the whole frame.
+
+    The TrackingProcessor moment extractors, VisUtil and the StatsUtil rebound chance assigners use it automatically
+    when one is passed in place of a tracking DataFrame.
+
+    Given the possessions too, it also keeps [start, end) row offsets per possId and tags every row with its possId,
+    so possessions are extracted as zero-copy slices and aggregated with a single reduceat (see index_possessions).
+
+    Slices share their data with the index, so treat them as read-only (like FrameCache views): adding or assigning
+    whole columns only changes the slice, but in-place writes into existing columns (e.g. slice.loc[i, "x"] = ...)
+    reach the index unless copy-on-write is on (always from pandas 3). Take a .copy() to write to a slice.
+    """
+
+    def __init__(self, tracking_df, possessions_df=None):
+        self.tracking_df = tracking_df.sort_values(["gameId", "wcTime"], kind="stable").reset_index(drop=True)
+        self.wc_time = self.tracking_df["wcTime"].to_numpy()
+
+        # Games are contiguous after the sort, so each one is a [start, end) block of rows
+        game_codes, game_ids = pd.factorize(self.tracking_df["gameId"])
+        starts = np.flatnonzero(np.r_[True, game_codes[1:] != game_codes[:-1]]) if len(game_codes) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(game_codes)].astype(int)
+        self.game_bounds = {
+            game_ids[game_codes[start]]: (int(start), int(end)) for start, end in zip(starts, ends)
+        }
+
+        self.poss_ids = np.array([], dtype=object)
+        self.poss_offsets = np.empty((0, 2), dtype=int)
+        self._poss_rows = {}
+        if possessions_df is not None:
+            self.index_possessions(possessions_df)
+
+    def __len__(self):
+        return len(self.tracking_df)
+
+    @property
+    def game_ids(self):
+        return list(self.game_bounds.keys())
+
+    def game(self, game_id):
+        """All rows for a single game."""
+        start, end = self.game_bounds.get(game_id, (0, 0))
+        return self._slice(start, end)
+
+    def index_possessions(self, possessions_df):
+        """
+        Builds the possession offsets: poss_offsets[i] holds the [start, end) rows of possession poss_ids[i], i.e. its
+        frames with wcStart <= wcTime <= wcEnd (inclusive like extract_possession_moments, so a frame on the boundary of
+        two possessions is in both slices). Also adds a possId column to the rows, where boundary frames go to the
+        earlier possession (as in PossessionProcessor.lookup_possessions), so each row belongs to at most one possession.
+        Possessions are expected not to overlap, beyond sharing a boundary frame (as in the source data).
+
+        Args:
+            possessions_df (DataFrame): Possessions for the indexed games (see PossessionProcessor).
+        """
+        game_col = possessions_df["gameId"].astype(object).to_numpy()
+        wc_start = possessions_df["wcStart"].to_numpy()
+        wc_end = possessions_df["wcEnd"].to_numpy()
+
+        offsets = np.zeros((len(possessions_df), 2), dtype=int)
+        for game_id, (start, end) in self.game_bounds.items():
+            rows = np.flatnonzero(game_col == game_id)
+            offsets[rows, 0] = start + np.searchsorted(self.wc_time[start:end], wc_start[rows], side="left")
+            offsets[rows, 1] = start + np.searchsorted(self.wc_time[start:end], wc_end[rows], side="right")
+
+        self.poss_ids = possessions_df["possId"].astype(object).to_numpy()
+        self.poss_offsets = offsets
+        self._poss_rows = {poss_id: row for row, poss_id in enumerate(self.poss_ids)}
+        self.tracking_df["possId"] = PossessionProcessor.lookup_possessions(
+            possessions_df, self.wc_time, self.tracking_df["gameId"], columns=("possId",)
+        )["possId"].to_numpy()
+
+    def possession(self, poss_id):
+        """All rows of a single possession (empty if it wasn't indexed)."""
+        row = self._poss_rows.get(poss_id)
+        if row is None:
+            return self._slice(0, 0)
+        return self._slice(*self.poss_offsets[row])
+
+    def has_possession(self, poss_id):
+        return poss_id in self._poss_rows
+
+    def reduce_possessions(self, col, ufunc=np.add):
+        """
+        Aggregates a column per possession in one ufunc.reduceat pass over the possId tagged rows (e.g. np.add for sums,
+        np.maximum for maxima). Rows outside any possession are left out.
+
+        Returns:
+            Series: The reduced value keyed by possId, in time order.
+        """
+        poss_col = self.tracking_df["possId"].astype(object).to_numpy()
+        if not len(poss_col):
+            return pd.Series(dtype=float, name=col)
+
+        # Rows are sorted by game/time and possessions don't overlap, so each possession is one contiguous run
+        run_starts = np.flatnonzero(np.r_[True, poss_col[1:] != poss_col[:-1]])
+        values = ufunc.reduceat(self.tracking_df[col].to_numpy(), run_starts)
+        keep = pd.notna(poss_col[run_starts])
+
+        return pd.Series(values[keep], index=pd.Index(poss_col[run_starts][keep], name="possId"), name=col)
+
+    def rows_between(self, start_time, end_time, game_id=None):
+        """Returns the [lo, hi) row bounds (per game) of frames with start_time <= wcTime <= end_time."""
+        games = [game_id] if game_id is not None else self.game_ids
+        bounds = []
+        for game in games:
+            start, end = self.game_bounds.get(game, (0, 0))
+            lo = start + int(np.searchsorted(self.wc_time[start:end], start_time, side="left"))
+            hi = start + int(np.searchsorted(self.wc_time[start:end], end_time, side="right"))
+            if hi > lo:
+                bounds.append((lo, hi))
+
+        return bounds
+
+    def between(self, start_time, end_time, game_id=None):
+        """Rows with start_time <= wcTime <= end_time (inclusive, matching the boolean mask filters it replaces)."""
+        bounds = self.rows_between(start_time, end_time, game_id)
+        if len(bounds) == 1:
+            return self._slice(*bounds[0])
+        if not bounds:
+            return self._slice(0, 0)
+
+        # Only copies when the time range spans several games
+        return pd.concat([self._slice(lo, hi) for lo, hi in bounds], ignore_index=True)
+
+    def at(self, timestamp, game_id=None):
+        """Rows for the frame(s) at exactly this timestamp."""
+        return self.between(timestamp, timestamp, game_id)
+
+    def _slice(self, lo, hi):
+        # Positional row slices are views on the underlying blocks, only the index is rebuilt (on a fresh shallow copy,
+        # so it's never set on an iloc result pandas tracks as a copy of tracking_df)
+        moment_df = self.tracking_df.iloc[lo:hi].copy(deep=False)
+        moment_df.index = pd.RangeIndex(hi - lo)
+        return moment_df
@@ -1,4 +1,33 @@
+import os
+import numpy as np
 import pandas as pd
+from code.io.CsvIndex import CsvIndex
+from code.io.GameStore import GameStore
+from code.io.MemmapStore import MemmapStore
+from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingIndex import TrackingIndex
+
+SOURCE = "tracking"
+SRC_PATH = "data/src/tracking.csv"
+DTYPES = {"gameId": str, "playerId": str, "teamId": str}
+
+# Opt-in compact schema (see TrackingProcessor.to_compact)
+COMPACT_NUMERIC_DTYPES = {
+    "period": "int8",
+    "wcTime": "int64",
+    "gcTime": "float32",
+    "scTime": "float32",
+    "x": "float32",
+    "y": "float32",
+    "z": "float32",
+    "nx": "float32",
+    "ny": "float32",
+}
+
+# Basket every possession is normalized to attack at ingest (see TrackingProcessor.normalize_attack)
+ATTACK_BASKET_X = 41.75
+COMPACT_CATEGORICAL_COLS = ["gameId", "playerId", "teamId", "teamAbbr", "playerName", "gameDate"]
+
 
 class TrackingProcessor:
     """
@@ -16,19 +45,158 @@ class TrackingProcessor:
         y,
         z,
         gameDate
+    ingested cols (see normalize_attack):
+        nx,
+        ny
     """
-    def load_game(game_id):
-        tracking_df = pd.read_csv('data/src/tracking.csv', dtype={'gameId': str, 'playerId': str, 'teamId': str})
-        return tracking_df.loc[tracking_df['gameId'] == game_id].reset_index(drop=True)
+    def ingest(chunksize=1_000_000, normalize=True):
+        """
+        One-time conversion of tracking.csv into the per-game partitioned store (see GameStore).
+        By default the attack-normalized nx/ny coordinates are added on the way in (see normalize_attack).
+        """
+        transform = None
+        if normalize:
+            possessions_df = PossessionProcessor.build_interval_index(PossessionProcessor.load_games())
+            transform = lambda tracking_df: TrackingProcessor.normalize_attack(tracking_df, possessions_df)
+
+        return GameStore.ingest(SOURCE, SRC_PATH, DTYPES, chunksize, transform)
+
+    def index_csv():
+        """One-time byte-offset index of tracking.csv, so single-game loads seek straight to the game's rows (see CsvIndex)."""
+        return CsvIndex.build(SRC_PATH)
+
+    def columns():
+        """Columns the loaders return: the csv's, plus nx/ny once the source has been ingested with normalize."""
+        return GameStore.columns(SOURCE, SRC_PATH)
+
+    def load_game(game_id, compact=False, columns=None, periods=None, time_range=None, entity=None):
+        return TrackingProcessor.load_games([game_id], compact, columns, periods, time_range, entity)
     
-    def load_games(game_ids: list = "all"):
-        tracking_df = pd.read_csv('data/src/tracking.csv', dtype={'gameId': str, 'playerId': str, 'teamId': str})
-        if game_ids != "all":
-            tracking_df = tracking_df.loc[tracking_df['gameId'].isin(game_ids)].reset_index(drop=True)
-        
+    def load_games(game_ids: list = "all", compact=False, columns=None, periods=None, time_range=None, entity=None):
+        """
+        Loads tracking data for the given games. Only the requested columns are parsed and the period/time/entity
+        predicates are pushed down into the reader (see GameStore.filters), e.g. entity="ball" for ball-only consumers.
+
+        Args:
+            game_ids (list): gameIds to load, or 'all'.
+            compact (bool): Convert to the compact schema (see to_compact).
+            columns (list, optional): Columns to load, all of them by default.
+            periods (list, optional): Periods to keep.
+            time_range (tuple, optional): Inclusive (start, end) wcTime range to keep.
+            entity (str, optional): 'ball', 'players' or a teamId to keep.
+        """
+        return GameStore.load(
+            SOURCE,
+            SRC_PATH,
+            DTYPES,
+            game_ids,
+            TrackingProcessor.to_compact if compact else None,
+            columns,
+            GameStore.filters(periods, time_range, entity),
+        )
+
+    def load_games_parallel(
+        game_ids: list = "all",
+        max_workers=None,
+        preprocess=None,
+        index=False,
+        compact=False,
+        columns=None,
+        periods=None,
+        time_range=None,
+        entity=None,
+    ):
+        """
+        Same result (and row order) as load_games, with the per-game reading and preprocessing spread over a process pool
+        (see GameStore.load_parallel).
+
+        Args:
+            max_workers (int, optional): Pool size, defaults to the number of cores.
+            preprocess (callable or list, optional): Per-game steps run in the workers, e.g. TrackingProcessor.sort_by_time.
+            index (bool): Return a TrackingIndex over the result instead of the DataFrame.
+            compact, columns, periods, time_range, entity: As in load_games.
+        """
+        tracking_df = GameStore.load_parallel(
+            SOURCE,
+            SRC_PATH,
+            DTYPES,
+            game_ids,
+            TrackingProcessor.to_compact if compact else None,
+            columns,
+            GameStore.filters(periods, time_range, entity),
+            preprocess,
+            max_workers,
+        )
+
+        return TrackingIndex(tracking_df) if index else tracking_df
+
+    def sort_by_time(tracking_df):
+        """Stable sort of a game's rows by wcTime (a preprocess step for load_games_parallel)."""
+        return tracking_df.sort_values("wcTime", kind="stable", ignore_index=True)
+
+    def iter_games(game_ids: list = "all", chunksize=1_000_000, compact=False, columns=None, periods=None, time_range=None, entity=None):
+        """Yields (game_id, tracking_df) one game at a time (see GameStore.iter_games), with the same pushdown options as load_games."""
+        filters = GameStore.filters(periods, time_range, entity)
+        for game_id, tracking_df in GameStore.iter_games(SOURCE, SRC_PATH, DTYPES, game_ids, chunksize, columns, filters):
+            yield game_id, TrackingProcessor.to_compact(tracking_df) if compact else tracking_df
+
+    def export_memmap(game_ids: list = "all", chunksize=1_000_000):
+        """
+        One-time export of the tracking data to season-level memmap column files (see MemmapStore), streamed game by game.
+        Numerics use the compact dtypes and the id/name columns are stored as int32 codes into the compact dictionaries
+        (see id_dictionary), so memmap loads have the same categories as compact loads.
+        """
+        return MemmapStore.export(
+            SOURCE, TrackingProcessor.iter_games(game_ids, chunksize), COMPACT_NUMERIC_DTYPES, TrackingProcessor._vocabulary()
+        )
+
+    def load_games_memmap(game_ids: list = "all"):
+        """
+        Near-instant, zero-copy load of exported tracking data (see export_memmap), shared across processes through the OS page cache.
+        Returned frames use the compact schema (float32 coordinates, categorical ids) and are read-only.
+        """
+        return MemmapStore.read(SOURCE, game_ids)
+
+    def to_compact(tracking_df):
+        """
+        Converts tracking data to the compact schema: float32 coordinates/clocks, int64 wcTime, and the id/name columns
+        as categoricals (integer codes, so equality filters like teamId == "-1" compare codes instead of scanning python
+        strings). Comparisons against the original string values keep working unchanged.
+        The categories are the tracking source's vocabulary (see id_dictionary), so compact frames from any game, load or
+        process have identical categories and pd.concat keeps them categorical. Values that aren't in the source (e.g.
+        in a frame built by hand) are appended after it, for that frame only.
+        """
+        tracking_df = tracking_df.astype({col: dtype for col, dtype in COMPACT_NUMERIC_DTYPES.items() if col in tracking_df.columns})
+        vocabulary = TrackingProcessor._vocabulary()
+        for col in COMPACT_CATEGORICAL_COLS:
+            if col in tracking_df.columns:
+                tracking_df[col] = TrackingProcessor._encode(vocabulary.get(col, []), tracking_df[col])
+
         return tracking_df
+
+    def id_dictionary(col):
+        """
+        Returns the dictionary for a compact column (code -> value): the column's sorted values over the whole tracking
+        source, built once and persisted with it (see GameStore.vocabulary). Empty when there's no tracking source.
+        """
+        return list(TrackingProcessor._vocabulary().get(col, []))
+
+    def _vocabulary():
+        if not (GameStore.has_source(SOURCE) or os.path.exists(SRC_PATH)):
+            return {}
+        return GameStore.vocabulary(SOURCE, SRC_PATH, DTYPES, COMPACT_CATEGORICAL_COLS)
+
+    def _encode(vocabulary, values):
+        known = set(vocabulary)
+        extra = sorted(value for value in values.dropna().unique() if value not in known)
+
+        return pd.Categorical(values, categories=vocabulary + extra if extra else vocabulary)
     
     def player_positions_at_moment(moment_df, timestamp, player_ids="all"):
+        # Slice the frame straight out of the time index when given one
+        if isinstance(moment_df, TrackingIndex):
+            moment_df = moment_df.at(timestamp)
+
         # Handle the player_ids input
         if isinstance(player_ids, list):
             pass  # If player_ids is already a list, do nothing
@@ -44,8 +212,11 @@ class TrackingProcessor:
         return moment_df.reset_index(drop=True)
 
     def ball_position_at_moment(moment_df, timestamp):
+        if isinstance(moment_df, TrackingIndex):
+            moment_df = moment_df.at(timestamp)
+
         # Filter the DataFrame for the specified timestamp and the ball (team_id = -1)
-        ball_df = moment_df[(moment_df["wcTime"] == timestamp) & (moment_df["teamId"] == -1)]
+        ball_df = moment_df[(moment_df["wcTime"] == timestamp) & (moment_df["teamId"] == "-1")]
         
         # Drop unnecessary columns
         ball_df = ball_df.drop(["gameId", "teamAbbr", "period", "wcTime", "gcTime", "scTime", "gameDate"], axis=1)
@@ -53,11 +224,18 @@ class TrackingProcessor:
         return ball_df.reset_index(drop=True)
     
     def extract_possession_moments(tracking_df, possession):
-        """Extract moments for the specified time frame (as defined by the incoming possession dict) from the game DataFrame."""
+        """Extract moments for the specified time frame (as defined by the incoming possession dict) from the game DataFrame (or TrackingIndex)."""
+        if isinstance(tracking_df, TrackingIndex):
+            # Straight from the possession offsets when the index has them
+            if tracking_df.has_possession(possession.get("possId")):
+                return tracking_df.possession(possession["possId"])
+            return tracking_df.between(possession["wcStart"], possession["wcEnd"], possession.get("gameId"))
         return tracking_df.loc[(tracking_df["wcTime"] >= possession["wcStart"]) & (tracking_df["wcTime"] <= possession["wcEnd"])].reset_index(drop=True)
     
     def extract_moment_from_timestamps(tracking_df, start_time, end_time):
-        """Extract moments for the specified time frame from the game DataFrame."""
+        """Extract moments for the specified time frame from the game DataFrame (or TrackingIndex)."""
+        if isinstance(tracking_df, TrackingIndex):
+            return tracking_df.between(start_time, end_time)
         return tracking_df.loc[(tracking_df["wcTime"] >= start_time) & (tracking_df["wcTime"] <= end_time)].reset_index(drop=True)
     
     def extract_offensive_defensive_players(tracking_df, off_team_id):
@@ -66,39 +244,112 @@ class TrackingProcessor:
         
         return off_ids, def_ids
     
-    def mirror_court_data(tracking_df, x_col_name='x', y_col_name='y', basket_x=41.75):
+    def mirror_court_data(tracking_df, x_col_name='x', y_col_name='y', basket_x=41.75, inplace=False, col_pairs=None):
         """
         Mirrors data points across the center line of a basketball court based on the basket_x value provided.
         This ensures all data points are standardized to one half of the court, assuming all action is towards the specified basket.
+        Rows with a basket_x column are only mirrored when attacking the other basket, otherwise every row is mirrored.
 
         Args:
             tracking_df (DataFrame): DataFrame containing the data with coordinates to be mirrored.
-            column_name (str): The name of the column in the DataFrame that contains the x-coordinates.
+            x_col_name (str): The name of the column in the DataFrame that contains the x-coordinates.
+            y_col_name (str): The name of the column in the DataFrame that contains the y-coordinates.
             basket_x (float): The x-coordinate of the basket to which data should be mirrored. This standardizes
                             the data as if all action is moving towards this specified basket.
+            inplace (bool): Overwrite the columns of tracking_df instead of returning a mirrored copy.
+            col_pairs (list, optional): (x, y) column pairs to mirror together, e.g. [('x', 'y'), ('shot_x', 'shot_y')].
+                            Defaults to [(x_col_name, y_col_name)].
 
         Returns:
             DataFrame: A DataFrame with the specified coordinates mirrored onto the desired half of the court.
         """
-        # Mirror the x-coordinates based on whether they match the specified basket_x
-        tracking_df = tracking_df.copy()
+        if not inplace:
+            tracking_df = tracking_df.copy()
+
+        # Mirror rows attacking the other basket (all rows when there's no basket_x column)
         if "basket_x" in tracking_df.columns:
-            tracking_df.loc[:, x_col_name] = tracking_df.apply(
-                lambda row: -row[x_col_name] if row["basket_x"] != basket_x else row[x_col_name],
-                axis=1
-            )
-            tracking_df.loc[:, y_col_name] = tracking_df.apply(
-                lambda row: -row[y_col_name] if row["basket_x"] != basket_x else row[x_col_name],
-                axis=1
-            )
+            flip = (tracking_df["basket_x"] != basket_x).to_numpy()
         else:
-            tracking_df.loc[:, x_col_name] = tracking_df.apply(
-                lambda row: -row[x_col_name],
-                axis=1
-            )
-            tracking_df.loc[:, y_col_name] = tracking_df.apply(
-                lambda row: -row[y_col_name],
-                axis=1
+            flip = np.ones(len(tracking_df), dtype=bool)
+
+        # Assign whole columns rather than writing into the existing buffers, which may be shared/read-only (see FrameCache)
+        for x_col, y_col in col_pairs or [(x_col_name, y_col_name)]:
+            for col in (x_col, y_col):
+                values = tracking_df[col].to_numpy()
+                tracking_df[col] = np.where(flip, -values, values)
+
+        return tracking_df
+
+    def normalize_attack(tracking_df, possessions_df):
+        """
+        Adds nx/ny: the coordinates rotated so every possession attacks ATTACK_BASKET_X (same rotation as
+        mirror_court_data). Each frame takes the basketX of the possession it falls in, frames between possessions
+        take the previous possession's (the first possession's before the opening tip), so downstream features can
+        read one canonical half-court frame without mirroring per call.
+
+        Args:
+            tracking_df (DataFrame): Tracking data for one or more games.
+            possessions_df (DataFrame): Possessions covering those games (or an index from PossessionProcessor.build_interval_index).
+
+        Returns:
+            DataFrame: tracking_df with the nx and ny columns added.
+        """
+        basket_x = PossessionProcessor.lookup_possessions(
+            possessions_df, tracking_df["wcTime"], tracking_df["gameId"], columns=("basketX",)
+        )["basketX"].to_numpy(dtype=float, copy=True)  # Filled in below, to_numpy gives read-only views under copy-on-write
+
+        # Frames outside any possession keep the previous/next possession's direction
+        for direction in ("backward", "forward"):
+            missing = np.flatnonzero(np.isnan(basket_x))
+            if not len(missing):
+                break
+            basket_x[missing] = TrackingProcessor._nearest_basket_x(
+                possessions_df, tracking_df["wcTime"].to_numpy()[missing], tracking_df["gameId"].to_numpy()[missing], direction
             )
 
+        # Rows without a direction (no possessions for the game) are left NaN
+        sign = np.where(basket_x == ATTACK_BASKET_X, 1, np.where(np.isnan(basket_x), np.nan, -1))
+        tracking_df = tracking_df.copy()
+        for col in ("x", "y"):
+            values = tracking_df[col].to_numpy()
+            tracking_df["n" + col] = (values * sign).astype(values.dtype)
+
         return tracking_df
+
+    def has_attack_coords(df, x_col="x", y_col="y"):
+        """Whether df carries the attack-normalized counterparts of x_col/y_col (see normalize_attack)."""
+        return {TrackingProcessor.attack_col(x_col), TrackingProcessor.attack_col(y_col)}.issubset(df.columns)
+
+    def attack_col(col):
+        """Name of the attack-normalized counterpart of a coordinate column, e.g. 'x' -> 'nx', 'shot_x' -> 'shot_nx'."""
+        return col[:-1] + "n" + col[-1]
+
+    def to_attack_frame(df, basket_x=ATTACK_BASKET_X, col_pairs=(("x", "y"),)):
+        """
+        Replaces the coordinate columns with their attack-normalized counterparts, oriented towards basket_x.
+        This is what mirror_court_data computes per call, read straight from the columns added at ingest.
+        """
+        sign = 1 if basket_x == ATTACK_BASKET_X else -1
+        return df.assign(
+            **{
+                col: df[TrackingProcessor.attack_col(col)] * sign
+                for col_pair in col_pairs
+                for col in col_pair
+            }
+        )
+
+    def _nearest_basket_x(possessions_df, timestamps, game_ids, direction):
+        # basketX of the last possession to start before (backward) / first to start after (forward) each timestamp
+        query = pd.DataFrame({"wcTime": timestamps, "gameId": np.asarray(game_ids, dtype=object), "row": np.arange(len(timestamps))})
+        # Same key dtype on both sides (pandas 3 infers a string dtype for the query's gameIds), as in lookup_possessions
+        intervals = possessions_df[["gameId", "wcStart", "basketX"]].astype({"gameId": query["gameId"].dtype})
+        matched = pd.merge_asof(
+            query.sort_values("wcTime", kind="stable"),
+            intervals.sort_values("wcStart", kind="stable"),
+            left_on="wcTime",
+            right_on="wcStart",
+            by="gameId",
+            direction=direction,
+        ).sort_values("row")
+
+        return matched["basketX"].to_numpy(dtype=float)
@@ -1,29 +1,93 @@
 import pandas as pd
 import numpy as np
-from shapely.geometry import Point
+import shapely
+from code.io.FrameCube import FrameCube, PLAYERS_PER_TEAM
 from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingProcessor import TrackingProcessor, ATTACK_BASKET_X
 from code.util.ShotRegionUtil import ShotRegionUtil
+from code.util.ZoneRaster import ZoneRaster
+from scipy.optimize import linear_sum_assignment
 from sklearn.metrics import brier_score_loss
 
+# Order regions are checked in when classifying a shot, shots on a shared border go to the first match
+SHOT_REGION_PRECEDENCE = [
+    "BEYOND_HALFCOURT",
+    "CLOSE_RANGE",
+    "LEFT_BASELINE_MID",
+    "RIGHT_BASELINE_MID",
+    "LEFT_ELBOW_MID",
+    "RIGHT_ELBOW_MID",
+    "LEFT_CORNER_THREE",
+    "RIGHT_CORNER_THREE",
+    "LEFT_WING_THREE",
+    "RIGHT_WING_THREE",
+    "CENTER_THREE",
+]
+
+# Court dimensions (feet) used by the court predicates
+COURT_LENGTH = 94
+COURT_WIDTH = 50
+PAINT_WIDTH_HALF = 8  # The paint is 16 feet wide total
+PAINT_LENGTH = 19  # Length from baseline to free throw line
+FREE_THROW_LINE_DISTANCE = 19  # Distance from the baseline to the free throw line
+BASKET_RADIUS = 4  # The radius around the basket to consider 'under the basket'
+CORNER_THREE_DISTANCE = 22  # 3-point distance at the corners
+TOP_KEY_THREE_DISTANCE = 23.75  # 3-point distance at the top of the arc
+THREE_PT_LINE_TRANSITION_Y = 14  # Where the 3-point line starts to straighten
+SIDELINE_BUFFER = 3  # Define 'near' as within 3 feet of the sideline
+
+# Shot clock buckets (seconds left) for the OREB PPP breakdowns, see FeatureUtil.shot_clock_bucket
+SHOT_CLOCK_BUCKETS = [0, 4, 7, 15, 18, 22, 24]
+SHOT_CLOCK_BUCKET_LABELS = ["0-4", "4-7", "7-15", "15-18", "18-22", "22-24"]
+
+# Missed shot context FeatureUtil.calculate_oreb_ppp can break OREB PPP down by
+OREB_PPP_BREAKDOWNS = ["shot_classification", "period", "shot_clock_bucket"]
+
+# Predicates evaluated by FeatureUtil.court_context, each f(x, y, basket_x) -> mask
+COURT_PREDICATES = [
+    "is_in_paint",
+    "is_under_basket",
+    "is_in_zone_of_death",
+    "is_past_far_three_point_line",
+    "is_out_of_bounds",
+    "is_near_sideline",
+    "is_at_free_throw_line",
+]
+
+# Predicates that take x/y(/basket_x) arrays and return a mask, find_ball_moment(s) call these once over all frames
+VECTORIZED_PREDICATES = COURT_PREDICATES + [
+    "is_in_close_range",
+    "is_in_left_corner_three",
+    "is_in_right_corner_three",
+    "is_in_center_three",
+    "is_in_left_wing_three",
+    "is_in_right_wing_three",
+    "is_in_left_baseline_mid",
+    "is_in_right_baseline_mid",
+    "is_in_left_elbow_mid",
+    "is_in_right_elbow_mid",
+    "is_beyond_halfcourt",
+]
+
 
 class FeatureUtil:
     # Court location features
     # ----------------------------------------------------
     def is_in_region(x, y, region: ShotRegionUtil, basket_x):
         """
-        Generic method to determine if a position (x, y) is in the given shot region.
+        Generic method to determine if a position (x, y) is in the given shot region, elementwise for arrays.
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
         region (ShotRegionUtil): The region to check against.
-        basket_x (float): The x-coordinate of the basket, determines which half of the court to consider.
+        basket_x (float or array-like): The x-coordinate of the basket, determines which half of the court to consider.
         Returns:
-        bool: True if the position is in the specified region, otherwise False.
+        bool or ndarray: True if the position is in the specified region, otherwise False.
         """
-        point = Point(x if basket_x > 0 else -x, y)
+        x = np.where(np.asarray(basket_x) > 0, x, np.negative(x))
 
-        # Use intersects instead of contains to include boundary points
-        return region.intersects(point)
+        # Use intersects instead of contains to include boundary points (elementwise for arrays)
+        return shapely.intersects_xy(region, x, y)
 
     def is_in_close_range(x, y, basket_x):
         return FeatureUtil.is_in_region(
@@ -80,190 +144,188 @@ class FeatureUtil:
             x, y, ShotRegionUtil.regions["BEYOND_HALFCOURT"], basket_x
         )
 
-    def is_in_paint(x, y):
+    def is_in_paint(x, y, basket_x):
         """
-        Determine if a position (x, y) is in the paint of an NBA basketball court centered at (0, 0).
-        The paint is 16 feet wide and extends from the baseline up to 19 feet towards the center.
+        Determine if a position (x, y) is in the paint of an NBA basketball court, relative to a specific basket.
+        Works elementwise on arrays (e.g. every row of a game's tracking data), returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position (horizontal distance from the centerline in feet).
-        y (float): The y-coordinate of the position (vertical distance from the centerline in feet).
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket, used to determine which half of the court to consider.
 
         Returns:
-        bool: True if the position is in the paint, otherwise False.
+        bool or ndarray: True if the position is in the paint of the specified half of the court, otherwise False.
         """
-        # Dimensions of the paint area
-        PAINT_WIDTH_HALF = 8  # Half the width of the paint (16 feet total)
-        PAINT_LENGTH = 19  # Length of the paint from the baseline towards the center
-
-        # Adjust for the paint being vertically centered on the y-axis
-        # The paint extends from the baseline to 19 feet towards the center
-        in_vertical_bounds = abs(y) <= PAINT_LENGTH
+        x, y, basket_x = np.asarray(x), np.asarray(y), np.asarray(basket_x)
 
-        # The paint is horizontally centered around the basket (which is centered at x=0)
-        in_horizontal_bounds = -PAINT_WIDTH_HALF <= x <= PAINT_WIDTH_HALF
+        # Determine which half of the court to consider based on basket_x
+        in_width = (-PAINT_WIDTH_HALF <= x) & (x <= PAINT_WIDTH_HALF)
+        in_length = np.where(basket_x > 0, (0 <= y) & (y <= PAINT_LENGTH), (-PAINT_LENGTH <= y) & (y <= 0))
 
-        return in_vertical_bounds and in_horizontal_bounds
+        return in_width & in_length
 
     def is_past_far_three_point_line(x, y, basket_x):
         """
         Determine if a position is past the far three-point line relative to a given basket location on the x-axis.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket, either 41.75 or -41.75.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket, either 41.75 or -41.75.
 
         Returns:
-        bool: True if the position is past the far three-point line towards the offensive basket, otherwise False.
+        bool or ndarray: True if the position is past the far three-point line towards the offensive basket, otherwise False.
         """
-        # Correctly calculate the far 3-point line relative to the offensive basket
-        if basket_x > 0:
-            far_three_point_line = basket_x - 23.75
-        else:
-            far_three_point_line = basket_x + 23.75
+        x, basket_x = np.asarray(x), np.asarray(basket_x)
 
-        # Adjust the check to consider the direction towards the offensive basket
-        return (basket_x > 0 and x > far_three_point_line) or (
-            basket_x < 0 and x < far_three_point_line
-        )
+        # The far 3-point line is measured from the offensive basket, towards the other end of the court
+        far_three_point_line = np.where(basket_x > 0, basket_x - TOP_KEY_THREE_DISTANCE, basket_x + TOP_KEY_THREE_DISTANCE)
+
+        return ((basket_x > 0) & (x > far_three_point_line)) | ((basket_x < 0) & (x < far_three_point_line))
 
     def is_in_zone_of_death(x, y, basket_x):
         """
         Determine if a player is in the 'zone of death' which is defined as the area in the backcourt
         between the half-court and the 3-point line extending to the baseline, taking into account the curved and straight portions of the 3-point line.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the player's position.
-        y (float): The y-coordinate of the player's position.
-        basket_x (float): The x-coordinate of the basket, determines which side is the shooting basket.
+        x (float or array-like): The x-coordinate of the player's position.
+        y (float or array-like): The y-coordinate of the player's position.
+        basket_x (float or array-like): The x-coordinate of the basket, determines which side is the shooting basket.
 
         Returns:
-        bool: True if the player is in the 'zone of death', False otherwise.
+        bool or ndarray: True if the player is in the 'zone of death', False otherwise.
         """
-        half_court_x = 0
-        corner_three_distance = 22  # 3-point distance at the corners
-        top_key_three_distance = 23.75  # 3-point distance at the top of the arc
-        three_pt_line_transition_x = 14  # Where the 3-point line starts to straighten
+        x, y, basket_x = np.asarray(x), np.asarray(y), np.asarray(basket_x)
 
         # Determine if the player is in the backcourt
-        in_backcourt = (x < half_court_x) if basket_x > 0 else (x > half_court_x)
-
-        # Check if the player's y position is within the range that includes the 3-point arc
-        if (
-            abs(y) <= three_pt_line_transition_x
-        ):  # Within the corners where the line is straight
-            distance_from_basket = np.sqrt((x - basket_x) ** 2 + y**2)
-            in_zone_of_death = (
-                in_backcourt and distance_from_basket > corner_three_distance
-            )
-        else:  # Within the arc
-            distance_from_basket = np.sqrt((x - basket_x) ** 2 + y**2)
-            in_zone_of_death = (
-                in_backcourt and distance_from_basket > top_key_three_distance
-            )
-
-        return in_zone_of_death
-
-    def is_in_paint(x, y, basket_x):
-        """
-        Determine if a position (x, y) is in the paint of an NBA basketball court, relative to a specific basket.
+        in_backcourt = np.where(basket_x > 0, x < 0, x > 0)
 
-        Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket, used to determine which half of the court to consider.
-
-        Returns:
-        bool: True if the position is in the paint of the specified half of the court, otherwise False.
-        """
-        PAINT_WIDTH_HALF = 8  # The paint is 16 feet wide total
-        PAINT_LENGTH = 19  # Length from baseline to free throw line
+        # Straight portion of the 3-point line within the corners, the arc beyond
+        three_distance = np.where(np.abs(y) <= THREE_PT_LINE_TRANSITION_Y, CORNER_THREE_DISTANCE, TOP_KEY_THREE_DISTANCE)
+        distance_from_basket = np.sqrt((x - basket_x) ** 2 + y**2)
 
-        # Determine which half of the court to consider based on basket_x
-        if basket_x > 0:
-            return -PAINT_WIDTH_HALF <= x <= PAINT_WIDTH_HALF and 0 <= y <= PAINT_LENGTH
-        else:
-            return (
-                -PAINT_WIDTH_HALF <= x <= PAINT_WIDTH_HALF and -PAINT_LENGTH <= y <= 0
-            )
+        return in_backcourt & (distance_from_basket > three_distance)
 
     def is_under_basket(x, y, basket_x):
         """
         Determine if a position (x, y) is directly under the basket on a standard NBA basketball court, relative to a specific basket.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket, determines which basket to consider.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket, determines which basket to consider.
 
         Returns:
-        bool: True if the position is under the specified basket, otherwise False.
+        bool or ndarray: True if the position is under the specified basket, otherwise False.
         """
-        BASKET_RADIUS = 4  # The radius around the basket to consider 'under the basket'
+        x, y, basket_x = np.asarray(x), np.asarray(y), np.asarray(basket_x)
 
-        # Use basket_x to adjust y-coordinate range based on court half
-        basket_y = 0  # Basket y-coordinate is always at the center line of the width
+        # Basket y-coordinate is always at the center line of the width
         return (x - basket_x) ** 2 + y**2 <= BASKET_RADIUS**2
 
     def is_out_of_bounds(x, y, basket_x):
         """
         Determine if a position (x, y) is out of bounds on a standard NBA basketball court, considering the relevant half.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket, used to determine which half of the court to consider.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket, used to determine which half of the court to consider.
 
         Returns:
-        bool: True if the position is out of bounds in the specified half of the court, otherwise False.
+        bool or ndarray: True if the position is out of bounds in the specified half of the court, otherwise False.
         """
-        COURT_LENGTH = 94  # Length of the court in feet
-        COURT_WIDTH = 50  # Width of the court in feet
+        x, y, basket_x = np.asarray(x), np.asarray(y), np.asarray(basket_x)
 
-        in_half_court = x > 0 if basket_x > 0 else x < 0
-        in_court_bounds = (
-            0 <= x <= COURT_LENGTH and -COURT_WIDTH / 2 <= y <= COURT_WIDTH / 2
-        )
+        in_half_court = np.where(basket_x > 0, x > 0, x < 0)
+        in_court_bounds = (0 <= x) & (x <= COURT_LENGTH) & (-COURT_WIDTH / 2 <= y) & (y <= COURT_WIDTH / 2)
 
-        return not in_half_court or not in_court_bounds
+        return ~in_half_court | ~in_court_bounds
 
     def is_at_free_throw_line(x, y, basket_x):
         """
         Determine if a position (x, y) is at the free throw line on a standard NBA basketball court, relative to a specific basket.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket, used to determine which half of the court to consider.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket, used to determine which half of the court to consider.
 
         Returns:
-        bool: True if the position is at the free throw line of the specified half of the court, otherwise False.
+        bool or ndarray: True if the position is at the free throw line of the specified half of the court, otherwise False.
         """
-        FREE_THROW_LINE_DISTANCE = (
-            19  # Distance from the baseline to the free throw line
-        )
+        x, y, basket_x = np.asarray(x), np.asarray(y), np.asarray(basket_x)
 
-        is_correct_half = (x > 0) if basket_x > 0 else (x < 0)
+        is_correct_half = np.where(basket_x > 0, x > 0, x < 0)
 
-        return is_correct_half and -1 <= x <= 1 and y == -FREE_THROW_LINE_DISTANCE
+        return is_correct_half & (-1 <= x) & (x <= 1) & (y == -FREE_THROW_LINE_DISTANCE)
 
     def is_near_sideline(x, y, basket_x):
         """
         Determine if a position (x, y) is near the sideline of a basketball court.
+        Works elementwise on arrays, returning a boolean mask.
 
         Args:
-        x (float): The x-coordinate of the position.
-        y (float): The y-coordinate of the position.
-        basket_x (float): The x-coordinate of the basket used to determine the relevance of the position.
+        x (float or array-like): The x-coordinate of the position.
+        y (float or array-like): The y-coordinate of the position.
+        basket_x (float or array-like): The x-coordinate of the basket used to determine the relevance of the position.
 
         Returns:
-        bool: True if the position is near the sideline, otherwise False.
+        bool or ndarray: True if the position is near the sideline, otherwise False.
         """
-        COURT_WIDTH_HALF = 25  # Half the NBA court width
-        SIDELINE_BUFFER = 3  # Define 'near' as within 3 feet of the sideline
+        # Broadcast so array inputs always get a mask of the full shape back
+        x, y, basket_x = np.broadcast_arrays(np.asarray(x), np.asarray(y), np.asarray(basket_x))
+
+        return np.abs(y) >= (COURT_WIDTH / 2 - SIDELINE_BUFFER)
 
-        return abs(y) >= (COURT_WIDTH_HALF - SIDELINE_BUFFER)
+    def court_context(frames, basket_x=None):
+        """
+        Evaluates every court predicate in COURT_PREDICATES for every position in one vectorized pass, e.g. for all
+        rows of a game's tracking data at once instead of calling the predicates row by row.
+
+        Args:
+        frames (DataFrame or FrameCube): Long-format tracking data (x/y columns) or a game's frame tensor.
+        basket_x (float or array-like, optional): The basket being attacked, a scalar or one value per row (per frame for
+            a FrameCube). For a DataFrame, defaults to its basketX column, or to the attack-normalized nx/ny
+            coordinates (towards ATTACK_BASKET_X) when there's no basketX column.
+
+        Returns:
+        DataFrame or dict: For a DataFrame, one boolean column per predicate aligned with its index. For a FrameCube,
+            predicate name -> (n_frames, 11) boolean mask over its entity slots.
+        """
+        if isinstance(frames, FrameCube):
+            if basket_x is None:
+                raise ValueError("basket_x is required to evaluate court predicates over a FrameCube")
+            basket_x = np.asarray(basket_x, dtype=float)
+            if basket_x.ndim == 1:
+                basket_x = basket_x[:, None]  # One basket per frame, shared by its slots
+            x, y = frames.xy[..., 0], frames.xy[..., 1]
+            return {name: getattr(FeatureUtil, name)(x, y, basket_x) for name in COURT_PREDICATES}
+
+        x_col, y_col = "x", "y"
+        if basket_x is None:
+            if "basketX" in frames.columns:
+                basket_x = frames["basketX"].to_numpy(dtype=float)
+            elif TrackingProcessor.has_attack_coords(frames):
+                x_col, y_col = TrackingProcessor.attack_col("x"), TrackingProcessor.attack_col("y")
+                basket_x = ATTACK_BASKET_X
+            else:
+                raise ValueError("basket_x is required when frames has neither a basketX column nor nx/ny coordinates")
+
+        x = frames[x_col].to_numpy(dtype=float)
+        y = frames[y_col].to_numpy(dtype=float)
+        basket_x = np.broadcast_to(np.asarray(basket_x, dtype=float), x.shape)
+
+        return pd.DataFrame(
+            {name: getattr(FeatureUtil, name)(x, y, basket_x) for name in COURT_PREDICATES}, index=frames.index
+        )
 
     def is_leading_offensive_player(df, off_team_id, basket_x):
         """
@@ -366,16 +428,109 @@ class FeatureUtil:
         # Convert the list of results into a DataFrame
         return pd.DataFrame(closest_defenders)
 
-    def find_ball_moment(df, condition_function, basket_x):
+    def find_closest_defenders_batch(frames, off_id, timestamps=None, game_ids=None, unique_defender=False):
+        """
+        Batch version of find_closest_defenders over many moments at once (e.g. every shot of a season, or every frame
+        of a game). Positions come from FrameCube tensors, so the 5x5 offense/defense distances of all the moments are
+        computed in one broadcast instead of per player. With unique_defender, each moment's matchups are the optimal
+        one-to-one assignment (minimum total distance, via linear_sum_assignment) rather than the greedy order.
+
+        Args:
+        frames (FrameCube, dict or DataFrame): A game's FrameCube, cubes keyed by gameId (see FrameCube.from_games), or
+            long-format tracking data for one or more games.
+        off_id (str or array-like): The offensive teamId, for all moments or one per timestamp.
+        timestamps (array-like, optional): wcTime of each moment, every frame of every game by default.
+        game_ids (array-like, optional): gameId of each timestamp, required when frames holds more than one game.
+        unique_defender (bool): If True, assigns each defender to at most one offensive player.
+
+        Returns:
+        DataFrame: One row per offensive player per moment with gameId, wcTime, off_player_id, closest_defender_id and
+            distance. Moments without an exact frame, and players without a defender, have no rows.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = FrameCube.from_games(frames)
+        if isinstance(frames, FrameCube):
+            frames = {frames.game_id: frames}
+
+        if timestamps is None:
+            game_ids = np.concatenate([np.full(len(cube), game_id, dtype=object) for game_id, cube in frames.items()])
+            timestamps = np.concatenate([cube.wc_time for cube in frames.values()])
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))
+        if game_ids is None:
+            if len(frames) > 1:
+                raise ValueError("game_ids is required when frames holds more than one game")
+            game_ids = np.full(len(timestamps), next(iter(frames)), dtype=object)
+        game_ids = np.broadcast_to(np.asarray(game_ids, dtype=object), timestamps.shape)
+        off_ids = np.broadcast_to(np.asarray(off_id, dtype=object), timestamps.shape)
+
+        results = []
+        for game_id, cube in frames.items():
+            rows = np.flatnonzero(game_ids == game_id)
+            frame_idx = cube.frame_index(timestamps[rows])
+            # Offensive team's slot block in the cube (0 or 1), -1 when it isn't one of the game's teams
+            off_num = np.full(len(rows), -1)
+            for num, team_id in enumerate(cube.team_ids):
+                off_num[off_ids[rows] == team_id] = num
+            keep = (frame_idx >= 0) & (off_num >= 0)
+            if not keep.any():
+                continue
+            rows, frame_idx, off_num = rows[keep], frame_idx[keep], off_num[keep]
+
+            # (moments, 5, 5) offense x defense distances, NaN where a slot is empty
+            block = np.arange(PLAYERS_PER_TEAM)
+            off_slots = off_num[:, None] * PLAYERS_PER_TEAM + block
+            def_slots = (1 - off_num)[:, None] * PLAYERS_PER_TEAM + block
+            xy = cube.xy[frame_idx].astype(float)
+            moments = np.arange(len(frame_idx))[:, None]
+            diff = xy[moments, off_slots][:, :, None, :] - xy[moments, def_slots][:, None, :, :]
+            distances = np.sqrt(np.sum(diff**2, axis=-1))
+            distances = np.where(np.isnan(distances), np.inf, distances)
+
+            if unique_defender:
+                def_pick = np.full(off_slots.shape, -1)
+                for moment in range(len(frame_idx)):
+                    off_valid = np.flatnonzero(np.isfinite(distances[moment]).any(axis=1))
+                    def_valid = np.flatnonzero(np.isfinite(distances[moment]).any(axis=0))
+                    if not len(off_valid) or not len(def_valid):
+                        continue
+                    off_pos, def_pos = linear_sum_assignment(distances[moment][np.ix_(off_valid, def_valid)])
+                    def_pick[moment, off_valid[off_pos]] = def_valid[def_pos]
+            else:
+                def_pick = np.argmin(distances, axis=2)
+                def_pick[~np.isfinite(distances).any(axis=2)] = -1
+
+            moment_num, off_num_slot = np.nonzero(def_pick >= 0)
+            def_num_slot = def_pick[moment_num, off_num_slot]
+            frame_num = frame_idx[moment_num]
+            results.append(
+                pd.DataFrame(
+                    {
+                        "gameId": game_id,
+                        "wcTime": cube.wc_time[frame_num],
+                        "off_player_id": cube.player_ids[frame_num, off_slots[moment_num, off_num_slot]],
+                        "closest_defender_id": cube.player_ids[frame_num, def_slots[moment_num, def_num_slot]],
+                        "distance": distances[moment_num, off_num_slot, def_num_slot],
+                    }
+                )
+            )
+
+        if not results:
+            return pd.DataFrame(columns=["gameId", "wcTime", "off_player_id", "closest_defender_id", "distance"])
+
+        return pd.concat(results, ignore_index=True)
+
+    def find_ball_moment(df, condition_function, basket_x, vectorized=None):
         """
         Find the first moment when the ball meets a specified condition.
 
         Args:
         df (DataFrame): DataFrame containing the tracking data of the ball, which includes
                         'x', 'y', 'timestamp', and 'teamId' columns.
-        condition_function (function): A function that takes x, y, basket_x and returns a boolean
-                                    indicating whether the condition is met.
+        condition_function (function): A predicate f(x, y, basket_x) indicating whether the condition is met.
         basket_x (float): The x-coordinate of the basket which the offensive team is attacking.
+        vectorized (bool, optional): Whether condition_function takes x/y arrays and returns a boolean mask, in which
+                                    case it's called once over the whole trajectory, otherwise it's called once per row.
+                                    Defaults to True for the predicates in VECTORIZED_PREDICATES and False for any other.
 
         Returns:
         dict: A dictionary containing the timestamp and position ('x' and 'y') of the ball
@@ -384,13 +539,129 @@ class FeatureUtil:
         # Filter the DataFrame to include only the ball data
         ball_df = df[df["teamId"] == "-1"]
 
-        # Loop through the ball data to check when it meets the condition
-        for index, row in ball_df.iterrows():
-            if condition_function(row["x"], row["y"], basket_x):
-                return {"timestamp": row["wcTime"], "x": row["x"], "y": row["y"]}
+        # Evaluate the condition over the whole trajectory at once and take the first hit
+        hits = np.flatnonzero(
+            FeatureUtil._evaluate_condition(
+                condition_function, ball_df["x"].to_numpy(dtype=float), ball_df["y"].to_numpy(dtype=float), basket_x, vectorized
+            )
+        )
+        if not len(hits):
+            # Return None if the ball never meets the condition
+            return None
+
+        row = ball_df.iloc[hits[0]]
+        return {"timestamp": row["wcTime"], "x": row["x"], "y": row["y"]}
+
+    def _evaluate_condition(condition_function, x, y, basket_x, vectorized=None):
+        """
+        Boolean mask of condition_function over x/y arrays (basket_x a scalar or one value per row): a single call for
+        vectorized predicates, one call per row with scalars otherwise. vectorized=None looks the predicate up in
+        VECTORIZED_PREDICATES.
+        """
+        if vectorized is None:
+            name = getattr(condition_function, "__name__", None)
+            vectorized = name in VECTORIZED_PREDICATES and getattr(FeatureUtil, name) is condition_function
+
+        if vectorized:
+            mask = np.asarray(condition_function(x, y, basket_x))
+            if mask.shape != x.shape:
+                raise ValueError(f"Vectorized predicate returned shape {mask.shape}, expected one value per row {x.shape}")
+            return mask.astype(bool)
+
+        basket_x = np.broadcast_to(np.asarray(basket_x, dtype=float), x.shape)
+        return np.fromiter(
+            (bool(condition_function(*values)) for values in zip(x.tolist(), y.tolist(), basket_x.tolist())), dtype=bool, count=len(x)
+        )
+
+    def find_ball_moments(tracking_df, windows_df, condition, basket_x=None, start_col="wcStart", end_col="wcEnd", vectorized=None):
+        """
+        Batch version of find_ball_moment: the first ball frame meeting a condition within every window (e.g. all
+        possessions or transition opportunities of a season) in one pass. The ball frames of each window are laid out
+        back to back, the condition is evaluated over all of them at once, and each window's first hit is found with a
+        searchsorted over the hits instead of a per-row loop.
+
+        Args:
+        tracking_df (DataFrame): Tracking data for the windows' games (only the ball rows are used).
+        windows_df (DataFrame): One row per window with gameId and its inclusive start/end wcTime, e.g. possessions.
+        condition (callable or array-like): A predicate f(x, y, basket_x) (e.g. is_past_far_three_point_line), or a
+            precomputed boolean mask aligned with tracking_df's rows (e.g. a court_context column).
+        basket_x (float or array-like, optional): The basket attacked in each window. Defaults to windows_df's basketX column,
+            or to the attack-normalized nx/ny coordinates (towards ATTACK_BASKET_X) when there's no basketX column.
+        start_col (str): Window start wcTime column.
+        end_col (str): Window end wcTime column.
+        vectorized (bool, optional): Whether a callable condition takes arrays, as in find_ball_moment.
 
-        # Return None if the ball never meets the condition
-        return None
+        Returns:
+        DataFrame: Aligned with windows_df's index, the timestamp (<NA> if the ball never meets the condition) and
+            ball position ('x' and 'y', NaN if never) of each window's first qualifying frame.
+        """
+        x_col, y_col = "x", "y"
+        if callable(condition) and basket_x is None:
+            if "basketX" in windows_df.columns:
+                basket_x = windows_df["basketX"].to_numpy(dtype=float)
+            elif TrackingProcessor.has_attack_coords(tracking_df):
+                x_col, y_col = TrackingProcessor.attack_col("x"), TrackingProcessor.attack_col("y")
+                basket_x = ATTACK_BASKET_X
+            else:
+                raise ValueError("basket_x is required when windows_df has no basketX column and tracking_df has no nx/ny coordinates")
+
+        # Ball frames grouped by game, in time order
+        is_ball = (tracking_df["teamId"] == "-1").to_numpy()
+        ball_rows = np.flatnonzero(is_ball)
+        ball_games = tracking_df["gameId"].to_numpy(dtype=object)[ball_rows]
+        ball_times = tracking_df["wcTime"].to_numpy(dtype=np.int64)[ball_rows]
+        order = np.lexsort((ball_times, ball_games))
+        ball_rows, ball_games, ball_times = ball_rows[order], ball_games[order], ball_times[order]
+
+        # Each window's [lo, hi) range of ball frames
+        window_games = windows_df["gameId"].to_numpy(dtype=object)
+        starts = windows_df[start_col].to_numpy(dtype=float)
+        ends = windows_df[end_col].to_numpy(dtype=float)
+        lo = np.zeros(len(windows_df), dtype=np.int64)
+        hi = np.zeros(len(windows_df), dtype=np.int64)
+        game_ids, game_starts = np.unique(ball_games, return_index=True)
+        game_ends = np.r_[game_starts[1:], len(ball_games)]
+        for game_id, game_start, game_end in zip(game_ids, game_starts, game_ends):
+            windows = np.flatnonzero(window_games == game_id)
+            times = ball_times[game_start:game_end]
+            lo[windows] = game_start + np.searchsorted(times, starts[windows], side="left")
+            hi[windows] = game_start + np.searchsorted(times, ends[windows], side="right")
+
+        # Frames of all the windows back to back (NaN bounds give empty windows)
+        lengths = np.maximum(hi - lo, 0)
+        offsets = np.r_[0, np.cumsum(lengths)]
+        window_num = np.repeat(np.arange(len(windows_df)), lengths)
+        frames = ball_rows[np.repeat(lo, lengths) + np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)]
+
+        if callable(condition):
+            basket_x = np.broadcast_to(np.asarray(basket_x, dtype=float), (len(windows_df),))
+            mask = FeatureUtil._evaluate_condition(
+                condition,
+                tracking_df[x_col].to_numpy(dtype=float)[frames],
+                tracking_df[y_col].to_numpy(dtype=float)[frames],
+                basket_x[window_num],
+                vectorized,
+            )
+        else:
+            mask = np.asarray(condition, dtype=bool)[frames]
+
+        # First hit at or after each window's start, kept when it's still inside the window
+        hits = np.flatnonzero(mask)
+        first = np.searchsorted(hits, offsets[:-1])
+        found = first < len(hits)
+        found[found] = hits[first[found]] < offsets[1:][found]
+        first_rows = frames[hits[first[found]]]
+
+        timestamp = np.zeros(len(windows_df), dtype=np.int64)
+        x = np.full(len(windows_df), np.nan)
+        y = np.full(len(windows_df), np.nan)
+        timestamp[found] = tracking_df["wcTime"].to_numpy(dtype=np.int64)[first_rows]
+        x[found] = tracking_df["x"].to_numpy(dtype=float)[first_rows]
+        y[found] = tracking_df["y"].to_numpy(dtype=float)[first_rows]
+
+        return pd.DataFrame(
+            {"timestamp": pd.arrays.IntegerArray(timestamp, ~found), "x": x, "y": y}, index=windows_df.index
+        )
 
     def find_ball_crossing_halfcourt(df, basket_x):
         return FeatureUtil.find_ball_moment(
@@ -446,10 +717,44 @@ class FeatureUtil:
         if FeatureUtil.is_in_center_three(x, y, basket_x):
             return "CENTER_THREE"
 
+    def classify_shot_regions(x, y, basket_x):
+        """
+        Batch version of classify_shot_region: classifies arrays of shot locations with shapely's vectorized
+        intersects_xy against the prepared region polygons, one call per region in SHOT_REGION_PRECEDENCE order
+        (each only over the shots still unclassified), instead of a Point and up to 11 intersects calls per shot.
+
+        Args:
+        x (array-like): The x-coordinates of the shots.
+        y (array-like): The y-coordinates of the shots.
+        basket_x (array-like or float): The x-coordinate of the basket for each shot (or for all of them).
+
+        Returns:
+        Categorical: shot region desc per shot, NaN where no region matches (e.g. missing coordinates).
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        basket_x = np.broadcast_to(np.asarray(basket_x, dtype=float), x.shape)
+
+        # Same half court flip as is_in_region
+        x = np.where(basket_x > 0, x, -x)
+
+        codes = ZoneRaster.classify_exact([ShotRegionUtil.regions[name] for name in SHOT_REGION_PRECEDENCE], x, y)
+        return pd.Categorical.from_codes(codes, categories=SHOT_REGION_PRECEDENCE)
+
+    def shot_region_raster(resolution=0.1):
+        """
+        The shot regions compiled into a ZoneRaster, for labelling frame-level data (e.g. every player/ball position) with
+        grid lookups: FeatureUtil.shot_region_raster().zone_at(x, y) gives the same regions as classify_shot_regions
+        for coordinates already on the basket_x > 0 half.
+        """
+        return ZoneRaster.compile(
+            {name: ShotRegionUtil.regions[name] for name in SHOT_REGION_PRECEDENCE}, name="shot_regions", resolution=resolution
+        )
+
     def classify_shot_locations(shots_df, possession_df, classify_shot):
         """
         Classifies the locations of shots in the DataFrame using the basketX from the possession DataFrame
-        based on the shot_time matching within the possession window.
+        based on the shot_time matching within the possession window (of the same game). Also tags each shot with its possId.
 
         Args:
             shots_df (DataFrame): DataFrame containing shot locations and times.
@@ -459,18 +764,25 @@ class FeatureUtil:
         Returns:
             DataFrame: The input DataFrame augmented with a new column for shot classification.
         """
-        # Create a temporary key for merging to avoid large Cartesian products
         shots_df = shots_df.copy()
-        
-        shots_df['basketX'] = shots_df['shot_time'].apply(
-            lambda x: PossessionProcessor.extract_possession_by_timestamp(possession_df, x)['basketX']
-        )
 
-        # Apply the classification function
-        shots_df["shot_classification"] = shots_df.apply(
-            lambda row: classify_shot(row["shot_x"], row["shot_y"], row["basketX"]),
-            axis=1,
+        # Assign every shot to its possession in one as-of pass over the possession intervals
+        possessions = PossessionProcessor.lookup_possessions(
+            possession_df, shots_df["shot_time"], shots_df["gameId"], columns=("basketX", "possId")
         )
+        shots_df["basketX"] = possessions["basketX"].to_numpy()
+        shots_df["possId"] = possessions["possId"].to_numpy()
+
+        # Apply the classification function, the region classifier runs as a single batch
+        if classify_shot in (FeatureUtil.classify_shot_region, FeatureUtil.classify_shot_regions):
+            shots_df["shot_classification"] = np.asarray(
+                FeatureUtil.classify_shot_regions(shots_df["shot_x"], shots_df["shot_y"], shots_df["basketX"]), dtype=object
+            )
+        else:
+            shots_df["shot_classification"] = shots_df.apply(
+                lambda row: classify_shot(row["shot_x"], row["shot_y"], row["basketX"]),
+                axis=1,
+            )
 
         return shots_df
 
@@ -479,44 +791,141 @@ class FeatureUtil:
             shot_rebound_df["dReb"], shot_rebound_df["def_reb_chance"] / 100
         )
 
-    def calculate_oreb_ppp(event_df, off_rebounds_df):
-        # List to store points from the first shot attempt after each offensive rebound
-        points_after_rebounds = []
-
-        # Iterate over each offensive rebound
-        for idx, rebound in off_rebounds_df.iterrows():
-            # Find subsequent events in the same game and period
-            subsequent_events = event_df.loc[
-                (event_df["gameId"] == rebound["gameId"])
-                & (event_df["period"] == rebound["period"])
-                & (event_df["wcTime"] > rebound["wcTime"])
-            ].sort_values(by="wcTime")
-
-            # Filter to find the first shot attempt
-            first_shot = subsequent_events.loc[
-                subsequent_events["eventType"] == "SHOT"
-            ].head(1)
-
-            # Check if there is a shot and calculate points
-            if not first_shot.empty:
-                points = (
-                    3
-                    if (first_shot.iloc[0]["made"] and first_shot.iloc[0]["three"])
-                    else (2 if first_shot.iloc[0]["made"] else 0)
-                )
-            else:
-                # No shot was made after the rebound before possession ended
-                points = 0
+    def calculate_oreb_ppp(event_df, off_rebounds_df, by=None):
+        """
+        Average points scored on the first shot attempt after an offensive rebound (0 when no shot follows in the
+        same period), see oreb_outcomes.
 
-            points_after_rebounds.append(points)
+        Args:
+        event_df (DataFrame): Events the rebounds come from.
+        off_rebounds_df (DataFrame): Offensive rebounds (see EventProcessor.extract_off_rebounds).
+        by (str or list, optional): Context of the missed shot each rebound came from to break the average down by,
+            any of OREB_PPP_BREAKDOWNS, e.g. ['shot_classification', 'shot_clock_bucket'].
 
-        # Calculate average points per possession
-        if points_after_rebounds:
-            ppp = sum(points_after_rebounds) / len(points_after_rebounds)
-        else:
-            ppp = 0
+        Returns:
+        float or DataFrame: The overall OREB PPP, or one row per context with its oreb_ppp and number of orebs.
+
+        Raises:
+        KeyError: For an unknown breakdown, or a shot_classification breakdown when event_df has no such column
+            (classify the shots first, see classify_shot_locations).
+        """
+        if by is not None:
+            by = [by] if isinstance(by, str) else list(by)
+            unknown = [name for name in by if name not in OREB_PPP_BREAKDOWNS]
+            if unknown:
+                raise KeyError(f"Unknown OREB PPP breakdown {unknown}, expected any of {OREB_PPP_BREAKDOWNS}")
+            if "shot_classification" in by and "shot_classification" not in event_df.columns:
+                raise KeyError("event_df has no shot_classification column to break OREB PPP down by, see classify_shot_locations")
+
+        outcomes = FeatureUtil.oreb_outcomes(event_df, off_rebounds_df)
+        if by is None:
+            return outcomes["points"].mean() if len(outcomes) else 0
+
+        return outcomes.groupby(by, observed=True, dropna=False)["points"].agg(oreb_ppp="mean", orebs="size")
+
+    def oreb_outcomes(event_df, off_rebounds_df):
+        """
+        Per offensive rebound: the points of the first shot attempt after it (strictly later, same game and period) and
+        the context of the missed shot it came from (the last shot at or before it), matched for all rebounds at once
+        with two sorted as-of merges instead of filtering the events per rebound. Shots and rebounds without a wcTime
+        are never matched (such rebounds score 0 with no context), as in the per-rebound filter.
+
+        Returns:
+        DataFrame: Aligned with off_rebounds_df's index, points plus the OREB_PPP_BREAKDOWNS columns (shot_classification
+            only when event_df has it).
+        """
+        shots = event_df.loc[event_df["eventType"] == "SHOT"]
+        shot_points = np.where(
+            shots["made"].fillna(False).to_numpy(dtype=bool),
+            np.where(shots["three"].fillna(False).to_numpy(dtype=bool), 3, 2),
+            0,
+        )
+        context_cols = [col for col in ("shot_classification",) if col in shots.columns]
+        shots = pd.DataFrame(
+            {
+                "gameId": shots["gameId"].to_numpy(dtype=object),
+                "period": shots["period"].to_numpy(),
+                "wcTime": shots["wcTime"].to_numpy(dtype=float),
+                "points": shot_points,
+                "scTime": shots["scTime"].to_numpy(dtype=float),
+                **{col: shots[col].to_numpy() for col in context_cols},
+            }
+        )
+        # merge_asof can't take missing keys, shots without a time never follow or precede a rebound
+        shots = shots.loc[shots["wcTime"].notna()].sort_values("wcTime", kind="stable")
+
+        rebounds = pd.DataFrame(
+            {
+                "gameId": off_rebounds_df["gameId"].to_numpy(dtype=object),
+                "period": off_rebounds_df["period"].to_numpy(),
+                "wcTime": off_rebounds_df["wcTime"].to_numpy(dtype=float),
+                "row": np.arange(len(off_rebounds_df)),
+            }
+        )
+        # Rebounds without a time can't be matched to a shot (they score 0)
+        rebounds = rebounds.loc[rebounds["wcTime"].notna()].sort_values("wcTime", kind="stable")
+
+        next_shot = pd.merge_asof(
+            rebounds, shots[["gameId", "period", "wcTime", "points"]], on="wcTime", by=["gameId", "period"],
+            direction="forward", allow_exact_matches=False,
+        )
+        missed_shot = pd.merge_asof(
+            rebounds, shots.drop(columns="points"), on="wcTime", by=["gameId", "period"], direction="backward"
+        )
+
+        points = np.zeros(len(off_rebounds_df))
+        sc_time = np.full(len(off_rebounds_df), np.nan)
+        points[next_shot["row"].to_numpy()] = next_shot["points"].fillna(0).to_numpy()
+        sc_time[missed_shot["row"].to_numpy()] = missed_shot["scTime"].to_numpy(dtype=float)
+
+        outcomes = pd.DataFrame(
+            {
+                "points": points,
+                "period": off_rebounds_df["period"].to_numpy(),
+                "shot_clock_bucket": FeatureUtil.shot_clock_bucket(sc_time),
+            },
+            index=off_rebounds_df.index,
+        )
+        for col in context_cols:
+            values = np.full(len(off_rebounds_df), None, dtype=object)
+            values[missed_shot["row"].to_numpy()] = missed_shot[col].to_numpy(dtype=object)
+            outcomes[col] = values
+
+        return outcomes
+
+    def shot_clock_bucket(sc_time):
+        """Shot clock bucket (see SHOT_CLOCK_BUCKETS) of each shot clock reading, NaN when there's none."""
+        return pd.cut(np.asarray(sc_time, dtype=float), SHOT_CLOCK_BUCKETS, labels=SHOT_CLOCK_BUCKET_LABELS, include_lowest=True)
+
+    def lookup_oreb_ppp(oreb_ppp, shots_df):
+        """
+        The OREB PPP that applies to each shot: a scalar is returned as is, for a breakdown (see calculate_oreb_ppp) each
+        shot takes its context's value, or the overall average when its context has no rebounds.
+
+        Returns:
+        float or Series: Aligned with shots_df's index for a breakdown.
+
+        Raises:
+        KeyError: When shots_df is missing a column of the breakdown (scTime for shot_clock_bucket).
+        """
+        if not isinstance(oreb_ppp, pd.DataFrame):
+            return oreb_ppp
+
+        required = ["scTime" if name == "shot_clock_bucket" else name for name in oreb_ppp.index.names]
+        missing = [col for col in required if col not in shots_df.columns]
+        if missing:
+            raise KeyError(f"shots_df has no {missing} column(s) to look up the OREB PPP breakdown by {list(oreb_ppp.index.names)}")
+
+        keys = pd.DataFrame(
+            {
+                name: FeatureUtil.shot_clock_bucket(shots_df["scTime"]) if name == "shot_clock_bucket" else shots_df[name].to_numpy()
+                for name in oreb_ppp.index.names
+            }
+        )
+        overall = np.average(oreb_ppp["oreb_ppp"], weights=oreb_ppp["orebs"]) if len(oreb_ppp) else 0
+        ppp = keys.merge(oreb_ppp["oreb_ppp"].reset_index(), on=list(oreb_ppp.index.names), how="left")["oreb_ppp"]
 
-        return ppp
+        return pd.Series(ppp.fillna(overall).to_numpy(), index=shots_df.index)
 
     def calculate_fg_percentage_by_region(shot_data):
         """
@@ -4,6 +4,7 @@ from tqdm import tqdm
 from scipy.spatial.distance import euclidean
 from shapely.geometry import Point
 from code.io.TrackingProcessor import TrackingProcessor
+from code.io.TrackingIndex import TrackingIndex
 from code.io.EventProcessor import EventProcessor
 from code.util.FeatureUtil import FeatureUtil
 from code.util.VisUtil import VisUtil
@@ -14,48 +15,85 @@ class StatsUtil:
         """
         Enhances the DataFrame with shot attempts to include a 'true points produced' column,
         which accounts for points from made shots and subsequent free throws following fouls on those shots.
+
+        Vectorized over all shots: a shot is fouled when the next event is a FOUL on its shooter. Its free throws are the
+        shooter's next free throws after the foul (same game and period), up to the end of their sequence. A sequence
+        continues while each free throw is followed by another FT, or by a team rebound after a missed FT (happens if
+        you miss the first in a sequence). Sequences get ids via a cumsum over their breaks, and each fouled shot sums
+        its sequence's made free throws with a cumulative sum.
         """
+        event_type = df["eventType"].to_numpy(dtype=object)
+        player_id = df["playerId"].to_numpy(dtype=object)
+        made = df["made"].fillna(False).to_numpy(dtype=bool)
+        wc_time = df["wcTime"].to_numpy(dtype=float)
+
         # Filter to get only shot attempts
-        shots_df = df[df["eventType"] == "SHOT"].copy()
-
-        # Add columns to store the computed true points
-        shots_df["points_produced"] = 0
-        shots_df["true_points_produced"] = 0
-
-        # Iterate through the shots DataFrame
-        for index, row in shots_df.iterrows():
-            points = 0
-            if row["made"]:  # Check if the shot was made
-                points += 3 if row["three"] else 2
-            shots_df.at[index, "points_produced"] = points
-
-            # Find the immediate next event in the DataFrame
-            shot_index = df.index.get_loc(index)
-            if shot_index + 1 < len(df):
-                next_event = df.iloc[shot_index + 1]
-                # Check if the next event is a FOUL related to this SHOT
-                if next_event["eventType"] == "FOUL" and next_event["fouledId"] == row["playerId"]:
-                    # Find free throws directly related to this foul
-                    free_throws = df[
-                        (df["eventType"] == "FT") &
-                        (df["wcTime"] > next_event["wcTime"]) &
-                        (df["playerId"] == row["playerId"]) &
-                        (df["gameId"] == row["gameId"])
-                    ].sort_values(by="wcTime")
-
-                    for ft in free_throws.itertuples():
-                        if ft.made:
-                            points += 1
-                        # Look for the next event after this free throw
-                        ft_index = df.index.get_loc(ft.Index)
-                        if ft_index + 1 < len(df):
-                            next_ft_event = df.iloc[ft_index + 1]
-                            # Break if next event is not a FT and it's not a team rebound after a missed FT (happens if you miss the first in a sequence)
-                            if next_ft_event["eventType"] != "FT" and not (next_ft_event["eventType"] == "REB" and pd.isna(next_ft_event["playerId"]) and not ft.made):
-                                break
-
-            # Store the total points produced in the DataFrame
-            shots_df.at[index, "true_points_produced"] = points
+        shot_rows = np.flatnonzero(event_type == "SHOT")
+        shots_df = df.iloc[shot_rows].copy()
+
+        # Points from the shot itself
+        points = np.where(made[shot_rows], np.where((shots_df["three"] == True).to_numpy(), 3, 2), 0)
+        shots_df["points_produced"] = points
+
+        # Shots whose immediate next event is a FOUL on the shooter
+        next_rows = np.minimum(shot_rows + 1, len(df) - 1)
+        fouled = (
+            (shot_rows + 1 < len(df))
+            & (event_type[next_rows] == "FOUL")
+            & (df["fouledId"].to_numpy(dtype=object)[next_rows] == player_id[shot_rows])
+        )
+
+        # Free throws by game/period/player in time order, and where each one's sequence breaks. Free throws without a
+        # time never come after a foul (and merge_asof can't take missing keys), so they're left out
+        ft_rows = np.flatnonzero((event_type == "FT") & ~np.isnan(wc_time))
+        fts = pd.DataFrame(
+            {
+                "gameId": df["gameId"].to_numpy(dtype=object)[ft_rows],
+                "period": df["period"].to_numpy()[ft_rows],
+                "playerId": player_id[ft_rows],
+                "wcTime": wc_time[ft_rows],
+                "row": ft_rows,
+            }
+        ).sort_values(["gameId", "period", "playerId", "wcTime", "row"], kind="stable", ignore_index=True)
+        ft_rows = fts["row"].to_numpy()
+
+        after = np.minimum(ft_rows + 1, len(df) - 1)
+        continues = (ft_rows + 1 >= len(df)) | (event_type[after] == "FT") | (
+            (event_type[after] == "REB") & pd.isna(player_id[after]) & ~made[ft_rows]
+        )
+        new_group = (fts[["gameId", "period", "playerId"]] != fts[["gameId", "period", "playerId"]].shift()).any(axis=1).to_numpy()
+        sequence_id = np.cumsum(new_group | np.r_[False, ~continues[:-1]]) - 1
+        sequence_end = np.r_[np.flatnonzero(np.diff(sequence_id)), len(fts) - 1]
+        made_so_far = np.cumsum(made[ft_rows])
+
+        # First free throw by the shooter after each foul (same game and period)
+        fouls = pd.DataFrame(
+            {
+                "gameId": df["gameId"].to_numpy(dtype=object)[shot_rows[fouled]],
+                "period": df["period"].to_numpy()[shot_rows[fouled]],
+                "playerId": player_id[shot_rows[fouled]],
+                "wcTime": wc_time[next_rows[fouled]],
+                "shot": np.flatnonzero(fouled),
+            }
+        )
+        fouls = fouls.loc[fouls["wcTime"].notna()]
+        first_ft = pd.merge_asof(
+            fouls.sort_values("wcTime", kind="stable"),
+            fts.drop(columns="row").assign(ft=np.arange(len(fts))).sort_values("wcTime", kind="stable"),
+            on="wcTime",
+            by=["gameId", "period", "playerId"],
+            direction="forward",
+            allow_exact_matches=False,
+        ).dropna(subset=["ft"])
+
+        # Made free throws from the first one to the end of its sequence
+        start = first_ft["ft"].to_numpy(dtype=np.int64)
+        end = sequence_end[sequence_id[start]]
+        ft_points = np.zeros(len(shot_rows), dtype=np.int64)
+        ft_points[first_ft["shot"].to_numpy()] = made_so_far[end] - made_so_far[start] + made[ft_rows[start]]
+
+        # Store the total points produced in the DataFrame
+        shots_df["true_points_produced"] = points + ft_points
 
         return shots_df
 
@@ -77,7 +115,7 @@ class StatsUtil:
         Returns:
             pd.Series: Series containing total distance traveled by each player.
         """
-        player_travel_dist = event_df.groupby("playerId")[["x", "y"]].apply(
+        player_travel_dist = event_df.groupby("playerId", observed=True)[["x", "y"]].apply(
             lambda x: np.sqrt(((np.diff(x, axis=0) ** 2).sum(axis=1)).sum())
         )
         return player_travel_dist
@@ -92,7 +130,7 @@ class StatsUtil:
         """
         seconds = event_df["wcTime"].max() - event_df["wcTime"].min()
         player_speeds = (
-            event_df.groupby("playerId")[["x", "y"]].apply(
+            event_df.groupby("playerId", observed=True)[["x", "y"]].apply(
                 lambda x: np.sqrt(((np.diff(x, axis=0) ** 2).sum(axis=1)).sum())
             )
             / seconds
@@ -136,40 +174,47 @@ class StatsUtil:
         ]
         
     def assign_oreb_expected_points_to_shots(true_points_df, reb_chances_df, event_df=None, oreb_ppp=None):
-        """_summary_
+        """
+        Adds expected_oreb_points (chance of an offensive rebound x OREB PPP) and true_impact_points_produced to each shot.
 
         Args:
-            true_points_df (_type_): _description_
-            reb_chances_df (_type_): _description_
-            event_df (_type_, optional):  Used for the full context oreb_ppp arg, can also pass that as a scalar. Defaults to None.
-            oreb_ppp (_type_, optional): _description_. Defaults to None.
+            true_points_df (DataFrame): Shots with their true points produced (see calculate_true_points).
+            reb_chances_df (DataFrame): Rebound chances per shot (see assign_rebound_chances_to_shots).
+            event_df (DataFrame, optional): Used for the full context oreb_ppp arg, can also pass that directly. Defaults to None.
+            oreb_ppp (float or DataFrame, optional): OREB PPP as a scalar, or a breakdown from FeatureUtil.calculate_oreb_ppp(by=...)
+                in which case each shot uses the value for its own context. Defaults to None.
 
         Returns:
-            _type_: _description_
+            DataFrame: true_points_df with the expected_oreb_points and true_impact_points_produced columns.
         """
         # Allows for progress bar on pd.apply
         tqdm.pandas()
-        
-        if not oreb_ppp and not event_df:
+
+        if oreb_ppp is None and event_df is None:
             # Can't proceed unless one is provided
             raise Exception('One of oreb_ppp or event_df must be provided!')
-        elif oreb_ppp:
-            # Don't interpret if oreb_ppp provided (might be from another context)
-            pass
-        elif event_df:
+        elif oreb_ppp is None:
             # Use the full event_df to generate average ppp on shots following orebs
             off_rebounds_df = EventProcessor.extract_off_rebounds(event_df)
             oreb_ppp = FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df)
+        # Otherwise don't interpret the oreb_ppp provided (might be from another context)
+
+        # A breakdown becomes one value per shot
+        oreb_ppp = FeatureUtil.lookup_oreb_ppp(oreb_ppp, true_points_df)
 
         # Apply the function row-wise using apply and pass additional args
         return true_points_df.apply(StatsUtil.calculate_oreb_expected_points, args=(oreb_ppp, reb_chances_df), axis=1)
-                
+
     def calculate_oreb_expected_points(row, oreb_ppp, reb_chances_df):
         if row['made'] or row['fouled']:
             row['expected_oreb_points'] = 0
             row['true_impact_points_produced'] = row['true_points_produced']
             return row
-            
+
+        # Per shot OREB PPP (see FeatureUtil.lookup_oreb_ppp)
+        if isinstance(oreb_ppp, pd.Series):
+            oreb_ppp = oreb_ppp[row.name]
+
         # Fetch the closest rebound chance based on timestamp
         rebound_chance = reb_chances_df.loc[
             (reb_chances_df['gameId'] == row['gameId']) & 
@@ -206,7 +251,10 @@ class StatsUtil:
         player_info = moment_df.loc[(moment_df['teamId'] != "-1") & (moment_df['wcTime'] == timestamp), ['playerId', 'teamId']]
         
         # Use the modified Voronoi method to retrieve Voronoi polygons instead of plotting
-        if moment_basket_x != hexbin_basket_x:
+        if TrackingProcessor.has_attack_coords(moment_df):
+            # Normalized at ingest, no need to mirror per shot
+            moment_df = TrackingProcessor.to_attack_frame(moment_df, hexbin_basket_x)
+        elif moment_basket_x != hexbin_basket_x:
             moment_df = TrackingProcessor.mirror_court_data(moment_df, 'x', 'y', hexbin_basket_x)
         vis = VisUtil(moment_df)
         player_regions = vis.plot_voronoi_at_timestamp(timestamp, hexbin_basket_x, return_data=True)
@@ -248,7 +296,7 @@ class StatsUtil:
 
         # Calculate the rebound chances
         _, team_rebound_chances = StatsUtil.calculate_rebound_chances(
-            tracking_df.copy().loc[tracking_df['gameId'] == row['gameId']], row['shot_time'], row["basketX"], region_data, hexbin_basket_x
+            StatsUtil._shot_tracking(tracking_df, row['gameId'], row['shot_time']), row['shot_time'], row["basketX"], region_data, hexbin_basket_x
         )
 
         # Return rebound chances for defensive and offensive teams
@@ -257,15 +305,46 @@ class StatsUtil:
         
         return team_rebound_chances.get(off_team_id, 0), team_rebound_chances.get(def_team_id, 0)
 
+    def _shot_tracking(tracking, game_id, shot_time):
+        """Tracking passed on to calculate_rebound_chances for a shot, a TrackingIndex only has to hand over the shot frame."""
+        if isinstance(tracking, TrackingIndex):
+            return tracking.at(shot_time, game_id)
+        return tracking.copy().loc[tracking['gameId'] == game_id]
+
+    def _iter_game_tracking(tracking):
+        """Yields (game_id, tracking_df) pairs from either a tracking DataFrame or a per-game iterator (TrackingProcessor/ActionProcessor.iter_games)."""
+        if isinstance(tracking, pd.DataFrame):
+            yield from tracking.groupby("gameId", sort=False, observed=True)
+            return
+
+        for game in tracking:
+            if hasattr(game, "tracking_df"):
+                yield game.game_id, game.tracking_df
+            else:
+                yield game
+
     def assign_rebound_chances_to_shots(shot_rebound_df, tracking_df, hexbin_region_data):
+        """
+        Assigns offensive/defensive team rebound chances to each shot. tracking_df can be a tracking DataFrame, or a per-game
+        iterator (see TrackingProcessor.iter_games / ActionProcessor.iter_games) to hold only one game's tracking in memory at a time.
+        """
         # Allows for progress bar on pd.apply
         tqdm.pandas()
         
         # Determine the basket location used in the hexbin plots (important data is mirrored to this side pre-calculations)
         hexbin_basket_x = 41.75 if hexbin_region_data['x'].sum() > 0 else -41.75
         
-        # Apply the function row-wise using apply and pass additional args
-        result = shot_rebound_df.progress_apply(StatsUtil._calculate_team_rebound_chances_for_row, axis=1, result_type='expand', args=(tracking_df, hexbin_region_data, hexbin_basket_x))
+        if isinstance(tracking_df, (pd.DataFrame, TrackingIndex)):
+            # Apply the function row-wise using apply and pass additional args
+            result = shot_rebound_df.progress_apply(StatsUtil._calculate_team_rebound_chances_for_row, axis=1, result_type='expand', args=(tracking_df, hexbin_region_data, hexbin_basket_x))
+        else:
+            # Stream the games, only the shots for the current game are processed against its tracking
+            results = [pd.DataFrame(index=shot_rebound_df.index[:0], columns=[0, 1])]
+            for game_id, game_tracking in tqdm(StatsUtil._iter_game_tracking(tracking_df)):
+                game_shots = shot_rebound_df.loc[shot_rebound_df['gameId'] == game_id]
+                if not game_shots.empty:
+                    results.append(game_shots.apply(StatsUtil._calculate_team_rebound_chances_for_row, axis=1, result_type='expand', args=(game_tracking, hexbin_region_data, hexbin_basket_x)))
+            result = pd.concat(results).reindex(shot_rebound_df.index)
         
         # Assign results to new columns in the DataFrame
         shot_rebound_df.loc[:, 'off_reb_chance'] = result[0]
@@ -287,7 +366,7 @@ class StatsUtil:
 
         # Calculate the rebound chances
         player_rebound_chances, team_chances = StatsUtil.calculate_rebound_chances(
-            game_tracking.copy(),
+            StatsUtil._shot_tracking(game_tracking, row['gameId'], row['shot_time']),
             row['shot_time'],
             row['basketX'],
             region_data, 
@@ -299,6 +378,7 @@ class StatsUtil:
     def assign_player_rebound_chances_to_shots(shot_rebound_df, tracking_df, hexbin_region_data):
         """
         Assigns player-specific rebound chances to each missed shot attempt.
+        tracking_df can be a tracking DataFrame or a per-game iterator, as in assign_rebound_chances_to_shots.
         """
         # Allows for progress bar
         tqdm.pandas()
@@ -306,15 +386,30 @@ class StatsUtil:
         # Determine the basket location used in the hexbin plots
         hexbin_basket_x = 41.75 if hexbin_region_data['x'].sum() > 0 else -41.75
         
-        # Group tracking data by gameId for faster lookup
-        tracking_by_game = dict(tuple(tracking_df.groupby('gameId')))
-        
-        # Process each row with progress_apply
         filtered_df = shot_rebound_df[shot_rebound_df["rebounder_id"].notnull()]
-        result = filtered_df.progress_apply(
-            StatsUtil._calculate_player_rebound_chances_for_row,
-            axis=1, result_type='expand', args=(tracking_by_game, hexbin_region_data, hexbin_basket_x)
-        )
+        if isinstance(tracking_df, (pd.DataFrame, TrackingIndex)):
+            # Group tracking data by gameId for faster lookup (a TrackingIndex already is)
+            if isinstance(tracking_df, TrackingIndex):
+                tracking_by_game = {game_id: tracking_df for game_id in tracking_df.game_ids}
+            else:
+                tracking_by_game = dict(tuple(tracking_df.groupby('gameId', observed=True)))
+            
+            # Process each row with progress_apply
+            result = filtered_df.progress_apply(
+                StatsUtil._calculate_player_rebound_chances_for_row,
+                axis=1, result_type='expand', args=(tracking_by_game, hexbin_region_data, hexbin_basket_x)
+            )
+        else:
+            # Stream the games, only the shots for the current game are processed against its tracking
+            results = [pd.DataFrame(index=filtered_df.index[:0], columns=['player_rebound_chances'])]
+            for game_id, game_tracking in tqdm(StatsUtil._iter_game_tracking(tracking_df)):
+                game_shots = filtered_df.loc[filtered_df['gameId'] == game_id]
+                if not game_shots.empty:
+                    results.append(game_shots.apply(
+                        StatsUtil._calculate_player_rebound_chances_for_row,
+                        axis=1, result_type='expand', args=({game_id: game_tracking}, hexbin_region_data, hexbin_basket_x)
+                    ))
+            result = pd.concat(results).reindex(filtered_df.index)
         
         # Add the player rebound chances to the original DataFrame
         shot_rebound_df['player_rebound_chances'] = None
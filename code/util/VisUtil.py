@@ -11,7 +11,9 @@ from IPython.display import HTML
 from scipy.spatial import Voronoi, voronoi_plot_2d
 from sklearn.metrics import roc_curve, auc
 from scipy.interpolate import griddata
+from code.io.FrameCache import FRAME_CACHE
 from code.io.TrackingProcessor import TrackingProcessor
+from code.io.TrackingIndex import TrackingIndex
 from code.util.FeatureUtil import ShotRegionUtil
 
 
@@ -71,6 +73,10 @@ class VisUtil:
     # TODO: allow for more dynamic seeting of home/away team info
     def __init__(self, tracking_df: pd.DataFrame):
         plt.ioff()
+        # Accepts a TrackingIndex too, in which case moments are sliced out by time rather than masked
+        self.tracking_index = tracking_df if isinstance(tracking_df, TrackingIndex) else None
+        if self.tracking_index is not None:
+            tracking_df = self.tracking_index.tracking_df
         self.tracking_df: pd.DataFrame = tracking_df
         team_ids = tracking_df["teamId"].head(25).dropna().unique()
         self.home_team_id = team_ids[0]
@@ -84,16 +90,15 @@ class VisUtil:
             self.TEAM_COLOR_DICT[team_ids[1]][0],
         )
 
-        players_df = pd.read_csv(
-            "data/src/basic_player_info.csv",
-            dtype={"person_id": str, "jersey_num": str},
-        )
+        players_df = VisUtil.load_player_info()
         self.players_dict = {
-            row["person_id"]: (
-                f"{row['nickname'][0]}. {row['last_name']}",
-                row["jersey_num"],
+            person_id: (f"{nickname[0]}. {last_name}", jersey_num)
+            for person_id, nickname, last_name, jersey_num in zip(
+                players_df["person_id"],
+                players_df["nickname"],
+                players_df["last_name"],
+                players_df["jersey_num"],
             )
-            for index, row in players_df.iterrows()
         }
 
         self.fig, self.ax = None, None
@@ -102,9 +107,28 @@ class VisUtil:
         )  # To store the reference to the last animation, outer dict key is interval, inner is event_num
         self.court = VisUtil.load_court_image()
 
+    @staticmethod
+    def load_player_info():
+        return FRAME_CACHE.get_or_load(
+            FRAME_CACHE.key("basic_player_info"),
+            lambda: pd.read_csv(
+                "data/src/basic_player_info.csv",
+                dtype={"person_id": str, "jersey_num": str},
+            ),
+        )
+
     @staticmethod
     def load_court_image():
-        return plt.imread("data/img/app/fullcourt.png")
+        return FRAME_CACHE.get_or_load(
+            FRAME_CACHE.key("court_image"),
+            lambda: plt.imread("data/img/app/fullcourt.png"),
+        )
+
+    def moment_at(self, timestamp):
+        """Rows for a single frame, sliced from the time index when available."""
+        if self.tracking_index is not None:
+            return self.tracking_index.at(timestamp)
+        return self.tracking_df[self.tracking_df["wcTime"] == timestamp]
 
     def setup_visualization(self, moments_df):
         VisUtil.setup_court(self.ax)
@@ -321,7 +345,7 @@ class VisUtil:
         """Support method for display/save methods with caching support."""
         self.fig, self.ax = plt.subplots(figsize=(12, 8))
         moments_df = TrackingProcessor.extract_possession_moments(
-            self.tracking_df, possession
+            self.tracking_index or self.tracking_df, possession
         )
         annotations, clock_info = self.setup_visualization(moments_df)
         precomputed_data = VisUtil.precompute_frames(moments_df)
@@ -363,7 +387,7 @@ class VisUtil:
         self.fig, self.ax = plt.subplots(figsize=(12, 8))
 
         # Filter the dataframe for the specific timestamp
-        moments_df = self.tracking_df[self.tracking_df["wcTime"] == timestamp]
+        moments_df = self.moment_at(timestamp)
 
         if moments_df.empty:
             raise ValueError("No data available for the specified timestamp")
@@ -401,7 +425,7 @@ class VisUtil:
     def plot_voronoi_at_timestamp(self, timestamp, basket_x, return_data=False):
         """Plot or return the Voronoi diagram for the players' positions at a specific timestamp with team-based cell shading,
         confined to the half of the court based on basket location."""
-        moments_df = self.tracking_df[self.tracking_df["wcTime"] == timestamp]
+        moments_df = self.moment_at(timestamp)
 
         if moments_df.empty:
             raise ValueError("No data available for the specified timestamp")
@@ -514,8 +538,20 @@ class VisUtil:
             self.ax.axis("off")
             plt.show()
 
+    @staticmethod
+    def halfcourt_coords(df, x_col, y_col, normalized=True):
+        """
+        Returns df with x_col/y_col moved onto the half-court the plots draw.
+        With normalized set and the attack-normalized counterparts of the columns present (e.g. nx/ny, shot_nx/shot_ny,
+        see TrackingProcessor.normalize_attack), every possession is drawn attacking ATTACK_BASKET_X. Otherwise the
+        columns are mirrored with mirror_court_data, as the plots did before the normalized columns existed.
+        """
+        if normalized and TrackingProcessor.has_attack_coords(df, x_col, y_col):
+            return TrackingProcessor.to_attack_frame(df, col_pairs=[(x_col, y_col)])
+        return TrackingProcessor.mirror_court_data(df, x_col, y_col)
+
     def plot_court_hexmap(
-        df, x_col, y_col, label="Density (log scale)", return_data=False
+        df, x_col, y_col, label="Density (log scale)", return_data=False, normalized=True
     ):
         """
         Plots a hexmap of locations on the basketball court based on provided x and y coordinates.
@@ -527,6 +563,8 @@ class VisUtil:
             x_col (str): The name of the column in df that contains the x coordinates.
             y_col (str): The name of the column in df that contains the y coordinates.
             label (str): Chart label to be applied.
+            normalized (bool): Plot the attack-normalized columns when df has them, False mirrors x_col/y_col as before
+                            (see halfcourt_coords).
         """
         # Create a new figure and axes
         fig, ax = plt.subplots(figsize=(12, 8))
@@ -535,7 +573,7 @@ class VisUtil:
         VisUtil.setup_court(ax)
 
         # Mirror data points across half court for plotting
-        df = TrackingProcessor.mirror_court_data(df, x_col, y_col)
+        df = VisUtil.halfcourt_coords(df, x_col, y_col, normalized)
 
         # Plotting the data using hexbin
         hexbin = ax.hexbin(
@@ -727,7 +765,7 @@ class VisUtil:
         return zi
     
     @staticmethod
-    def plot_shots_and_regions(shots_df, x_col="shot_x", y_col="shot_y", ax=None):
+    def plot_shots_and_regions(shots_df, x_col="shot_x", y_col="shot_y", ax=None, normalized=True):
         """
         Plot shot attempts and overlay shot regions on a half-court diagram.
 
@@ -737,12 +775,14 @@ class VisUtil:
             y_col (str): The name of the column in shots_df that contains the y coordinates.
             ax (matplotlib.axes._subplots.AxesSubplot, optional): Matplotlib subplot object to plot on.
                                                                 If None, creates a new figure and axis.
+            normalized (bool): Plot the attack-normalized columns when shots_df has them, False mirrors x_col/y_col as
+                            before (see halfcourt_coords).
         """
         if ax is None:
             fig, ax = plt.subplots(figsize=(12, 11))
             VisUtil.setup_court(ax)
 
-        shots_df = TrackingProcessor.mirror_court_data(shots_df, x_col, y_col)
+        shots_df = VisUtil.halfcourt_coords(shots_df, x_col, y_col, normalized)
 
         made_shots = shots_df[shots_df["made"] == True]
         missed_shots = shots_df[shots_df["made"] == False]
@@ -0,0 +1,170 @@
+import os
+import hashlib
+import zipfile
+import numpy as np
+import pandas as pd
+import shapely
+
+ZONE_RASTER_DIR = "data/zones"
+DEFAULT_RESOLUTION = 0.1  # Cell size in feet
+DEFAULT_EPSILON = 1e-3  # Points this close to a zone border (in feet) are always checked against the exact geometry
+
+
+class ZoneRaster:
+    """
+    Compiled lookup table for a named zone scheme (shot regions, distance bands, 14-zone charts, rebound landing zones...):
+    the zones are rasterized once into an integer label grid over their extent, so labelling points is a vectorized
+    O(1) grid lookup instead of polygon tests per point per zone.
+
+    Zones are given as an ordered dict of name -> polygon, and like FeatureUtil.classify_shot_regions a point on a shared
+    border goes to the first zone it touches. Cells a zone border passes through are flagged, and points in those cells
+    fall back to the exact polygon tests, so labels match the geometry exactly (not just to the grid resolution).
+    Compiled grids are cached in memory and on disk (data/zones/<name>-<hash>.npz, keyed by the zone geometry).
+    """
+
+    _compiled = {}  # Per process cache of compiled rasters, keyed by the scheme hash
+
+    def __init__(self, names, polygons, labels, boundary, origin, resolution):
+        self.names = list(names)
+        self.polygons = list(polygons)
+        self.labels = labels  # int16 (rows, cols) zone code per cell (-1 outside every zone), rows run along y
+        self.boundary = boundary  # bool (rows, cols), True where a zone border is within reach of the cell
+        self.origin = origin  # (x, y) of the grid's lower left corner
+        self.resolution = resolution
+        for polygon in self.polygons:
+            shapely.prepare(polygon)
+
+    @classmethod
+    def compile(cls, zones, name="zones", resolution=DEFAULT_RESOLUTION, epsilon=DEFAULT_EPSILON, cache=True):
+        """
+        Rasterizes a zone scheme, or loads it from the cache if this exact scheme was compiled before.
+
+        Args:
+            zones (dict): name -> shapely polygon, in precedence order.
+            name (str): Name of the scheme, used for the cache file name.
+            resolution (float): Cell size in feet.
+            epsilon (float): Distance to a zone border within which points are checked against the exact geometry.
+            cache (bool): Read/write the compiled grid from/to ZONE_RASTER_DIR.
+
+        Returns:
+            ZoneRaster: The compiled scheme.
+        """
+        names, polygons = list(zones.keys()), list(zones.values())
+        key = ZoneRaster._scheme_hash(names, polygons, resolution, epsilon)
+        if key in cls._compiled:
+            return cls._compiled[key]
+
+        path = os.path.join(ZONE_RASTER_DIR, f"{name}-{key}.npz")
+        raster = cls._load(path, names, polygons, resolution) if cache else None
+        if raster is None:
+            raster = cls._rasterize(names, polygons, resolution, epsilon)
+            if cache:
+                os.makedirs(ZONE_RASTER_DIR, exist_ok=True)
+                tmp_path = path + ".tmp.npz"
+                np.savez_compressed(tmp_path, labels=raster.labels, boundary=raster.boundary, origin=np.array(raster.origin))
+                os.replace(tmp_path, path)
+
+        cls._compiled[key] = raster
+        return raster
+
+    def label_at(self, x, y, exact=True):
+        """
+        Zone code (index into names) for each point, -1 where a point is in no zone (or has missing coordinates).
+
+        Args:
+            x (array-like): The x-coordinates of the points.
+            y (array-like): The y-coordinates of the points.
+            exact (bool): Check points in border cells against the exact geometry, otherwise take the cell's label.
+
+        Returns:
+            ndarray: int16 zone codes.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        n_rows, n_cols = self.labels.shape
+
+        # Grid edges are inclusive, so points on the outer border of the extent still land in a cell
+        col = (x - self.origin[0]) / self.resolution
+        row = (y - self.origin[1]) / self.resolution
+        inside = (col >= 0) & (col <= n_cols) & (row >= 0) & (row <= n_rows)
+        col = np.minimum(col[inside].astype(int), n_cols - 1)
+        row = np.minimum(row[inside].astype(int), n_rows - 1)
+
+        codes = np.full(x.shape, -1, dtype=np.int16)
+        codes[inside] = self.labels[row, col]
+
+        if exact:
+            near = np.flatnonzero(inside)[self.boundary[row, col]]
+            codes[near] = ZoneRaster.classify_exact(self.polygons, x[near], y[near])
+
+        return codes
+
+    def zone_at(self, x, y, exact=True):
+        """Same as label_at, as a Categorical of the zone names."""
+        return pd.Categorical.from_codes(self.label_at(x, y, exact), categories=self.names)
+
+    def classify_exact(polygons, x, y):
+        """
+        Exact zone codes for arrays of points: one vectorized intersects_xy call per polygon in precedence order, each
+        over the points not yet labelled (intersects, so border points count as inside). -1 where nothing matches.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+
+        codes = np.full(x.shape, -1, dtype=np.int16)
+        unassigned = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+        for code, polygon in enumerate(polygons):
+            if not len(unassigned):
+                break
+            shapely.prepare(polygon)
+            hit = shapely.intersects_xy(polygon, x[unassigned], y[unassigned])
+            codes[unassigned[hit]] = code
+            unassigned = unassigned[~hit]
+
+        return codes
+
+    @classmethod
+    def _load(cls, path, names, polygons, resolution):
+        # A missing, truncated or mismatched cache file is treated as stale and recompiled
+        try:
+            with np.load(path) as compiled:
+                labels, boundary, origin = compiled["labels"], compiled["boundary"], tuple(compiled["origin"])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        if labels.shape != boundary.shape or len(origin) != 2 or labels.size and labels.max() >= len(names):
+            return None
+
+        return cls(names, polygons, labels, boundary, origin, resolution)
+
+    @classmethod
+    def _rasterize(cls, names, polygons, resolution, epsilon):
+        x_min, y_min, x_max, y_max = shapely.total_bounds(polygons)
+        n_cols = max(int(np.ceil((x_max - x_min) / resolution)), 1)
+        n_rows = max(int(np.ceil((y_max - y_min) / resolution)), 1)
+
+        # Label each cell by its center
+        center_x, center_y = np.meshgrid(
+            x_min + (np.arange(n_cols) + 0.5) * resolution,
+            y_min + (np.arange(n_rows) + 0.5) * resolution,
+        )
+        labels = ZoneRaster.classify_exact(polygons, center_x.ravel(), center_y.ravel()).reshape(n_rows, n_cols)
+
+        # A cell can only hold points of more than one zone if a zone border passes within half a diagonal of its center
+        borders = shapely.union_all([polygon.boundary for polygon in polygons])
+        shapely.prepare(borders)
+        boundary = shapely.dwithin(
+            borders,
+            shapely.points(center_x.ravel(), center_y.ravel()),
+            resolution * np.sqrt(2) / 2 + epsilon,
+        ).reshape(n_rows, n_cols)
+
+        return cls(names, polygons, labels, boundary, (float(x_min), float(y_min)), resolution)
+
+    def _scheme_hash(names, polygons, resolution, epsilon):
+        digest = hashlib.sha1()
+        for name, polygon in zip(names, polygons):
+            digest.update(name.encode())
+            digest.update(shapely.to_wkb(polygon))
+        digest.update(np.array([resolution, epsilon]).tobytes())
+
+        return digest.hexdigest()[:16]
@@ -0,0 +1,305 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.FrameCache import FRAME_CACHE
+
+GAME_IDS = ["0022300002", "0022300001"]  # Not in sorted order, so file order and requested order can differ
+TEAM_IDS = {"0022300002": ["1610612737", "1610612738"], "0022300001": ["1610612739", "1610612740"]}
+N_FRAMES = 60
+FRAME_MS = 40
+BASKET_X = 41.75
+
+
+def make_tracking(seed=0):
+    """Long-format tracking for GAME_IDS: one ball row and 10 player rows per 25Hz frame, players shuffled within each frame."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for game_num, game_id in enumerate(GAME_IDS):
+        team_ids = TEAM_IDS[game_id]
+        players = [(team_id, f"{team_id[-2:]}{num:02d}") for team_id in team_ids for num in range(5)]
+        for frame in range(N_FRAMES):
+            wc_time = 1_700_000_000_000 + game_num * 10_000_000 + frame * FRAME_MS
+            period = 1 if frame < N_FRAMES // 2 else 2
+            entities = [(None, "-1")] + [(player_id, team_id) for team_id, player_id in players]
+            for pos in rng.permutation(len(entities)):
+                player_id, team_id = entities[pos]
+                rows.append(
+                    {
+                        "gameId": game_id,
+                        "playerId": player_id,
+                        "playerName": None if player_id is None else f"Player {player_id}",
+                        "teamId": team_id,
+                        "teamAbbr": None if team_id == "-1" else f"T{team_id[-2:]}",
+                        "period": period,
+                        "wcTime": wc_time,
+                        "gcTime": 720.0 - frame * 0.04,
+                        "scTime": 24.0 - (frame % 24) * 0.04,
+                        "x": round(rng.uniform(-47, 47), 3),
+                        "y": round(rng.uniform(-25, 25), 3),
+                        "z": round(rng.uniform(0, 10), 3) if team_id == "-1" else 0.0,
+                        "gameDate": "2024-02-01",
+                    }
+                )
+
+    return pd.DataFrame(rows)
+
+
+def make_possessions(tracking_df):
+    """Possessions covering part of each game's frames, with gaps between them (and before the first/after the last)."""
+    rows = []
+    for game_id, game_df in tracking_df.groupby("gameId", sort=False):
+        frames = np.unique(game_df["wcTime"])
+        team_ids = TEAM_IDS[game_id]
+        bounds = [(5, 15), (20, 28), (32, 45), (50, 55)]
+        for num, (start, end) in enumerate(bounds):
+            rows.append(
+                {
+                    "gameId": game_id,
+                    "period": 1 if start < N_FRAMES // 2 else 2,
+                    "possId": f"{game_id}-{num}",
+                    "possNum": num,
+                    "teamId": team_ids[num % 2],
+                    "teamAbbr": f"T{team_ids[num % 2][-2:]}",
+                    "outcome": "FGM" if num % 2 else "FGX",
+                    "ptsScored": 2 if num % 2 else 0,
+                    "wcStart": int(frames[start]),
+                    "wcEnd": int(frames[end]),
+                    "gcStart": 720.0 - start * 0.04,
+                    "gcEnd": 720.0 - end * 0.04,
+                    "basketX": BASKET_X if num % 2 else -BASKET_X,
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+def make_possession_events(possessions_df):
+    """A shot and a rebound per possession."""
+    rows = []
+    for _, possession in possessions_df.iterrows():
+        for event_type, offset in (("SHOT", 0), ("REB", FRAME_MS)):
+            rows.append(
+                {
+                    "gameId": possession["gameId"],
+                    "eventType": event_type,
+                    "playerId": f"{possession['teamId'][-2:]}00",
+                    "teamId": possession["teamId"],
+                    "period": possession["period"],
+                    "wcTime": possession["wcEnd"] - FRAME_MS + offset,
+                    "made": possession["outcome"] == "FGM" if event_type == "SHOT" else None,
+                    "three": False,
+                    "dReb": None if event_type == "SHOT" else possession["outcome"] == "FGM",
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+# Reference implementations: the loops/scans the vectorized versions replaced, with the event factories they're compared on
+
+
+def pair_shots_and_rebounds_loop(shots_df, rebounds_df):
+    """The original cartesian pairing from extract_shots_and_rebounds (see ActionProcessor.pair_shots_and_rebounds)."""
+    merged_df = pd.merge(rebounds_df, shots_df, on=["gameId", "period"], suffixes=("_reb", "_shot"))
+    valid_pairs = merged_df[merged_df["wcTime_shot"] < merged_df["wcTime_reb"]]
+    valid_pairs = valid_pairs.sort_values(by=["gameId", "period", "wcTime_reb", "wcTime_shot"], ascending=[True, True, True, False])
+    valid_pairs = valid_pairs.drop_duplicates(subset=["gameId", "period", "wcTime_shot"])
+    valid_pairs = valid_pairs.drop_duplicates(subset=["gameId", "period", "wcTime_reb"])
+
+    return valid_pairs
+
+
+def make_shot_rebound_events(seed=0, n=400):
+    """Shots and rebounds across two games/four periods, at distinct times (the cartesian pairing breaks exact ties arbitrarily)."""
+    rng = np.random.default_rng(seed)
+    event_df = pd.DataFrame(
+        {
+            "gameId": rng.choice(GAME_IDS, n),
+            "eventType": rng.choice(["SHOT", "REB"], n, p=[0.65, 0.35]),
+            "playerId": rng.integers(0, 30, n).astype(str),
+            "teamId": rng.choice(["1", "2"], n),
+            "period": rng.integers(1, 5, n),
+            "wcTime": rng.permutation(n) * 1000,
+            "made": rng.random(n) < 0.45,
+            "dReb": rng.random(n) < 0.75,
+        }
+    )
+    shots_df = event_df[event_df["eventType"] == "SHOT"].drop(columns=["dReb"])
+    rebounds_df = event_df[event_df["eventType"] == "REB"][["gameId", "teamId", "playerId", "period", "wcTime", "dReb"]]
+
+    return shots_df, rebounds_df
+
+
+def extract_transition_opportunities_loop(event_df):
+    """The original per-rebound scan from extract_transition_opportunities, slicing up to the first event by another team."""
+    drebs = event_df[(event_df["dReb"].notna()) & (event_df["playerId"].notna())].index.tolist()
+    transition_opportunities = []
+    for start_index in drebs:
+        team_id = event_df.at[start_index, "teamId"]
+        subsequent_events = event_df.loc[start_index:]
+        break_condition = subsequent_events["teamId"] != team_id
+        if break_condition.any():
+            end_index = subsequent_events[break_condition].index[0]
+        else:
+            end_index = event_df.index[-1]
+        transition_opportunities.append(event_df.loc[start_index : end_index - 1])
+
+    return transition_opportunities
+
+
+def make_transition_events(seed=0, n=400, n_games=1, n_periods=1):
+    """Events with rebounds, some without a player or team, over n_games games split evenly into n_periods periods."""
+    rng = np.random.default_rng(seed)
+    event_type = rng.choice(["SHOT", "REB", "FOUL", "TOV"], n, p=[0.4, 0.3, 0.15, 0.15])
+    event_df = pd.DataFrame(
+        {
+            "gameId": np.sort(rng.integers(0, n_games, n)).astype(str),
+            "eventType": event_type,
+            "playerId": np.where(rng.random(n) < 0.1, None, rng.integers(0, 20, n).astype(str)),
+            "teamId": np.where(rng.random(n) < 0.05, None, rng.choice(["1", "2"], n, p=[0.5, 0.5])),
+            "wcTime": np.arange(n) * 1000,
+            "dReb": pd.array(np.where(event_type == "REB", rng.random(n) < 0.7, None), dtype="boolean"),
+        }
+    )
+    event_df["period"] = event_df.groupby("gameId").cumcount() * n_periods // event_df.groupby("gameId")["gameId"].transform("size") + 1
+    # The last event doesn't extend an opportunity (the original dropped it)
+    event_df.loc[n - 1, ["teamId", "dReb"]] = [None, None]
+
+    return event_df
+
+
+def calculate_oreb_ppp_loop(event_df, off_rebounds_df):
+    """The original per-rebound scan from calculate_oreb_ppp, filtering the events after every rebound."""
+    points_after_rebounds = []
+    for _, rebound in off_rebounds_df.iterrows():
+        subsequent_events = event_df.loc[
+            (event_df["gameId"] == rebound["gameId"])
+            & (event_df["period"] == rebound["period"])
+            & (event_df["wcTime"] > rebound["wcTime"])
+        ].sort_values(by="wcTime")
+        first_shot = subsequent_events.loc[subsequent_events["eventType"] == "SHOT"].head(1)
+        if not first_shot.empty:
+            points = 3 if (first_shot.iloc[0]["made"] and first_shot.iloc[0]["three"]) else (2 if first_shot.iloc[0]["made"] else 0)
+        else:
+            points = 0
+        points_after_rebounds.append(points)
+
+    return sum(points_after_rebounds) / len(points_after_rebounds) if points_after_rebounds else 0
+
+
+def make_oreb_events(seed=0, n=300):
+    """Shots, rebounds and fouls across two games/four periods, some without a wcTime, sorted by game and time."""
+    rng = np.random.default_rng(seed)
+    event_type = rng.choice(["SHOT", "REB", "FOUL"], n, p=[0.55, 0.35, 0.1])
+    event_df = pd.DataFrame(
+        {
+            "gameId": rng.choice(["0022300001", "0022300002"], n),
+            "eventType": event_type,
+            "playerId": rng.integers(0, 20, n).astype(str),
+            "teamId": rng.choice(["1", "2"], n),
+            "period": rng.integers(1, 5, n),
+            "wcTime": (rng.permutation(n) * 1000).astype(float),
+            "scTime": rng.uniform(0, 24, n),
+            "made": pd.array(np.where(event_type == "SHOT", rng.random(n) < 0.45, None), dtype="boolean"),
+            "three": rng.random(n) < 0.35,
+            "dReb": pd.array(np.where(event_type == "REB", rng.random(n) < 0.7, None), dtype="boolean"),
+        }
+    )
+    # Events without a time (shots and rebounds)
+    event_df.loc[rng.choice(n, 20, replace=False), "wcTime"] = np.nan
+
+    return event_df.sort_values(["gameId", "wcTime"], ignore_index=True)
+
+
+def calculate_true_points_loop(df):
+    """The original iterrows scan from calculate_true_points, filtering the shooter's free throws after every foul."""
+    shots_df = df[df["eventType"] == "SHOT"].copy()
+    shots_df["points_produced"] = 0
+    shots_df["true_points_produced"] = 0
+
+    for index, row in shots_df.iterrows():
+        points = 0
+        if row["made"]:
+            points += 3 if row["three"] else 2
+        shots_df.at[index, "points_produced"] = points
+
+        shot_index = df.index.get_loc(index)
+        if shot_index + 1 < len(df):
+            next_event = df.iloc[shot_index + 1]
+            if next_event["eventType"] == "FOUL" and next_event["fouledId"] == row["playerId"]:
+                free_throws = df[
+                    (df["eventType"] == "FT")
+                    & (df["wcTime"] > next_event["wcTime"])
+                    & (df["playerId"] == row["playerId"])
+                    & (df["gameId"] == row["gameId"])
+                ].sort_values(by="wcTime")
+
+                for ft in free_throws.itertuples():
+                    if ft.made:
+                        points += 1
+                    ft_index = df.index.get_loc(ft.Index)
+                    if ft_index + 1 < len(df):
+                        next_ft_event = df.iloc[ft_index + 1]
+                        if next_ft_event["eventType"] != "FT" and not (
+                            next_ft_event["eventType"] == "REB" and pd.isna(next_ft_event["playerId"]) and not ft.made
+                        ):
+                            break
+
+        shots_df.at[index, "true_points_produced"] = points
+
+    return shots_df
+
+
+def make_free_throw_events(seed=0, n_trips=150):
+    """Shots, shooting fouls and free throw trips (with team rebounds after missed FTs) in a single period per game."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    wc_time = 0
+    for trip in range(n_trips):
+        game_id = "0022300001" if trip < n_trips // 2 else "0022300002"
+        shooter = str(rng.integers(0, 6))
+
+        def add(event_type, **values):
+            nonlocal wc_time
+            wc_time += int(rng.integers(1, 5)) * 1000
+            rows.append({"gameId": game_id, "eventType": event_type, "period": 1, "wcTime": float(wc_time), **values})
+
+        made = bool(rng.random() < 0.45)
+        add("SHOT", playerId=shooter, made=made, three=bool(rng.random() < 0.35))
+        if rng.random() < 0.5:
+            add("FOUL", playerId=str(rng.integers(6, 12)), fouledId=shooter if rng.random() < 0.9 else "99")
+            for _ in range(rng.integers(1, 4)):
+                ft_made = bool(rng.random() < 0.75)
+                add("FT", playerId=shooter, made=ft_made)
+                if not ft_made and rng.random() < 0.5:
+                    add("REB", playerId=None, dReb=False)
+        else:
+            add("REB", playerId=str(rng.integers(0, 12)), dReb=bool(rng.random() < 0.7))
+
+    event_df = pd.DataFrame(rows)
+    event_df["made"] = event_df["made"].astype("boolean")
+    return event_df
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    FRAME_CACHE.clear()
+    yield
+    FRAME_CACHE.clear()
+
+
+@pytest.fixture
+def source_data(tmp_path, monkeypatch):
+    """Writes the synthetic sources to data/src/*.csv under a temp working dir (the loaders' paths are relative)."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data/src")
+
+    tracking_df = make_tracking()
+    possessions_df = make_possessions(tracking_df)
+    events_df = make_possession_events(possessions_df)
+    tracking_df.to_csv("data/src/tracking.csv", index=False)
+    possessions_df.to_csv("data/src/possessions.csv", index=False)
+    events_df.to_csv("data/src/events.csv", index=False)
+
+    return {"tracking": tracking_df, "possessions": possessions_df, "events": events_df}
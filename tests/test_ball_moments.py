@@ -0,0 +1,108 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.TrackingProcessor import TrackingProcessor
+from code.util.FeatureUtil import VECTORIZED_PREDICATES, FeatureUtil
+from tests.conftest import BASKET_X, make_possessions, make_tracking
+
+PREDICATES = [
+    FeatureUtil.is_beyond_halfcourt,
+    FeatureUtil.is_past_far_three_point_line,
+    FeatureUtil.is_in_paint,
+    FeatureUtil.is_in_center_three,
+]
+
+
+def find_ball_moment_loop(df, condition_function, basket_x):
+    # The original per-row scan
+    ball_df = df[df["teamId"] == "-1"]
+    for _, row in ball_df.iterrows():
+        if condition_function(row["x"], row["y"], basket_x):
+            return {"timestamp": row["wcTime"], "x": row["x"], "y": row["y"]}
+    return None
+
+
+def near_basket(x, y, basket_x):
+    # Scalar-only predicate (math.hypot doesn't take arrays, and/if need a single truth value)
+    if x is None:
+        return False
+    return math.hypot(x - basket_x, y) < 30 and y > 0
+
+
+@pytest.fixture(scope="module")
+def tracking_df():
+    return make_tracking().sort_values(["gameId", "wcTime"], kind="stable", ignore_index=True)
+
+
+@pytest.mark.parametrize("condition", PREDICATES + [near_basket])
+@pytest.mark.parametrize("basket_x", [BASKET_X, -BASKET_X])
+def test_find_ball_moment_matches_loop(tracking_df, condition, basket_x):
+    assert FeatureUtil.find_ball_moment(tracking_df, condition, basket_x) == find_ball_moment_loop(tracking_df, condition, basket_x)
+
+
+def test_find_ball_moment_without_a_hit(tracking_df):
+    assert FeatureUtil.find_ball_moment(tracking_df, lambda x, y, basket_x: x > 100, BASKET_X, vectorized=True) is None
+    assert FeatureUtil.find_ball_moment(tracking_df, lambda x, y, basket_x: x > 100, BASKET_X) is None
+
+
+@pytest.mark.parametrize("name", VECTORIZED_PREDICATES)
+def test_registered_predicates_take_arrays(tracking_df, name):
+    predicate = getattr(FeatureUtil, name)
+    x, y = tracking_df["x"].to_numpy(dtype=float), tracking_df["y"].to_numpy(dtype=float)
+    basket_x = np.where(np.arange(len(x)) % 2, BASKET_X, -BASKET_X)
+
+    mask = FeatureUtil._evaluate_condition(predicate, x, y, basket_x)
+    per_row = FeatureUtil._evaluate_condition(predicate, x, y, basket_x, vectorized=False)
+    np.testing.assert_array_equal(mask, per_row)
+
+
+def test_predicates_are_called_once_only_when_vectorized(tracking_df):
+    calls = []
+
+    def count_calls(x, y, basket_x):
+        calls.append(np.ndim(x))
+        return np.asarray(x) > 0
+
+    n_ball = (tracking_df["teamId"] == "-1").sum()
+    FeatureUtil.find_ball_moment(tracking_df, count_calls, BASKET_X, vectorized=True)
+    assert calls == [1]
+
+    calls.clear()
+    FeatureUtil.find_ball_moment(tracking_df, count_calls, BASKET_X)
+    assert calls == [0] * n_ball
+
+
+def test_vectorized_predicate_must_return_one_value_per_row(tracking_df):
+    with pytest.raises(ValueError):
+        FeatureUtil.find_ball_moment(tracking_df, lambda x, y, basket_x: True, BASKET_X, vectorized=True)
+    with pytest.raises(ValueError):
+        FeatureUtil.find_ball_moments(tracking_df, make_possessions(tracking_df), lambda x, y, basket_x: x[:1] > 0, vectorized=True)
+
+
+@pytest.mark.parametrize("condition", PREDICATES + [near_basket])
+def test_find_ball_moments_matches_loop(tracking_df, condition):
+    windows_df = make_possessions(tracking_df)
+    windows_df.loc[1, "wcEnd"] = windows_df.loc[1, "wcStart"] - 1  # Empty window
+
+    moments = FeatureUtil.find_ball_moments(tracking_df, windows_df, condition)
+
+    for label, window in windows_df.iterrows():
+        frames = tracking_df.loc[
+            (tracking_df["gameId"] == window["gameId"]) & tracking_df["wcTime"].between(window["wcStart"], window["wcEnd"])
+        ]
+        expected = find_ball_moment_loop(frames, condition, window["basketX"])
+        if expected is None:
+            assert pd.isna(moments.loc[label, "timestamp"])
+        else:
+            assert moments.loc[label].tolist() == [expected["timestamp"], expected["x"], expected["y"]]
+
+
+def test_find_ball_moments_with_precomputed_mask(tracking_df):
+    windows_df = make_possessions(tracking_df)
+    mask = (tracking_df["x"] > 0).to_numpy()
+
+    from_mask = FeatureUtil.find_ball_moments(tracking_df, windows_df, mask)
+    for vectorized in (True, False):
+        from_predicate = FeatureUtil.find_ball_moments(tracking_df, windows_df, lambda x, y, basket_x: x > 0, vectorized=vectorized)
+        pd.testing.assert_frame_equal(from_mask, from_predicate)
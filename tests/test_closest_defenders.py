@@ -0,0 +1,72 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.FrameCube import FrameCube
+from code.util.FeatureUtil import FeatureUtil
+from tests.conftest import GAME_IDS, TEAM_IDS, make_tracking
+
+
+@pytest.fixture(scope="module")
+def tracking_df():
+    return make_tracking()
+
+
+def test_batch_matches_per_moment_lookup(tracking_df):
+    game_df = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0]]
+    off_id = TEAM_IDS[GAME_IDS[0]][0]
+
+    batch = FeatureUtil.find_closest_defenders_batch(FrameCube.from_tracking(game_df), off_id)
+
+    assert len(batch) == game_df["wcTime"].nunique() * 5
+    for wc_time, moment in batch.groupby("wcTime"):
+        expected = FeatureUtil.find_closest_defenders(game_df, off_id, wc_time).sort_values("off_player_id", ignore_index=True)
+        moment = moment.sort_values("off_player_id", ignore_index=True)
+        assert moment["closest_defender_id"].tolist() == expected["closest_defender_id"].tolist()
+        np.testing.assert_allclose(moment["distance"], expected["distance"], rtol=1e-5)
+
+
+def test_batch_across_games(tracking_df):
+    moments = tracking_df.drop_duplicates(["gameId", "wcTime"]).iloc[::7]
+    off_ids = moments["gameId"].map(lambda game_id: TEAM_IDS[game_id][1])
+
+    batch = FeatureUtil.find_closest_defenders_batch(
+        tracking_df, off_ids.to_numpy(), moments["wcTime"].to_numpy(), moments["gameId"].to_numpy()
+    )
+
+    assert len(batch) == len(moments) * 5
+    for (game_id, wc_time), moment in batch.groupby(["gameId", "wcTime"]):
+        game_df = tracking_df.loc[tracking_df["gameId"] == game_id]
+        expected = FeatureUtil.find_closest_defenders(game_df, TEAM_IDS[game_id][1], wc_time)
+        assert dict(zip(moment["off_player_id"], moment["closest_defender_id"])) == dict(
+            zip(expected["off_player_id"], expected["closest_defender_id"])
+        )
+
+
+def test_unique_assignment_is_optimal(tracking_df):
+    game_df = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[1]]
+    off_id = TEAM_IDS[GAME_IDS[1]][0]
+    timestamps = np.unique(game_df["wcTime"])[::5]
+
+    batch = FeatureUtil.find_closest_defenders_batch(game_df, off_id, timestamps, unique_defender=True)
+
+    for wc_time, moment in batch.groupby("wcTime"):
+        assert moment["closest_defender_id"].is_unique
+        frame = game_df.loc[game_df["wcTime"] == wc_time]
+        offense = frame.loc[frame["teamId"] == off_id, ["x", "y"]].to_numpy()
+        defense = frame.loc[(frame["teamId"] != off_id) & (frame["teamId"] != "-1"), ["x", "y"]].to_numpy()
+        distances = np.sqrt(((offense[:, None] - defense[None]) ** 2).sum(axis=-1))
+        best = min(distances[np.arange(5), list(perm)].sum() for perm in itertools.permutations(range(5)))
+        greedy = FeatureUtil.find_closest_defenders(frame, off_id, wc_time, unique_defender=True)["distance"].sum()
+
+        assert moment["distance"].sum() == pytest.approx(best, rel=1e-5)
+        assert moment["distance"].sum() <= greedy + 1e-4
+
+
+def test_moments_without_a_frame_are_skipped(tracking_df):
+    game_df = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0]]
+    off_id = TEAM_IDS[GAME_IDS[0]][0]
+    wc_time = game_df["wcTime"].iloc[0]
+
+    batch = FeatureUtil.find_closest_defenders_batch(game_df, off_id, [wc_time, wc_time + 1])
+    assert set(batch["wcTime"]) == {wc_time}
@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+from code.io.GameStore import GameStore
+from code.io.TrackingProcessor import COMPACT_CATEGORICAL_COLS, DTYPES, SOURCE, SRC_PATH, TrackingProcessor
+from tests.conftest import GAME_IDS
+
+
+def test_compact_schema(source_data):
+    tracking_df = TrackingProcessor.load_games()
+    compact_df = TrackingProcessor.load_games(compact=True)
+
+    assert compact_df["x"].dtype == "float32" and compact_df["period"].dtype == "int8"
+    for col in COMPACT_CATEGORICAL_COLS:
+        assert isinstance(compact_df[col].dtype, pd.CategoricalDtype)
+        assert list(compact_df[col].cat.categories) == sorted(tracking_df[col].dropna().unique())
+    assert ((compact_df["teamId"] == "-1") == (tracking_df["teamId"] == "-1")).all()
+    pd.testing.assert_frame_equal(compact_df.astype(tracking_df.dtypes.to_dict()), tracking_df, check_exact=False, rtol=1e-6)
+
+
+def test_compact_games_concat_across_processes(source_data):
+    games = dict(TrackingProcessor.iter_games(compact=True))
+    # A fresh process only has the persisted vocabulary to go on
+    GameStore._vocabularies.clear()
+    games[GAME_IDS[1]] = TrackingProcessor.load_game(GAME_IDS[1], compact=True)
+
+    combined = pd.concat([games[game_id] for game_id in GAME_IDS], ignore_index=True)
+
+    for col in COMPACT_CATEGORICAL_COLS:
+        assert isinstance(combined[col].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(combined, TrackingProcessor.load_games(compact=True))
+
+
+def test_vocabulary_is_persisted_per_source(source_data):
+    vocabulary = TrackingProcessor.id_dictionary("playerId")
+    assert os.path.exists(SRC_PATH + ".vocab.json")
+
+    # Rebuilt once the csv changes
+    tracking_df = source_data["tracking"]
+    tracking_df.loc[0, "playerId"] = "0000"
+    tracking_df.to_csv(SRC_PATH, index=False)
+    assert TrackingProcessor.id_dictionary("playerId") == sorted(vocabulary + ["0000"])
+
+    # And kept in the store once the source is ingested
+    TrackingProcessor.ingest()
+    assert GameStore.vocabulary(SOURCE, SRC_PATH, DTYPES, ["playerId", "shotClock"]) == {"playerId": sorted(vocabulary + ["0000"])}
+    assert os.path.exists(os.path.join(GameStore.source_dir(SOURCE), "_vocabulary.json"))
+
+
+def test_values_outside_the_source_are_appended(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No tracking source
+    compact_df = TrackingProcessor.to_compact(pd.DataFrame({"teamId": ["2", None, "1"], "x": [1.0, 2.0, 3.0]}))
+
+    assert list(compact_df["teamId"].cat.categories) == ["1", "2"]
+    assert compact_df["teamId"].isna().tolist() == [False, True, False]
+
+
+def test_transforms_are_cached_separately(source_data):
+    frames = [
+        GameStore.load(SOURCE, SRC_PATH, DTYPES, [GAME_IDS[0]], lambda df, value=value: df.assign(value=value))
+        for value in (1, 2)
+    ]
+
+    assert frames[0]["value"].iloc[0] == 1
+    assert frames[1]["value"].iloc[0] == 2
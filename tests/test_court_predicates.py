@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.FrameCube import FrameCube
+from code.util.FeatureUtil import COURT_PREDICATES, FeatureUtil
+from tests.conftest import BASKET_X, GAME_IDS, make_tracking
+
+
+class ScalarPredicates:
+    """The original scalar court predicates, one position at a time."""
+
+    def is_in_paint(x, y, basket_x):
+        if basket_x > 0:
+            return -8 <= x <= 8 and 0 <= y <= 19
+        return -8 <= x <= 8 and -19 <= y <= 0
+
+    def is_under_basket(x, y, basket_x):
+        return (x - basket_x) ** 2 + y**2 <= 4**2
+
+    def is_in_zone_of_death(x, y, basket_x):
+        in_backcourt = (x < 0) if basket_x > 0 else (x > 0)
+        distance_from_basket = np.sqrt((x - basket_x) ** 2 + y**2)
+        if abs(y) <= 14:
+            return in_backcourt and distance_from_basket > 22
+        return in_backcourt and distance_from_basket > 23.75
+
+    def is_past_far_three_point_line(x, y, basket_x):
+        far_three_point_line = basket_x - 23.75 if basket_x > 0 else basket_x + 23.75
+        return (basket_x > 0 and x > far_three_point_line) or (basket_x < 0 and x < far_three_point_line)
+
+    def is_out_of_bounds(x, y, basket_x):
+        in_half_court = x > 0 if basket_x > 0 else x < 0
+        in_court_bounds = 0 <= x <= 94 and -25 <= y <= 25
+        return not in_half_court or not in_court_bounds
+
+    def is_at_free_throw_line(x, y, basket_x):
+        is_correct_half = (x > 0) if basket_x > 0 else (x < 0)
+        return is_correct_half and -1 <= x <= 1 and y == -19
+
+    def is_near_sideline(x, y, basket_x):
+        return abs(y) >= 22
+
+
+def make_positions(seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-50, 50, n).round(1)
+    y = rng.uniform(-28, 28, n).round(1)
+    # Exact boundary values (free throw line, paint edges, sidelines)
+    x[:40] = rng.choice([-1.0, -0.5, 0.0, 0.5, 1.0, 8.0, -8.0], 40)
+    y[:40] = rng.choice([-19.0, 19.0, 0.0, 14.0, 22.0, -25.0], 40)
+    basket_x = rng.choice([BASKET_X, -BASKET_X], n)
+
+    return x, y, basket_x
+
+
+@pytest.mark.parametrize("name", COURT_PREDICATES)
+def test_vectorized_predicates_match_scalar(name):
+    x, y, basket_x = make_positions()
+    expected = np.array([getattr(ScalarPredicates, name)(*values) for values in zip(x, y, basket_x)], dtype=bool)
+
+    np.testing.assert_array_equal(getattr(FeatureUtil, name)(x, y, basket_x), expected)
+    assert bool(getattr(FeatureUtil, name)(x[0], y[0], basket_x[0])) == expected[0]
+
+
+def test_court_context_matches_scalar():
+    x, y, basket_x = make_positions(seed=1)
+    frames = pd.DataFrame({"x": x, "y": y, "basketX": basket_x}, index=np.arange(len(x)) * 2)
+
+    context = FeatureUtil.court_context(frames)
+
+    assert list(context.columns) == COURT_PREDICATES
+    assert context.index.equals(frames.index)
+    for name in COURT_PREDICATES:
+        expected = [getattr(ScalarPredicates, name)(*values) for values in zip(x, y, basket_x)]
+        assert context[name].tolist() == expected
+
+
+def test_court_context_over_frame_cube():
+    tracking_df = make_tracking()
+    cube = FrameCube.from_tracking(tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0]])
+    basket_x = np.where(np.arange(len(cube)) % 2, BASKET_X, -BASKET_X)
+
+    context = FeatureUtil.court_context(cube, basket_x)
+
+    x, y = cube.xy[..., 0], cube.xy[..., 1]
+    for name in COURT_PREDICATES:
+        assert context[name].shape == x.shape
+        for frame, slot in [(0, 0), (7, 4), (13, 10)]:
+            expected = getattr(ScalarPredicates, name)(float(x[frame, slot]), float(y[frame, slot]), basket_x[frame])
+            assert context[name][frame, slot] == expected
@@ -0,0 +1,112 @@
+import os
+import pandas as pd
+import pytest
+from code.io.CsvIndex import CsvIndex
+from code.io.EventProcessor import EventProcessor
+from code.io.FrameCache import FRAME_CACHE
+from code.io.GameStore import GameStore
+from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingProcessor import DTYPES, SRC_PATH, TrackingProcessor
+from tests.conftest import GAME_IDS
+
+# Requested in reverse file order, every backend returns file order
+REQUESTED = list(reversed(GAME_IDS))
+LOADS = {
+    "all": lambda: TrackingProcessor.load_games(),
+    "games": lambda: TrackingProcessor.load_games(REQUESTED),
+    "single": lambda: TrackingProcessor.load_game(GAME_IDS[1]),
+    "projected": lambda: TrackingProcessor.load_games(REQUESTED, columns=["wcTime", "teamId", "x"], periods=[2]),
+    "ball": lambda: TrackingProcessor.load_games(REQUESTED, entity="ball", time_range=(1_700_000_000_400, 1_710_000_001_000)),
+    "parallel": lambda: TrackingProcessor.load_games_parallel(REQUESTED, max_workers=1),
+    "iter": lambda: pd.concat([df for _, df in TrackingProcessor.iter_games(REQUESTED)], ignore_index=True),
+    "events": lambda: EventProcessor.load_games(REQUESTED),
+    "possessions": lambda: PossessionProcessor.load_games(REQUESTED, periods=[1]),
+}
+
+
+def load_all():
+    results = {}
+    for name, load in LOADS.items():
+        FRAME_CACHE.clear()
+        results[name] = load().copy()
+    return results
+
+
+def test_backends_return_identical_frames(source_data):
+    from_csv = load_all()
+    assert list(pd.unique(from_csv["games"]["gameId"])) == GAME_IDS
+
+    for processor in (TrackingProcessor, EventProcessor, PossessionProcessor):
+        processor.index_csv()
+    from_index = load_all()
+
+    for processor in (EventProcessor, PossessionProcessor):
+        processor.ingest()
+    TrackingProcessor.ingest(normalize=False)
+    from_store = load_all()
+
+    for name in LOADS:
+        pd.testing.assert_frame_equal(from_index[name], from_csv[name], obj=f"index {name}")
+        pd.testing.assert_frame_equal(from_store[name], from_csv[name], obj=f"store {name}")
+
+
+def test_index_covers_each_game(source_data):
+    index = TrackingProcessor.index_csv()
+
+    tracking_df = source_data["tracking"]
+    assert list(index["games"]) == GAME_IDS
+    assert {game_id: rows for game_id, (_, _, rows) in index["games"].items()} == tracking_df["gameId"].value_counts().to_dict()
+    # Blocks smaller than a line still find the same boundaries
+    assert CsvIndex.build(SRC_PATH, block_size=64)["games"] == index["games"]
+    parsed_df = pd.read_csv(SRC_PATH, dtype=DTYPES)
+    for game_id in GAME_IDS:
+        expected = parsed_df.loc[parsed_df["gameId"] == game_id].reset_index(drop=True)
+        pd.testing.assert_frame_equal(CsvIndex.read_game(SRC_PATH, index, game_id, DTYPES), expected)
+
+
+def test_stale_index_is_ignored(source_data):
+    TrackingProcessor.index_csv()
+    assert CsvIndex.load(SRC_PATH) is not None
+
+    # Touched: same size, new mtime
+    stat = os.stat(SRC_PATH)
+    os.utime(SRC_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert CsvIndex.load(SRC_PATH) is None
+
+    # Rewritten with fewer rows: new size, and loads see the new rows rather than the old offsets
+    TrackingProcessor.index_csv()
+    tracking_df = source_data["tracking"]
+    tracking_df.iloc[11:].to_csv(SRC_PATH, index=False)
+    assert CsvIndex.load(SRC_PATH) is None
+    assert len(TrackingProcessor.load_game(GAME_IDS[0])) == (tracking_df["gameId"] == GAME_IDS[0]).sum() - 11
+
+
+def test_csv_without_leading_game_id_is_rejected(source_data):
+    tracking_df = source_data["tracking"]
+    tracking_df[["period"] + [col for col in tracking_df.columns if col != "period"]].to_csv(SRC_PATH, index=False)
+
+    with pytest.raises(ValueError, match="first column"):
+        TrackingProcessor.index_csv()
+    assert not os.path.exists(CsvIndex.path(SRC_PATH))
+
+
+def test_quoted_newlines_are_rejected(source_data):
+    tracking_df = source_data["tracking"]
+    tracking_df.loc[tracking_df.index[-1], "playerName"] = "Player\nName"
+    tracking_df.to_csv(SRC_PATH, index=False)
+
+    with pytest.raises(ValueError, match="quoted newline"):
+        TrackingProcessor.index_csv()
+    assert not os.path.exists(CsvIndex.path(SRC_PATH))
+
+
+@pytest.mark.parametrize("backend", ["csv", "index", "store"])
+def test_unknown_games_are_skipped(source_data, backend):
+    if backend == "index":
+        EventProcessor.index_csv()
+    elif backend == "store":
+        EventProcessor.ingest()
+
+    event_df = EventProcessor.load_games(["missing", GAME_IDS[0]])
+    assert set(event_df["gameId"]) == {GAME_IDS[0]}
+    assert GameStore.has_source("events") == (backend == "store")
@@ -0,0 +1,100 @@
+import contextlib
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.EventProcessor import EventProcessor
+from code.io.FrameCache import FRAME_CACHE, FrameCache
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS
+
+
+def make_frame():
+    return pd.DataFrame(
+        {
+            "teamId": pd.Series(["1", "-1", "2"], dtype=object),
+            "x": [1.0, 2.0, 3.0],
+            "made": pd.array([True, None, False], dtype="boolean"),
+        }
+    )
+
+
+def test_cached_loads_compare_strings(source_data):
+    for _ in range(2):  # miss, then hit
+        event_df = EventProcessor.load_games()
+        tracking_df = TrackingProcessor.load_game(GAME_IDS[0])
+        assert (event_df["eventType"] == "SHOT").sum() == (source_data["events"]["eventType"] == "SHOT").sum()
+        assert (tracking_df["teamId"] == "-1").sum() == (source_data["tracking"]["gameId"] == GAME_IDS[0]).sum() // 11
+
+    assert FRAME_CACHE.stats()["hits"] == 2
+    assert FRAME_CACHE.stats()["misses"] == 2
+
+
+def test_ingest_invalidates_source(source_data):
+    EventProcessor.load_games()
+    TrackingProcessor.load_games()
+    EventProcessor.ingest()
+
+    assert [key[0] for key in FRAME_CACHE._entries] == ["tracking"]
+
+
+def test_numeric_columns_are_frozen():
+    cache = FrameCache()
+    view = cache.get_or_load(("frames",), make_frame)
+
+    assert cache.nbytes > 0
+    with pytest.raises(ValueError):
+        view["x"].to_numpy()[0] = 5.0
+
+
+def test_hits_share_object_columns_without_copying():
+    cache = FrameCache()
+    cached = cache.get_or_load(("frames",), make_frame)
+    view = cache.get_or_load(("frames",), lambda: None)
+
+    assert view is not cached
+    assert np.shares_memory(view["teamId"].to_numpy(), cached["teamId"].to_numpy())
+    assert cache.nbytes == FrameCache._sizeof(make_frame())
+
+
+def test_column_assignment_does_not_reach_cache():
+    cache = FrameCache()
+    view = cache.get_or_load(("frames",), make_frame)
+    view["teamId"] = "2"
+    view["x"] = view["x"] * 2
+
+    cached = cache.get_or_load(("frames",), lambda: None)
+    pd.testing.assert_frame_equal(cached, make_frame())
+
+
+def test_copy_on_write_isolates_views():
+    cache = FrameCache()
+    # Always on from pandas 3 (where the option is deprecated)
+    pandas_3 = int(pd.__version__.split(".")[0]) >= 3
+    with contextlib.nullcontext() if pandas_3 else pd.option_context("mode.copy_on_write", True):
+        view = cache.get_or_load(("frames",), make_frame)
+        view.loc[0, "teamId"] = "2"
+        view.loc[0, "made"] = False
+        view.loc[0, "x"] = 5.0
+
+        cached = cache.get_or_load(("frames",), lambda: None)
+        pd.testing.assert_frame_equal(cached, make_frame())
+
+
+def test_oversized_values_are_returned_uncached():
+    cache = FrameCache(max_bytes=8)
+    arr = np.arange(10.0)
+
+    assert cache.get_or_load(("arr",), lambda: arr) is arr
+    assert arr.flags.writeable
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = FrameCache(max_bytes=3 * 80)
+    for name in ("a", "b", "c"):
+        cache.get_or_load((name,), lambda: np.zeros(10))
+    cache.get_or_load(("a",), lambda: None)
+    cache.get_or_load(("d",), lambda: np.zeros(10))
+
+    assert [key[0] for key in cache._entries] == ["c", "a", "d"]
+    assert cache.stats()["evictions"] == 1
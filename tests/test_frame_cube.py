@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from code.io.FrameCube import BALL_SLOT, FrameCube
+from tests.conftest import GAME_IDS, N_FRAMES, make_tracking
+
+
+def game_tracking():
+    tracking_df = make_tracking()
+    return tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0]].reset_index(drop=True)
+
+
+def test_players_keep_their_slot_across_frames():
+    cube = FrameCube.from_tracking(game_tracking())
+
+    assert cube.positions.shape == (N_FRAMES, 11, 3)
+    for slot in range(BALL_SLOT):
+        assert len(set(cube.player_ids[:, slot])) == 1
+
+
+def test_substitute_takes_the_vacated_slot():
+    tracking_df = game_tracking()
+    frames = np.unique(tracking_df["wcTime"])
+    sub_frames = tracking_df["wcTime"].isin(frames[20:40])
+    outgoing = sorted(tracking_df.loc[tracking_df["teamId"] == "1610612737", "playerId"].unique())[1]
+    tracking_df.loc[sub_frames & (tracking_df["playerId"] == outgoing), "playerId"] = "9999"
+
+    cube = FrameCube.from_tracking(tracking_df)
+    slot = list(cube.player_ids[0]).index(outgoing)
+
+    assert set(cube.player_ids[20:40, slot]) == {"9999"}
+    assert set(cube.player_ids[40:, slot]) == {outgoing}
+    for other in set(range(BALL_SLOT)) - {slot}:
+        assert len(set(cube.player_ids[:, other])) == 1
+
+
+def test_positions_match_long_format():
+    tracking_df = game_tracking()
+    cube = FrameCube.from_tracking(tracking_df)
+
+    rebuilt = cube.to_dataframe()
+    keys = ["wcTime", "teamId", "playerId"]
+    expected = tracking_df.sort_values(keys, na_position="first", ignore_index=True)
+    rebuilt = rebuilt.sort_values(keys, na_position="first", ignore_index=True)
+    np.testing.assert_allclose(rebuilt[["x", "y", "z"]].to_numpy(float), expected[["x", "y", "z"]].to_numpy(float), rtol=1e-6)
+    assert rebuilt["playerId"].fillna("").tolist() == expected["playerId"].fillna("").tolist()
+
+
+def test_frame_lookups():
+    tracking_df = make_tracking()
+    cubes = FrameCube.from_games(tracking_df)
+
+    assert list(cubes) == GAME_IDS
+    cube = cubes[GAME_IDS[1]]
+    wc_time = np.unique(tracking_df.loc[tracking_df["gameId"] == GAME_IDS[1], "wcTime"])
+    np.testing.assert_array_equal(cube.wc_time, wc_time)
+    np.testing.assert_array_equal(cube.frame_index([wc_time[3], wc_time[3] + 1, wc_time[-1]]), [3, -1, N_FRAMES - 1])
+    assert cube.frames_between(wc_time[2] - 1, wc_time[5]) == slice(2, 6)
+    ball = tracking_df.loc[(tracking_df["gameId"] == GAME_IDS[1]) & (tracking_df["teamId"] == "-1")].sort_values("wcTime")
+    np.testing.assert_allclose(cube.ball[:, :2], ball[["x", "y"]].to_numpy(np.float32))
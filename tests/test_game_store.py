@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from code.io.EventProcessor import EventProcessor
+from code.io.GameStore import GameStore
+from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS
+
+PROCESSORS = {"tracking": TrackingProcessor, "events": EventProcessor, "possessions": PossessionProcessor}
+
+
+def test_ingest_writes_manifest(source_data):
+    manifest = TrackingProcessor.ingest(chunksize=250)
+
+    tracking_df = source_data["tracking"]
+    assert manifest["games"] == GAME_IDS
+    assert manifest["columns"] == list(tracking_df.columns) + ["nx", "ny"]
+    assert manifest["rows"] == tracking_df["gameId"].value_counts().to_dict()
+    assert GameStore.game_ids("tracking") == GAME_IDS
+
+
+def test_store_loads_match_csv(source_data):
+    requested = list(reversed(GAME_IDS))
+    from_csv = {name: (processor.load_games(), processor.load_games(requested)) for name, processor in PROCESSORS.items()}
+
+    for name, processor in PROCESSORS.items():
+        processor.ingest()
+        assert GameStore.has_source(name)
+        for from_store, expected in zip((processor.load_games(), processor.load_games(requested)), from_csv[name]):
+            # Besides the attack-normalized columns added to tracking at ingest
+            pd.testing.assert_frame_equal(from_store.drop(columns=["nx", "ny"], errors="ignore"), expected, obj=name)
+
+
+def test_store_returns_games_in_file_order(source_data):
+    TrackingProcessor.ingest()
+
+    for game_ids in (list(reversed(GAME_IDS)), np.array(GAME_IDS[::-1]), tuple(GAME_IDS)):
+        tracking_df = TrackingProcessor.load_games(game_ids)
+        assert list(pd.unique(tracking_df["gameId"])) == GAME_IDS
+
+
+def test_store_skips_unknown_games(source_data):
+    EventProcessor.ingest()
+
+    event_df = EventProcessor.load_games(["missing", GAME_IDS[1]])
+    expected = source_data["events"]
+    assert len(event_df) == (expected["gameId"] == GAME_IDS[1]).sum()
+    assert EventProcessor.load_games(["missing"]).empty
@@ -0,0 +1,71 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from code.util.VisUtil import VisUtil
+
+
+@pytest.fixture
+def shots_df():
+    rng = np.random.default_rng(0)
+    n = 40
+    sign = np.where(np.arange(n) % 2, 1.0, -1.0)  # Half the possessions attack each basket
+    shot_x, shot_y = rng.uniform(-47, 47, n), rng.uniform(-25, 25, n)
+    return pd.DataFrame(
+        {
+            "shot_x": shot_x,
+            "shot_y": shot_y,
+            "shot_nx": shot_x * sign,
+            "shot_ny": shot_y * sign,
+            "made": np.arange(n) % 3 == 0,
+        }
+    )
+
+
+def scattered(ax):
+    return [collection.get_offsets().data for collection in ax.collections[:2]]
+
+
+def test_halfcourt_coords(shots_df):
+    normalized = VisUtil.halfcourt_coords(shots_df, "shot_x", "shot_y")
+    np.testing.assert_array_equal(normalized["shot_x"], shots_df["shot_nx"])
+    np.testing.assert_array_equal(normalized["shot_y"], shots_df["shot_ny"])
+
+    # Without the flag (or the columns), the previous mirroring of every row
+    for df, normalized in ((shots_df, False), (shots_df.drop(columns=["shot_nx", "shot_ny"]), True)):
+        mirrored = VisUtil.halfcourt_coords(df, "shot_x", "shot_y", normalized)
+        np.testing.assert_array_equal(mirrored["shot_x"], -shots_df["shot_x"])
+        np.testing.assert_array_equal(mirrored["shot_y"], -shots_df["shot_y"])
+
+
+@pytest.mark.parametrize("normalized", [True, False])
+def test_plot_shots_and_regions_inputs(shots_df, monkeypatch, normalized):
+    monkeypatch.setattr(plt, "show", lambda: None)
+    fig, ax = plt.subplots()
+    VisUtil.plot_shots_and_regions(shots_df, ax=ax, normalized=normalized)
+
+    x_col, y_col, sign = ("shot_nx", "shot_ny", 1) if normalized else ("shot_x", "shot_y", -1)
+    made, missed = scattered(ax)
+    np.testing.assert_allclose(made, shots_df.loc[shots_df["made"], [x_col, y_col]].to_numpy() * sign)
+    np.testing.assert_allclose(missed, shots_df.loc[~shots_df["made"], [x_col, y_col]].to_numpy() * sign)
+    plt.close(fig)
+
+
+def test_plot_court_hexmap_inputs(shots_df):
+    hexmap = VisUtil.plot_court_hexmap(shots_df, "shot_x", "shot_y", return_data=True)
+    # Every shot lands on the plotted half attacking ATTACK_BASKET_X
+    expected = VisUtil.plot_court_hexmap(
+        shots_df.assign(shot_x=-shots_df["shot_nx"], shot_y=-shots_df["shot_ny"]).drop(columns=["shot_nx", "shot_ny"]),
+        "shot_x",
+        "shot_y",
+        return_data=True,
+    )
+    pd.testing.assert_frame_equal(hexmap, expected)
+    assert hexmap["density"].sum() == (shots_df["shot_nx"] >= 0).sum()
+
+    unnormalized = VisUtil.plot_court_hexmap(shots_df, "shot_x", "shot_y", return_data=True, normalized=False)
+    assert unnormalized["density"].sum() == (shots_df["shot_x"] <= 0).sum()
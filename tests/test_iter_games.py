@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from code.io.ActionProcessor import ActionProcessor
+from code.io.EventProcessor import EventProcessor
+from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS
+
+
+@pytest.mark.parametrize("ingest", [False, True])
+def test_iter_games_matches_load_game(source_data, ingest):
+    if ingest:
+        TrackingProcessor.ingest()
+
+    games = list(TrackingProcessor.iter_games(chunksize=100))
+
+    assert [game_id for game_id, _ in games] == GAME_IDS
+    for game_id, tracking_df in games:
+        pd.testing.assert_frame_equal(tracking_df, TrackingProcessor.load_game(game_id))
+
+
+@pytest.mark.parametrize("ingest", [False, True])
+def test_iter_games_keeps_requested_games(source_data, ingest):
+    if ingest:
+        EventProcessor.ingest()
+
+    games = list(EventProcessor.iter_games([GAME_IDS[1], "missing"], chunksize=3))
+    assert [game_id for game_id, _ in games] == [GAME_IDS[1]]
+    pd.testing.assert_frame_equal(games[0][1], EventProcessor.load_game(GAME_IDS[1]))
+
+
+def test_iter_games_rejects_interleaved_csv(source_data):
+    possessions_df = source_data["possessions"]
+    possessions_df.iloc[[0, -1, 1]].to_csv("data/src/possessions.csv", index=False)
+
+    with pytest.raises(ValueError, match="not contiguous"):
+        list(PossessionProcessor.iter_games(chunksize=1))
+
+
+def test_action_games_are_aligned(source_data):
+    games = list(ActionProcessor.iter_games())
+
+    assert [game.game_id for game in games] == GAME_IDS
+    for game in games:
+        for df in (game.event_df, game.tracking_df, game.possession_df):
+            assert set(df["gameId"]) == {game.game_id}
+
+    key = ["gameId", "shot_time"]
+    by_game = ActionProcessor.extract_shots_and_rebounds_by_game(iter(games))
+    expected = ActionProcessor.extract_shots_and_rebounds(EventProcessor.load_games(), TrackingProcessor.load_games())
+    assert len(by_game)
+    pd.testing.assert_frame_equal(by_game.sort_values(key, ignore_index=True), expected.sort_values(key, ignore_index=True))
@@ -0,0 +1,52 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from code.io.MemmapStore import LAYOUT_FILE, MemmapStore
+from code.io.TrackingProcessor import COMPACT_NUMERIC_DTYPES, SOURCE, TrackingProcessor
+from tests.conftest import GAME_IDS
+
+
+def test_export_round_trip(source_data):
+    layout = TrackingProcessor.export_memmap(chunksize=250)
+
+    pd.testing.assert_frame_equal(TrackingProcessor.load_games_memmap(), TrackingProcessor.load_games(compact=True))
+    for game_ids in ([GAME_IDS[1]], GAME_IDS[::-1]):
+        pd.testing.assert_frame_equal(
+            TrackingProcessor.load_games_memmap(game_ids), TrackingProcessor.load_games(game_ids, compact=True)
+        )
+    assert layout["offsets"][GAME_IDS[1]][1] - layout["offsets"][GAME_IDS[1]][0] == (source_data["tracking"]["gameId"] == GAME_IDS[1]).sum()
+
+
+def test_layout_stores_string_columns_as_int32_codes(source_data):
+    TrackingProcessor.export_memmap()
+
+    src_dir = MemmapStore.source_dir(SOURCE)
+    with open(os.path.join(src_dir, LAYOUT_FILE)) as f:
+        layout = json.load(f)
+    tracking_df = source_data["tracking"]
+    for col in layout["columns"]:
+        expected = COMPACT_NUMERIC_DTYPES.get(col, "int32")
+        assert layout["dtypes"][col] == expected
+        assert os.path.getsize(os.path.join(src_dir, f"{col}.bin")) == len(tracking_df) * np.dtype(expected).itemsize
+    assert layout["dictionaries"]["teamId"] == sorted(tracking_df["teamId"].unique())
+
+
+def test_numeric_columns_are_zero_copy(source_data):
+    TrackingProcessor.export_memmap()
+    _, arrays, _ = MemmapStore.open_source(SOURCE)
+
+    for game_ids in ("all", [GAME_IDS[0]]):
+        tracking_df = TrackingProcessor.load_games_memmap(game_ids)
+        for col in arrays.keys() & COMPACT_NUMERIC_DTYPES.keys():
+            values = tracking_df[col].to_numpy()
+            assert values.dtype == COMPACT_NUMERIC_DTYPES[col]
+            assert np.shares_memory(values, arrays[col])
+            assert not values.flags.writeable
+
+
+def test_unknown_games_are_skipped(source_data):
+    TrackingProcessor.export_memmap()
+
+    assert TrackingProcessor.load_games_memmap(["missing"]).empty
+    assert len(TrackingProcessor.load_games_memmap(["missing", GAME_IDS[0]])) == (source_data["tracking"]["gameId"] == GAME_IDS[0]).sum()
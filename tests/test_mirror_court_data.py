@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import BASKET_X
+
+
+def make_coords(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "x": rng.uniform(-47, 47, n),
+            "y": rng.uniform(-25, 25, n),
+            "shot_x": rng.uniform(-47, 47, n),
+            "shot_y": rng.uniform(-25, 25, n),
+        }
+    )
+
+
+def test_mirrors_every_row_without_basket_x():
+    coords_df = make_coords()
+    mirrored = TrackingProcessor.mirror_court_data(coords_df)
+
+    # Same as the row-wise version it replaced
+    expected = coords_df.copy()
+    expected["x"] = coords_df.apply(lambda row: -row["x"], axis=1)
+    expected["y"] = coords_df.apply(lambda row: -row["y"], axis=1)
+    pd.testing.assert_frame_equal(mirrored, expected)
+
+
+def test_mirrors_rows_attacking_the_other_basket():
+    coords_df = make_coords().assign(basket_x=lambda df: np.where(np.arange(len(df)) % 3, BASKET_X, -BASKET_X))
+    mirrored = TrackingProcessor.mirror_court_data(coords_df, basket_x=BASKET_X)
+
+    flip = coords_df["basket_x"] != BASKET_X
+    assert flip.any() and (~flip).any()
+    pd.testing.assert_series_equal(mirrored["x"], coords_df["x"].where(~flip, -coords_df["x"]))
+    # Rows already attacking basket_x keep their y (the row-wise version wrote x into it)
+    pd.testing.assert_series_equal(mirrored["y"], coords_df["y"].where(~flip, -coords_df["y"]))
+    pd.testing.assert_frame_equal(mirrored[["shot_x", "shot_y", "basket_x"]], coords_df[["shot_x", "shot_y", "basket_x"]])
+
+
+def test_inplace():
+    coords_df = make_coords()
+    original = coords_df.copy()
+
+    copied = TrackingProcessor.mirror_court_data(coords_df, inplace=False)
+    pd.testing.assert_frame_equal(coords_df, original)
+
+    mirrored = TrackingProcessor.mirror_court_data(coords_df, inplace=True)
+    assert mirrored is coords_df
+    pd.testing.assert_frame_equal(coords_df, copied)
+
+
+def test_col_pairs():
+    coords_df = make_coords()
+    mirrored = TrackingProcessor.mirror_court_data(coords_df, col_pairs=[("x", "y"), ("shot_x", "shot_y")])
+
+    pd.testing.assert_frame_equal(mirrored, -coords_df)
+    single = TrackingProcessor.mirror_court_data(coords_df, "shot_x", "shot_y")
+    pd.testing.assert_frame_equal(single[["x", "y"]], coords_df[["x", "y"]])
+    pd.testing.assert_frame_equal(single[["shot_x", "shot_y"]], -coords_df[["shot_x", "shot_y"]])
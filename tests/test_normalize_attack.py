@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from code.io.ActionProcessor import ActionProcessor
+from code.io.EventProcessor import EventProcessor
+from code.io.GameStore import GameStore
+from code.io.PossessionProcessor import PossessionProcessor
+from code.io.TrackingProcessor import ATTACK_BASKET_X, DTYPES, SOURCE, SRC_PATH, TrackingProcessor
+from tests.conftest import GAME_IDS, N_FRAMES
+
+
+def expected_basket_x(tracking_df, possessions_df):
+    # Loop version: the covering possession, else the previous one, else the next one (same game)
+    basket_x = {}
+    for game_id, wc_time in set(zip(tracking_df["gameId"], tracking_df["wcTime"])):
+        game = possessions_df.loc[possessions_df["gameId"] == game_id].sort_values("wcStart")
+        covering = game.loc[(game["wcStart"] <= wc_time) & (game["wcEnd"] >= wc_time)]
+        before = game.loc[game["wcStart"] <= wc_time]
+        after = game.loc[game["wcStart"] > wc_time]
+        possession = covering.iloc[0] if len(covering) else before.iloc[-1] if len(before) else after.iloc[0]
+        basket_x[game_id, wc_time] = possession["basketX"]
+
+    return np.array([basket_x[key] for key in zip(tracking_df["gameId"], tracking_df["wcTime"])])
+
+
+def test_normalize_attack_fills_frames_between_possessions(source_data):
+    tracking_df, possessions_df = source_data["tracking"], source_data["possessions"]
+    covered = PossessionProcessor.lookup_possessions(possessions_df, tracking_df["wcTime"], tracking_df["gameId"])
+    assert covered["basketX"].isna().any()
+
+    normalized = TrackingProcessor.normalize_attack(tracking_df, PossessionProcessor.build_interval_index(possessions_df))
+
+    sign = np.where(expected_basket_x(tracking_df, possessions_df) == ATTACK_BASKET_X, 1, -1)
+    np.testing.assert_allclose(normalized["nx"], tracking_df["x"] * sign)
+    np.testing.assert_allclose(normalized["ny"], tracking_df["y"] * sign)
+
+
+def test_normalize_attack_leaves_games_without_possessions_nan(source_data):
+    tracking_df, possessions_df = source_data["tracking"], source_data["possessions"]
+    normalized = TrackingProcessor.normalize_attack(tracking_df, possessions_df.loc[possessions_df["gameId"] == GAME_IDS[0]])
+
+    other_game = (tracking_df["gameId"] == GAME_IDS[1]).to_numpy()
+    assert normalized.loc[other_game, ["nx", "ny"]].isna().all().all()
+    assert normalized.loc[~other_game, ["nx", "ny"]].notna().all().all()
+
+
+def test_ingest_normalizes_by_default(source_data):
+    PossessionProcessor.ingest()
+    TrackingProcessor.ingest()
+    tracking_df = TrackingProcessor.load_games()
+
+    assert TrackingProcessor.has_attack_coords(tracking_df)
+    source = source_data["tracking"]
+    sign = np.where(expected_basket_x(source, source_data["possessions"]) == ATTACK_BASKET_X, 1, -1)
+    np.testing.assert_allclose(tracking_df["nx"], source["x"] * sign)
+    pd.testing.assert_frame_equal(
+        TrackingProcessor.to_attack_frame(tracking_df)[["x", "y"]], tracking_df[["nx", "ny"]].set_axis(["x", "y"], axis=1)
+    )
+
+
+def test_ingest_counts_rows_after_transform(source_data):
+    manifest = GameStore.ingest(SOURCE, SRC_PATH, DTYPES, chunksize=250, transform=lambda df: df.loc[df["teamId"] == "-1"])
+
+    for game_id in GAME_IDS:
+        assert manifest["rows"][game_id] == len(TrackingProcessor.load_game(game_id)) == N_FRAMES
+
+
+def test_streamed_shots_and_rebounds_keep_attack_coords(source_data):
+    PossessionProcessor.ingest()
+    TrackingProcessor.ingest()
+
+    assert ActionProcessor.ball_tracking()["columns"][-2:] == ["nx", "ny"]
+    streamed = ActionProcessor.extract_shots_and_rebounds_by_game(ActionProcessor.iter_games(**ActionProcessor.ball_tracking()))
+    in_memory = ActionProcessor.extract_shots_and_rebounds(EventProcessor.load_games(), TrackingProcessor.load_games())
+
+    assert {"shot_nx", "shot_ny", "rebound_nx", "rebound_ny"}.issubset(streamed.columns)
+    # Same rows, the in-memory path groups made/missed shots across games
+    pd.testing.assert_frame_equal(
+        streamed.sort_values(["gameId", "shot_time"], ignore_index=True), in_memory.sort_values(["gameId", "shot_time"], ignore_index=True)
+    )
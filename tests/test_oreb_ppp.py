@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.EventProcessor import EventProcessor
+from code.util.FeatureUtil import FeatureUtil
+from tests.conftest import calculate_oreb_ppp_loop, make_oreb_events
+
+
+def test_oreb_ppp_matches_loop():
+    event_df = make_oreb_events()
+    off_rebounds_df = EventProcessor.extract_off_rebounds(event_df)
+    assert off_rebounds_df["wcTime"].isna().any()
+    assert event_df.loc[event_df["eventType"] == "SHOT", "wcTime"].isna().any()
+
+    assert FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df) == pytest.approx(calculate_oreb_ppp_loop(event_df, off_rebounds_df))
+
+
+def test_oreb_ppp_breakdown_matches_loop():
+    event_df = make_oreb_events(seed=1)
+    off_rebounds_df = EventProcessor.extract_off_rebounds(event_df)
+
+    breakdown = FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df, by="period")
+    for period, row in breakdown.iterrows():
+        rebounds = off_rebounds_df.loc[off_rebounds_df["period"] == period]
+        assert row["orebs"] == len(rebounds)
+        assert row["oreb_ppp"] == pytest.approx(calculate_oreb_ppp_loop(event_df, rebounds))
+
+
+def test_oreb_ppp_breakdown_by_shot_classification():
+    event_df = make_oreb_events(seed=2)
+    off_rebounds_df = EventProcessor.extract_off_rebounds(event_df)
+
+    with pytest.raises(KeyError, match="shot_classification"):
+        FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df, by="shot_classification")
+    with pytest.raises(KeyError, match="Unknown"):
+        FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df, by="quarter")
+
+    event_df["shot_classification"] = np.where(event_df["three"], "center_three", "close_range")
+    breakdown = FeatureUtil.calculate_oreb_ppp(event_df, off_rebounds_df, by=["shot_classification", "shot_clock_bucket"])
+    assert breakdown["orebs"].sum() <= len(off_rebounds_df)
+
+    shots_df = event_df.loc[event_df["eventType"] == "SHOT"]
+    ppp = FeatureUtil.lookup_oreb_ppp(breakdown, shots_df)
+    assert ppp.index.equals(shots_df.index)
+    assert ppp.notna().all()
+
+    with pytest.raises(KeyError, match="scTime"):
+        FeatureUtil.lookup_oreb_ppp(breakdown, shots_df.drop(columns="scTime"))
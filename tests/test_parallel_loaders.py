@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from code.io.EventProcessor import EventProcessor
+from code.io.FrameCache import FRAME_CACHE
+from code.io.TrackingIndex import TrackingIndex
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS
+
+
+def sort_games(df):
+    return pd.concat(TrackingProcessor.sort_by_time(game_df) for _, game_df in df.groupby("gameId", sort=False))
+
+
+@pytest.mark.parametrize("ingest", [False, True])
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_parallel_matches_serial(source_data, ingest, max_workers):
+    if ingest:
+        TrackingProcessor.ingest()
+        EventProcessor.ingest()
+
+    for game_ids in ("all", GAME_IDS[::-1]):
+        parallel_df = TrackingProcessor.load_games_parallel(game_ids, max_workers, preprocess=TrackingProcessor.sort_by_time)
+        FRAME_CACHE.clear()
+        pd.testing.assert_frame_equal(parallel_df, sort_games(TrackingProcessor.load_games(game_ids)).reset_index(drop=True))
+
+    pd.testing.assert_frame_equal(
+        TrackingProcessor.load_games_parallel(max_workers=max_workers, compact=True, entity="ball", columns=["gameId", "x"]),
+        TrackingProcessor.load_games(compact=True, entity="ball", columns=["gameId", "x"]),
+    )
+    pd.testing.assert_frame_equal(EventProcessor.load_games_parallel(max_workers=max_workers, periods=[2]), EventProcessor.load_games(periods=[2]))
+
+
+def test_unpreprocessed_loads_share_the_cache_entry(source_data):
+    tracking_df = TrackingProcessor.load_games_parallel(max_workers=1, index=True)
+
+    assert isinstance(tracking_df, TrackingIndex)
+    TrackingProcessor.load_games()
+    assert FRAME_CACHE.stats()["entries"] == 1 and FRAME_CACHE.stats()["hits"] == 1
+
+
+def test_closures_are_cached_separately(source_data):
+    def tag(value):
+        return lambda df: df.assign(tag=value)
+
+    frames = [EventProcessor.load_games_parallel(max_workers=1, preprocess=tag(value)) for value in (1, 2)]
+
+    assert frames[0]["tag"].eq(1).all() and frames[1]["tag"].eq(2).all()
+    assert FRAME_CACHE.stats()["entries"] == 2
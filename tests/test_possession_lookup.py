@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from code.io.PossessionProcessor import PossessionProcessor
+from code.util.FeatureUtil import FeatureUtil
+from tests.conftest import FRAME_MS, make_possessions, make_tracking
+
+
+def lookup_loop(possessions_df, timestamps, game_ids):
+    """The per-timestamp scan lookup_possessions replaces, restricted to the timestamp's game."""
+    rows = []
+    for timestamp, game_id in zip(timestamps, game_ids):
+        game_possessions = possessions_df.loc[possessions_df["gameId"] == game_id]
+        covering = (game_possessions["wcStart"] <= timestamp) & (game_possessions["wcEnd"] >= timestamp)
+        if covering.any():
+            rows.append(PossessionProcessor.extract_possession_by_timestamp(game_possessions, timestamp)[["possId", "basketX"]])
+        else:
+            rows.append(pd.Series({"possId": np.nan, "basketX": np.nan}))
+
+    return pd.DataFrame(rows).reset_index(drop=True)
+
+
+def test_lookup_matches_scan():
+    tracking_df = make_tracking()
+    possessions_df = make_possessions(tracking_df)
+    # Every frame (boundaries and gaps included), shuffled, looked up against possessions out of order
+    frames = tracking_df[["gameId", "wcTime"]].drop_duplicates().sample(frac=1, random_state=0)
+    shuffled_df = possessions_df.sample(frac=1, random_state=1)
+
+    for intervals in (shuffled_df, PossessionProcessor.build_interval_index(possessions_df)):
+        possessions = PossessionProcessor.lookup_possessions(intervals, frames["wcTime"], frames["gameId"])
+        expected = lookup_loop(possessions_df, frames["wcTime"], frames["gameId"])
+        pd.testing.assert_frame_equal(possessions, expected, check_dtype=False)
+    assert possessions["possId"].isna().any() and possessions["possId"].notna().any()
+
+
+def test_boundary_goes_to_earlier_possession():
+    possessions_df = pd.DataFrame(
+        {"gameId": ["g", "g"], "possId": ["a", "b"], "basketX": [1.0, -1.0], "wcStart": [0, 100], "wcEnd": [100, 200]}
+    )
+
+    possessions = PossessionProcessor.lookup_possessions(possessions_df, [100, 150, 201])
+    assert possessions["possId"].tolist()[:2] == ["a", "b"]
+    assert pd.isna(possessions["possId"].iloc[2])
+
+
+def test_classify_shot_locations_matches_scan():
+    possessions_df = make_possessions(make_tracking())
+    shots_df = pd.DataFrame(
+        {
+            "gameId": possessions_df["gameId"],
+            "shot_time": possessions_df["wcEnd"] - FRAME_MS,
+            "shot_x": np.linspace(-40, 40, len(possessions_df)),
+            "shot_y": np.linspace(-20, 20, len(possessions_df)),
+        }
+    ).iloc[::-1]
+
+    def classify_shot(x, y, basket_x):
+        return "near" if abs(x - basket_x) < 30 else "far"
+
+    classified = FeatureUtil.classify_shot_locations(shots_df, possessions_df, classify_shot)
+
+    basket_x = shots_df["shot_time"].apply(lambda t: PossessionProcessor.extract_possession_by_timestamp(possessions_df, t)["basketX"])
+    assert classified["basketX"].tolist() == basket_x.tolist()
+    assert classified["possId"].tolist() == possessions_df["possId"].iloc[::-1].tolist()
+    assert classified["shot_classification"].tolist() == [
+        classify_shot(x, y, b) for x, y, b in zip(shots_df["shot_x"], shots_df["shot_y"], basket_x)
+    ]
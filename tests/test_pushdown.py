@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from code.io.ActionProcessor import BALL_TRACKING, ActionProcessor
+from code.io.EventProcessor import EventProcessor
+from code.io.FrameCache import FRAME_CACHE
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS
+
+PREDICATES = [
+    {"columns": ["wcTime", "x", "y"]},
+    {"periods": [2]},
+    {"entity": "ball"},
+    {"entity": "players", "columns": ["playerId", "x"]},
+    {"entity": "1610612737", "periods": [1]},
+    {"columns": ["x"], "time_range": (1_700_000_000_400, 1_700_000_001_000)},
+]
+
+
+def expected_load(tracking_df, columns=None, periods=None, time_range=None, entity=None):
+    """The same selection made on the fully parsed frame."""
+    mask = pd.Series(True, index=tracking_df.index)
+    if periods is not None:
+        mask &= tracking_df["period"].isin(periods)
+    if time_range is not None:
+        mask &= tracking_df["wcTime"].between(*time_range)
+    if entity == "ball":
+        mask &= tracking_df["teamId"] == "-1"
+    elif entity == "players":
+        mask &= tracking_df["teamId"] != "-1"
+    elif entity is not None:
+        mask &= tracking_df["teamId"] == entity
+    selected = tracking_df.loc[mask].reset_index(drop=True)
+
+    return selected[columns] if columns is not None else selected
+
+
+@pytest.mark.parametrize("ingest", [False, True])
+@pytest.mark.parametrize("predicates", PREDICATES)
+def test_pushdown_matches_full_load(source_data, ingest, predicates):
+    full_df = TrackingProcessor.load_games()
+    if ingest:
+        TrackingProcessor.ingest(normalize=False)
+
+    for game_ids in ("all", [GAME_IDS[1]]):
+        requested = full_df if game_ids == "all" else full_df.loc[full_df["gameId"].isin(game_ids)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(TrackingProcessor.load_games(game_ids, **predicates), expected_load(requested, **predicates))
+
+    streamed = dict(TrackingProcessor.iter_games(chunksize=250, **predicates))
+    for game_id in GAME_IDS:
+        pd.testing.assert_frame_equal(streamed[game_id], TrackingProcessor.load_game(game_id, **predicates))
+
+
+def test_filtered_loads_are_cached_separately(source_data):
+    ball_df = TrackingProcessor.load_games(entity="ball")
+    players_df = TrackingProcessor.load_games(entity="players")
+    period_df = EventProcessor.load_games(periods=[1])
+
+    assert (ball_df["teamId"] == "-1").all() and (players_df["teamId"] != "-1").all()
+    assert (period_df["period"] == 1).all()
+    assert FRAME_CACHE.stats()["entries"] == 3
+
+
+def test_ball_tracking_covers_shots_and_rebounds(source_data):
+    for frames in ActionProcessor.iter_games(**BALL_TRACKING):
+        assert list(frames.tracking_df.columns) == BALL_TRACKING["columns"]
+        assert (frames.tracking_df["teamId"] == "-1").all()
+        assert len(frames.tracking_df) == (source_data["tracking"]["gameId"] == frames.game_id).sum() // 11
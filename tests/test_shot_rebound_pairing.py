@@ -0,0 +1,34 @@
+import pandas as pd
+from code.io.ActionProcessor import ActionProcessor
+from tests.conftest import make_shot_rebound_events, pair_shots_and_rebounds_loop
+
+KEY = ["gameId", "period", "wcTime_reb", "wcTime_shot"]
+
+
+def test_asof_pairing_matches_cartesian():
+    shots_df, rebounds_df = make_shot_rebound_events()
+
+    expected = pair_shots_and_rebounds_loop(shots_df, rebounds_df).sort_values(KEY, ignore_index=True)
+    pairs = ActionProcessor.pair_shots_and_rebounds(shots_df, rebounds_df).sort_values(KEY, ignore_index=True)
+
+    assert len(pairs)
+    pd.testing.assert_frame_equal(pairs, expected)
+
+
+def test_rebounds_without_an_earlier_shot_are_dropped():
+    shots_df, rebounds_df = make_shot_rebound_events(seed=1)
+    # A rebound before every shot of its period, and a period with rebounds only
+    first_shot = shots_df.sort_values("wcTime").iloc[0]
+    extra = pd.DataFrame(
+        [
+            {**rebounds_df.iloc[0].to_dict(), "gameId": first_shot["gameId"], "period": first_shot["period"], "wcTime": -1},
+            {**rebounds_df.iloc[0].to_dict(), "period": 9, "wcTime": 10**9},
+        ]
+    ).astype(rebounds_df.dtypes.to_dict())
+    rebounds_df = pd.concat([rebounds_df, extra], ignore_index=True)
+
+    pairs = ActionProcessor.pair_shots_and_rebounds(shots_df, rebounds_df)
+    assert not pairs["wcTime_reb"].isin([-1, 10**9]).any()
+    pd.testing.assert_frame_equal(
+        pairs.sort_values(KEY, ignore_index=True), pair_shots_and_rebounds_loop(shots_df, rebounds_df).sort_values(KEY, ignore_index=True)
+    )
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from code.util.FeatureUtil import SHOT_REGION_PRECEDENCE, FeatureUtil
+from code.util.ShotRegionUtil import ShotRegionUtil
+from tests.conftest import BASKET_X, make_possessions, make_tracking
+
+
+def boundary_points():
+    """Every region polygon's vertices and edge midpoints, where neighbouring regions touch."""
+    points = []
+    for region_name in SHOT_REGION_PRECEDENCE:
+        coords = shapely.get_coordinates(shapely.boundary(ShotRegionUtil.regions[region_name]))
+        points.append(coords)
+        points.append((coords[1:] + coords[:-1]) / 2)
+    return np.unique(np.concatenate(points), axis=0)
+
+
+def court_points(seed=0):
+    rng = np.random.default_rng(seed)
+    grid_x, grid_y = np.meshgrid(np.arange(-47, 47.5, 1.0), np.arange(-25, 25.5, 1.0))
+    random = np.column_stack([rng.uniform(-47, 47, 2000), rng.uniform(-25, 25, 2000)])
+    return np.concatenate([np.column_stack([grid_x.ravel(), grid_y.ravel()]), random, boundary_points()])
+
+
+@pytest.mark.parametrize("basket_x", [BASKET_X, -BASKET_X])
+def test_batch_matches_scalar(basket_x):
+    points = court_points()
+    # Boundary points are on the attacked half, so mirror them for the other basket
+    x = points[:, 0] if basket_x > 0 else -points[:, 0]
+
+    regions = FeatureUtil.classify_shot_regions(x, points[:, 1], basket_x)
+    expected = [FeatureUtil.classify_shot_region(px, py, basket_x) for px, py in zip(x, points[:, 1])]
+
+    assert list(regions.categories) == SHOT_REGION_PRECEDENCE
+    pd.testing.assert_series_equal(pd.Series(regions, dtype=object).fillna("none"), pd.Series(expected, dtype=object).fillna("none"))
+
+
+def test_shared_borders_follow_precedence():
+    points = boundary_points()
+    hits = np.column_stack(
+        [shapely.intersects_xy(ShotRegionUtil.regions[region_name], points[:, 0], points[:, 1]) for region_name in SHOT_REGION_PRECEDENCE]
+    )
+    shared = hits.sum(axis=1) > 1
+    assert shared.any()
+
+    regions = FeatureUtil.classify_shot_regions(points[shared, 0], points[shared, 1], BASKET_X)
+    np.testing.assert_array_equal(regions.codes, hits[shared].argmax(axis=1))
+
+
+def test_missing_coordinates_and_per_shot_baskets():
+    regions = FeatureUtil.classify_shot_regions([np.nan, 40.0, -40.0], [0.0, np.nan, 0.0], [BASKET_X, BASKET_X, -BASKET_X])
+
+    assert pd.isna(regions[0]) and pd.isna(regions[1])
+    assert regions[2] == FeatureUtil.classify_shot_region(-40.0, 0.0, -BASKET_X) == "CLOSE_RANGE"
+
+
+def test_classify_shot_locations_uses_the_batch_classifier():
+    possessions_df = make_possessions(make_tracking())
+    rng = np.random.default_rng(1)
+    shots_df = pd.DataFrame(
+        {
+            "gameId": possessions_df["gameId"],
+            "shot_time": possessions_df["wcEnd"],
+            "shot_x": rng.uniform(-47, 47, len(possessions_df)),
+            "shot_y": rng.uniform(-25, 25, len(possessions_df)),
+        }
+    )
+
+    classified = FeatureUtil.classify_shot_locations(shots_df, possessions_df, FeatureUtil.classify_shot_region)
+
+    expected = [FeatureUtil.classify_shot_region(*row) for row in classified[["shot_x", "shot_y", "basketX"]].itertuples(index=False)]
+    assert classified["shot_classification"].tolist() == expected
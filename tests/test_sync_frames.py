@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.ActionProcessor import ActionProcessor
+from code.io.EventProcessor import FRAME_TOLERANCE, EventProcessor
+from tests.conftest import FRAME_MS, GAME_IDS, make_possession_events, make_possessions, make_tracking
+
+
+@pytest.fixture(scope="module")
+def tracking_df():
+    return make_tracking()
+
+
+def sync_loop(event_df, tracking_df, direction, tolerance):
+    """Per-event scan over the same game's ball frames."""
+    ball = tracking_df.loc[tracking_df["teamId"] == "-1"]
+    ball_rows = []
+    for game_id, event_time in zip(event_df["gameId"], event_df["wcTime"]):
+        frames = ball.loc[ball["gameId"] == game_id, "wcTime"]
+        if np.isnan(event_time):
+            ball_rows.append(-1)
+            continue
+        delta = frames - event_time
+        if direction == "backward":
+            delta = delta.where(delta <= 0)
+        elif direction == "forward":
+            delta = delta.where(delta >= 0)
+        delta = delta.abs().dropna()
+        if tolerance is not None:
+            delta = delta[delta <= tolerance]
+        ball_rows.append(tracking_df.index.get_loc(delta.idxmin()) if len(delta) else -1)
+
+    return np.array(ball_rows)
+
+
+def random_events(tracking_df, n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = tracking_df[["gameId", "wcTime"]].drop_duplicates().sample(n, replace=True, random_state=seed)
+    # Off-frame offsets (never exactly between two frames), a few past either end of the game and a few without a time
+    offsets = rng.choice([o for o in range(-3 * FRAME_MS, 3 * FRAME_MS) if o % FRAME_MS != FRAME_MS // 2], n)
+    wc_time = (frames["wcTime"] + offsets).to_numpy(dtype=float, copy=True)
+    wc_time[rng.choice(n, 5, replace=False)] = np.nan
+    return pd.DataFrame({"gameId": frames["gameId"].to_numpy(), "wcTime": wc_time}, index=np.arange(n) * 10)
+
+
+@pytest.mark.parametrize("direction", ["nearest", "backward", "forward"])
+@pytest.mark.parametrize("tolerance", [FRAME_TOLERANCE, 15, None])
+def test_sync_matches_scan(tracking_df, direction, tolerance):
+    event_df = random_events(tracking_df)
+    sync = EventProcessor.sync_frames(event_df, tracking_df, direction, tolerance)
+
+    assert sync.index.equals(event_df.index)
+    np.testing.assert_array_equal(sync["ballRow"], sync_loop(event_df, tracking_df, direction, tolerance))
+    found = sync["ballRow"].to_numpy() >= 0
+    assert sync["frameTime"].isna().to_numpy().tolist() == (~found).tolist()
+    frames = tracking_df.iloc[sync["ballRow"].to_numpy()[found]]
+    assert (frames["teamId"] == "-1").all()
+    np.testing.assert_array_equal(frames["wcTime"], sync["frameTime"].to_numpy()[found])
+    np.testing.assert_array_equal(frames["gameId"], event_df["gameId"].to_numpy()[found])
+
+
+def test_sync_stays_within_the_game(tracking_df):
+    # At one of the other game's frames, far from any frame of its own game
+    other_frame = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[1], "wcTime"].iloc[0]
+    event_df = pd.DataFrame({"gameId": [GAME_IDS[0]], "wcTime": [other_frame]})
+
+    assert EventProcessor.sync_frames(event_df, tracking_df)["ballRow"].tolist() == [-1]
+    ball_row = EventProcessor.sync_frames(event_df, tracking_df, tolerance=None)["ballRow"].iloc[0]
+    assert tracking_df.iloc[ball_row]["gameId"] == GAME_IDS[0]
+
+
+def test_tolerance_cutoff(tracking_df):
+    last_frame = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0], "wcTime"].max()
+    event_df = pd.DataFrame({"gameId": [GAME_IDS[0]] * 3, "wcTime": [last_frame, last_frame + FRAME_TOLERANCE, last_frame + FRAME_TOLERANCE + 1]})
+
+    sync = EventProcessor.sync_frames(event_df, tracking_df)
+    assert sync["frameTime"].tolist()[:2] == [last_frame, last_frame]
+    assert pd.isna(sync["frameTime"].iloc[2]) and sync["ballRow"].iloc[2] == -1
+
+
+def test_events_between_frames_are_located(tracking_df):
+    possessions_df = make_possessions(tracking_df)
+    event_df = make_possession_events(possessions_df)
+    # Shots/rebounds a few ms off their frames land on the same ball locations
+    shifted_df = event_df.assign(wcTime=event_df["wcTime"] + 7)
+
+    on_frame = ActionProcessor.extract_shots_and_rebounds(event_df, tracking_df)
+    off_frame = ActionProcessor.extract_shots_and_rebounds(shifted_df, tracking_df)
+
+    coord_cols = [col for col in on_frame.columns if col.endswith(("_x", "_y"))]
+    assert on_frame["shot_x"].notna().all() and on_frame["rebound_x"].notna().any()
+    pd.testing.assert_frame_equal(off_frame[coord_cols], on_frame[coord_cols])
@@ -0,0 +1,140 @@
+import contextlib
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from code.io.TrackingIndex import TrackingIndex
+from code.io.TrackingProcessor import TrackingProcessor
+from tests.conftest import GAME_IDS, FRAME_MS, make_possessions, make_tracking
+
+
+@pytest.fixture(scope="module")
+def tracking_df():
+    return make_tracking()
+
+
+def masked(tracking_df, start_time, end_time, game_id=None):
+    mask = (tracking_df["wcTime"] >= start_time) & (tracking_df["wcTime"] <= end_time)
+    if game_id is not None:
+        mask &= tracking_df["gameId"] == game_id
+    return tracking_df.loc[mask].sort_values(["gameId", "wcTime"], kind="stable", ignore_index=True)
+
+
+def test_between_matches_mask(tracking_df):
+    index = TrackingIndex(tracking_df)
+    frames = np.unique(tracking_df["wcTime"])
+
+    assert index.game_ids == sorted(GAME_IDS)
+    for start, end in [(frames[3], frames[9]), (frames[3] + 1, frames[9] - 1), (frames[0] - 100, frames[5]), (frames[-1] + 1, frames[-1] + 2)]:
+        pd.testing.assert_frame_equal(index.between(start, end), masked(tracking_df, start, end))
+    # Spanning both games
+    pd.testing.assert_frame_equal(index.between(frames[0], frames[-1]), masked(tracking_df, frames[0], frames[-1]))
+    pd.testing.assert_frame_equal(index.at(frames[7], GAME_IDS[1]), masked(tracking_df, frames[7], frames[7], GAME_IDS[1]))
+    pd.testing.assert_frame_equal(index.game(GAME_IDS[0]), masked(tracking_df, frames[0], frames[-1], GAME_IDS[0]))
+    assert index.game("missing").empty
+
+
+def test_extractors_take_an_index(tracking_df):
+    game_df = tracking_df.loc[tracking_df["gameId"] == GAME_IDS[0]].sort_values("wcTime", kind="stable", ignore_index=True)
+    index = TrackingIndex(game_df)
+    wc_time = game_df["wcTime"].iloc[100]
+    possession = {"wcStart": wc_time, "wcEnd": wc_time + 10 * FRAME_MS}
+
+    pd.testing.assert_frame_equal(
+        TrackingProcessor.extract_possession_moments(index, possession), TrackingProcessor.extract_possession_moments(game_df, possession)
+    )
+    pd.testing.assert_frame_equal(
+        TrackingProcessor.ball_position_at_moment(index, wc_time), TrackingProcessor.ball_position_at_moment(game_df, wc_time)
+    )
+    assert len(TrackingProcessor.ball_position_at_moment(game_df, wc_time)) == 1
+    pd.testing.assert_frame_equal(
+        TrackingProcessor.player_positions_at_moment(index, wc_time), TrackingProcessor.player_positions_at_moment(game_df, wc_time)
+    )
+
+
+def test_slices_are_fresh_frames(tracking_df):
+    index = TrackingIndex(tracking_df)
+    before = index.tracking_df.copy()
+    frames = np.unique(tracking_df["wcTime"])
+
+    moment_df = index.between(frames[3], frames[9], GAME_IDS[0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        moment_df["speed"] = 1.0
+        moment_df["x"] = moment_df["x"] * 2
+    assert moment_df.index.equals(pd.RangeIndex(len(moment_df)))
+
+    # Always on from pandas 3 (where the option is deprecated)
+    pandas_3 = int(pd.__version__.split(".")[0]) >= 3
+    with contextlib.nullcontext() if pandas_3 else pd.option_context("mode.copy_on_write", True):
+        frame_df = index.at(frames[5])
+        frame_df.loc[0, "y"] = 100.0
+
+    pd.testing.assert_frame_equal(index.tracking_df, before)
+
+
+def indexed_possessions(tracking_df):
+    """The fixture possessions plus one sharing a boundary frame, one between frames, one past the tracked range and one for an untracked game."""
+    possessions_df = make_possessions(tracking_df)
+    first = possessions_df.iloc[0]
+    extra = [
+        {"possId": "adjacent", "wcStart": first["wcEnd"], "wcEnd": first["wcEnd"] + 2 * FRAME_MS},
+        {"possId": "between-frames", "wcStart": first["wcEnd"] + 2 * FRAME_MS + 1, "wcEnd": first["wcEnd"] + 3 * FRAME_MS - 1},
+        {"possId": "after", "wcStart": tracking_df["wcTime"].max() + FRAME_MS, "wcEnd": tracking_df["wcTime"].max() + 5 * FRAME_MS},
+        {"possId": "untracked", "gameId": "missing"},
+    ]
+    return pd.concat([possessions_df, pd.DataFrame([{**first.to_dict(), **row} for row in extra])], ignore_index=True)
+
+
+def tagged_rows(tracking_df, possessions_df):
+    """possId of every row the loop way: the first possession (in time order) of the same game covering it."""
+    poss_ids = pd.Series(np.nan, index=tracking_df.index, dtype=object)
+    for _, possession in possessions_df.sort_values("wcStart", kind="stable").iterrows():
+        covered = (
+            (tracking_df["gameId"] == possession["gameId"])
+            & (tracking_df["wcTime"] >= possession["wcStart"])
+            & (tracking_df["wcTime"] <= possession["wcEnd"])
+            & poss_ids.isna()
+        )
+        poss_ids[covered] = possession["possId"]
+    return poss_ids
+
+
+def test_possession_slices_match_mask(tracking_df):
+    possessions_df = indexed_possessions(tracking_df)
+    index = TrackingIndex(tracking_df, possessions_df)
+
+    for _, possession in possessions_df.iterrows():
+        expected = masked(tracking_df, possession["wcStart"], possession["wcEnd"], possession["gameId"])
+        pd.testing.assert_frame_equal(index.possession(possession["possId"]).drop(columns="possId"), expected)
+        pd.testing.assert_frame_equal(
+            TrackingProcessor.extract_possession_moments(index, possession).drop(columns="possId"),
+            TrackingProcessor.extract_possession_moments(expected, possession),
+        )
+    for poss_id in ("between-frames", "after", "untracked"):
+        assert index.has_possession(poss_id) and index.possession(poss_id).empty
+    assert index.possession("unknown").empty
+
+
+def test_rows_are_tagged_with_the_earlier_possession(tracking_df):
+    possessions_df = indexed_possessions(tracking_df)
+    index = TrackingIndex(tracking_df, possessions_df)
+
+    expected = tagged_rows(index.tracking_df, possessions_df)
+    pd.testing.assert_series_equal(index.tracking_df["possId"].astype(object), expected, check_names=False)
+    assert (expected == "adjacent").any() and (expected == possessions_df["possId"].iloc[0]).any()
+
+
+@pytest.mark.parametrize("col, ufunc, agg", [("x", np.add, "sum"), ("z", np.maximum, "max"), ("period", np.minimum, "min")])
+def test_reduce_possessions_matches_groupby(tracking_df, col, ufunc, agg):
+    possessions_df = indexed_possessions(tracking_df)
+    index = TrackingIndex(tracking_df, possessions_df)
+
+    rows = index.tracking_df.assign(possId=tagged_rows(index.tracking_df, possessions_df))
+    expected = rows.groupby("possId", sort=False)[col].agg(agg)
+    reduced = index.reduce_possessions(col, ufunc)
+
+    # Possessions without any rows of their own are left out, like groupby does
+    assert not {"between-frames", "after", "untracked"} & set(reduced.index)
+    pd.testing.assert_series_equal(reduced, expected, check_index_type=False)
+    assert TrackingIndex(tracking_df.iloc[0:0], possessions_df).reduce_possessions(col, ufunc).empty
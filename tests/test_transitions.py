@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from code.io.EventProcessor import EventProcessor
+from tests.conftest import extract_transition_opportunities_loop, make_transition_events
+
+
+def test_opportunities_match_loop():
+    event_df = make_transition_events()
+    expected = extract_transition_opportunities_loop(event_df)
+
+    opportunities = EventProcessor.extract_transition_opportunities(event_df)
+
+    assert len(opportunities) == len(expected)
+    for opportunity, expected_df in zip(opportunities.itertuples(), expected):
+        if expected_df.empty:
+            # A rebound without a team: the original sliced nothing, now it's an opportunity of its own
+            assert opportunity.start == opportunity.end and pd.isna(opportunity.teamId)
+            continue
+        pd.testing.assert_frame_equal(event_df.loc[opportunity.start : opportunity.end], expected_df)
+        assert opportunity.teamId == expected_df["teamId"].iloc[0]
+        assert (opportunity.wcStart, opportunity.wcEnd) == (expected_df["wcTime"].iloc[0], expected_df["wcTime"].iloc[-1])
+
+
+def test_opportunities_break_on_game_and_period():
+    event_df = make_transition_events(seed=1, n_games=3, n_periods=4)
+    opportunities = EventProcessor.extract_transition_opportunities(event_df)
+
+    for opportunity in opportunities.itertuples():
+        window = event_df.loc[opportunity.start : opportunity.end]
+        assert window["gameId"].nunique() == 1 and window["period"].nunique() == 1
+        if pd.isna(opportunity.teamId):
+            assert len(window) == 1
+            continue
+        assert (window["teamId"] == opportunity.teamId).all()
+        # Extends as far as the run goes
+        after = opportunity.end + 1
+        if after < len(event_df):
+            assert (
+                event_df.at[after, "teamId"] != opportunity.teamId
+                or event_df.at[after, "gameId"] != opportunity.gameId
+                or event_df.at[after, "period"] != opportunity.period
+                or pd.isna(event_df.at[after, "teamId"])
+            )
+
+
+def test_label_transitions_points_at_latest_opportunity():
+    event_df = make_transition_events(seed=2, n_games=2, n_periods=2)
+    opportunities = EventProcessor.extract_transition_opportunities(event_df)
+
+    labels = EventProcessor.label_transitions(event_df)
+
+    expected = np.full(len(event_df), -1)
+    for num, opportunity in enumerate(opportunities.itertuples()):
+        expected[event_df.index.get_loc(opportunity.start) : event_df.index.get_loc(opportunity.end) + 1] = num
+    np.testing.assert_array_equal(labels.to_numpy(), expected)
+
+
+def test_teamless_rebound_starts_its_own_run():
+    event_df = pd.DataFrame(
+        {
+            "gameId": "1",
+            "period": 1,
+            "eventType": ["REB", "SHOT", "REB", "SHOT", "TOV"],
+            "playerId": ["7", "7", "8", "8", "9"],
+            "teamId": [None, "1", "2", None, "2"],
+            "wcTime": np.arange(5) * 1000,
+            "dReb": pd.array([True, None, True, None, None], dtype="boolean"),
+        }
+    )
+
+    opportunities = EventProcessor.extract_transition_opportunities(event_df)
+
+    # The team-less rebound doesn't pull in the team event after it, and a team-less event ends a run
+    assert opportunities[["start", "end", "wcStart", "wcEnd"]].values.tolist() == [[0, 0, 0, 0], [2, 2, 2000, 2000]]
+    assert pd.isna(opportunities.loc[0, "teamId"]) and opportunities.loc[1, "teamId"] == "2"
+    assert EventProcessor.label_transitions(event_df).tolist() == [0, -1, 1, -1, -1]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from code.util.StatsUtil import StatsUtil
+from tests.conftest import calculate_true_points_loop, make_free_throw_events
+
+
+def test_true_points_matches_loop():
+    event_df = make_free_throw_events()
+    expected = calculate_true_points_loop(event_df)
+    true_points = StatsUtil.calculate_true_points(event_df)
+
+    assert (true_points["true_points_produced"] > true_points["points_produced"]).any()
+    pd.testing.assert_series_equal(true_points["points_produced"], expected["points_produced"], check_dtype=False)
+    pd.testing.assert_series_equal(true_points["true_points_produced"], expected["true_points_produced"], check_dtype=False)
+
+
+def test_true_points_with_missing_free_throw_times():
+    event_df = make_free_throw_events(seed=1)
+    ft_rows = event_df.index[event_df["eventType"] == "FT"]
+    event_df.loc[ft_rows[::4], "wcTime"] = np.nan
+
+    expected = calculate_true_points_loop(event_df)
+    true_points = StatsUtil.calculate_true_points(event_df)
+
+    pd.testing.assert_series_equal(true_points["true_points_produced"], expected["true_points_produced"], check_dtype=False)
+
+
+def make_trip(*events):
+    """Events from (gameId, period, eventType, playerId, extra columns) tuples, one second apart."""
+    rows = [
+        {"gameId": game_id, "period": period, "eventType": event_type, "playerId": player_id, "wcTime": float(num * 1000), **values}
+        for num, (game_id, period, event_type, player_id, values) in enumerate(events)
+    ]
+    event_df = pd.DataFrame(rows)
+    event_df["made"] = event_df["made"].astype("boolean")
+    return event_df.reindex(columns=["gameId", "period", "eventType", "playerId", "wcTime", "made", "three", "fouledId", "dReb"])
+
+
+def test_foul_without_free_throws():
+    event_df = make_trip(
+        ("1", 1, "SHOT", "7", {"made": True, "three": False}),
+        ("1", 1, "FOUL", "8", {"fouledId": "7"}),
+        ("1", 1, "SHOT", "9", {"made": False, "three": True}),
+        ("1", 1, "FT", "9", {"made": True}),
+    )
+
+    true_points = StatsUtil.calculate_true_points(event_df)
+
+    assert true_points["true_points_produced"].tolist() == [2, 0]
+    pd.testing.assert_series_equal(
+        true_points["true_points_produced"], calculate_true_points_loop(event_df)["true_points_produced"], check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("boundary", ["period", "game"])
+def test_free_throws_stop_at_period_and_game_boundaries(boundary):
+    later = ("1", 2) if boundary == "period" else ("2", 1)
+    event_df = make_trip(
+        ("1", 1, "SHOT", "7", {"made": False, "three": False}),
+        ("1", 1, "FOUL", "8", {"fouledId": "7"}),
+        ("1", 1, "FT", "7", {"made": True}),
+        (*later, "FT", "7", {"made": True}),
+        (*later, "SHOT", "7", {"made": False, "three": False}),
+        (*later, "FOUL", "8", {"fouledId": "7"}),
+        (*later, "FT", "7", {"made": True}),
+        (*later, "FT", "7", {"made": True}),
+    )
+
+    true_points = StatsUtil.calculate_true_points(event_df)
+
+    # The sequence continues on the next FT, but not into the next period or game, which has its own trip
+    assert true_points["true_points_produced"].tolist() == [1, 2]
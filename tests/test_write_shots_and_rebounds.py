@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+import pytest
+from code.io.ActionProcessor import SHOTS_AND_REBOUNDS_SOURCE, ActionProcessor
+from code.io.GameStore import GameStore
+from tests.conftest import GAME_IDS
+
+
+def ball_games(game_ids="all"):
+    return ActionProcessor.iter_games(game_ids, **ActionProcessor.ball_tracking())
+
+
+def test_written_games_match_in_memory(source_data):
+    assert ActionProcessor.write_shots_and_rebounds(ball_games()) == GAME_IDS
+
+    expected = ActionProcessor.extract_shots_and_rebounds_by_game(ball_games())
+    pd.testing.assert_frame_equal(ActionProcessor.load_shots_and_rebounds(), expected)
+    assert GameStore.manifest(SHOTS_AND_REBOUNDS_SOURCE)["rows"] == expected["gameId"].value_counts().to_dict()
+    pd.testing.assert_frame_equal(
+        ActionProcessor.load_shots_and_rebounds([GAME_IDS[1]]), expected.loc[expected["gameId"] == GAME_IDS[1]].reset_index(drop=True)
+    )
+
+
+def test_interrupted_runs_resume(source_data):
+    def interrupted(games):
+        for game in games:
+            yield game
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        ActionProcessor.write_shots_and_rebounds(interrupted(ball_games()))
+    assert GameStore.game_ids(SHOTS_AND_REBOUNDS_SOURCE) == GAME_IDS[:1]
+    assert not any(name.endswith(".tmp") for name in os.listdir(GameStore.source_dir(SHOTS_AND_REBOUNDS_SOURCE)))
+
+    assert ActionProcessor.pending_games() == GAME_IDS[1:]
+    assert ActionProcessor.pending_games(GAME_IDS[::-1]) == GAME_IDS[1:]
+    # Done games are skipped whether or not they're read again
+    assert ActionProcessor.write_shots_and_rebounds(ball_games()) == GAME_IDS[1:]
+    assert ActionProcessor.write_shots_and_rebounds(ball_games(ActionProcessor.pending_games())) == []
+
+    pd.testing.assert_frame_equal(ActionProcessor.load_shots_and_rebounds(), ActionProcessor.extract_shots_and_rebounds_by_game(ball_games()))
@@ -0,0 +1,114 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import Point, box
+from code.util.FeatureUtil import SHOT_REGION_PRECEDENCE, FeatureUtil
+from code.util.ZoneRaster import ZONE_RASTER_DIR, ZoneRaster
+from tests.conftest import BASKET_X
+from tests.test_shot_regions import boundary_points
+
+
+@pytest.fixture(autouse=True)
+def zone_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ZoneRaster, "_compiled", {})
+    return tmp_path / ZONE_RASTER_DIR
+
+
+def shot_region_points(seed=0):
+    """Dense random points over the attacked half plus every region vertex and edge midpoint."""
+    rng = np.random.default_rng(seed)
+    random = np.column_stack([rng.uniform(-5, 48, 20000), rng.uniform(-26, 26, 20000)])
+    return np.concatenate([random, boundary_points()])
+
+
+def test_exact_labels_match_classify_exact():
+    raster = FeatureUtil.shot_region_raster()
+    points = shot_region_points()
+
+    codes = raster.label_at(points[:, 0], points[:, 1])
+    expected = ZoneRaster.classify_exact(raster.polygons, points[:, 0], points[:, 1])
+    np.testing.assert_array_equal(codes, expected)
+
+    # Only cells a border passes through can differ without the exact fallback
+    differs = raster.label_at(points[:, 0], points[:, 1], exact=False) != expected
+    assert differs.any()
+    n_rows, n_cols = raster.labels.shape
+    # Points on the far edges of the extent fall in the last cell
+    col = np.minimum(((points[differs, 0] - raster.origin[0]) / raster.resolution).astype(int), n_cols - 1)
+    row = np.minimum(((points[differs, 1] - raster.origin[1]) / raster.resolution).astype(int), n_rows - 1)
+    assert ((col >= 0) & (row >= 0)).all() and raster.boundary[row, col].all()
+
+
+def test_zone_at_matches_classify_shot_regions():
+    points = shot_region_points()
+    regions = FeatureUtil.shot_region_raster().zone_at(points[:, 0], points[:, 1])
+
+    assert list(regions.categories) == SHOT_REGION_PRECEDENCE
+    pd.testing.assert_series_equal(
+        pd.Series(regions, dtype=object), pd.Series(FeatureUtil.classify_shot_regions(points[:, 0], points[:, 1], BASKET_X), dtype=object)
+    )
+
+
+def test_missing_and_out_of_extent_points_are_unlabelled():
+    raster = ZoneRaster.compile({"square": box(0, 0, 2, 2)}, name="square")
+
+    codes = raster.label_at([np.nan, 1.0, 5.0, -1.0, 2.0], [1.0, np.nan, 1.0, 1.0, 2.0])
+    np.testing.assert_array_equal(codes, [-1, -1, -1, -1, 0])
+
+
+def test_overlapping_zones_go_to_the_first():
+    zones = {"inner": Point(0, 0).buffer(1), "outer": box(-2, -2, 2, 2)}
+    raster = ZoneRaster.compile(zones, name="nested")
+
+    np.testing.assert_array_equal(raster.label_at([0.0, 1.0, 1.5, 3.0], [0.0, 0.0, 1.5, 0.0]), [0, 0, 1, -1])
+
+
+def test_compiled_grid_is_cached_on_disk(zone_dir):
+    zones = {"left": box(0, 0, 1, 2), "right": box(1, 0, 2, 2)}
+    raster = ZoneRaster.compile(zones, name="halves")
+    assert ZoneRaster.compile(zones, name="halves") is raster
+    assert [path.name.startswith("halves-") for path in zone_dir.iterdir()] == [True]
+
+    ZoneRaster._compiled.clear()
+    loaded = ZoneRaster.compile(zones, name="halves")
+    assert loaded is not raster
+    np.testing.assert_array_equal(loaded.labels, raster.labels)
+    np.testing.assert_array_equal(loaded.boundary, raster.boundary)
+    assert loaded.origin == raster.origin
+
+
+def test_changed_zones_are_recompiled(zone_dir):
+    ZoneRaster.compile({"left": box(0, 0, 1, 2), "right": box(1, 0, 2, 2)}, name="halves")
+    moved = ZoneRaster.compile({"left": box(0, 0, 1.5, 2), "right": box(1.5, 0, 2, 2)}, name="halves")
+
+    assert len(list(zone_dir.iterdir())) == 2
+    np.testing.assert_array_equal(moved.label_at([1.2, 1.7], [1.0, 1.0]), [0, 1])
+
+
+def test_stale_cache_file_is_rebuilt(zone_dir):
+    zones = {"left": box(0, 0, 1, 2), "right": box(1, 0, 2, 2)}
+    raster = ZoneRaster.compile(zones, name="halves")
+    (path,) = zone_dir.iterdir()
+
+    for stale in (b"truncated", None):
+        ZoneRaster._compiled.clear()
+        if stale is None:
+            # A grid with codes the scheme doesn't have
+            np.savez_compressed(path, labels=np.full((2, 2), 5, dtype=np.int16), boundary=np.zeros((2, 2), bool), origin=np.zeros(2))
+        else:
+            path.write_bytes(stale)
+
+        rebuilt = ZoneRaster.compile(zones, name="halves")
+        np.testing.assert_array_equal(rebuilt.labels, raster.labels)
+        with np.load(path) as compiled:
+            np.testing.assert_array_equal(compiled["labels"], raster.labels)
+
+    assert not any(name.endswith(".tmp.npz") for name in os.listdir(zone_dir))
+
+
+def test_uncached_compile_writes_nothing(zone_dir):
+    ZoneRaster.compile({"square": box(0, 0, 2, 2)}, name="square", cache=False)
+
+    assert not zone_dir.exists()